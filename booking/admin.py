@@ -1,4 +1,84 @@
+from django.contrib import admin, messages
+from django.db import transaction
 
-from django.contrib import admin
-from .models import  Booking
-admin.site.register(Booking)
+from .models import Booking, EventSalesSummary, SectionSalesSummary, Ticket
+from .summary import record_booking_released
+
+
+# =====================================================
+# BOOKING
+# =====================================================
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "event", "num_tickets", "total_price", "payment_status", "booking_date")
+    list_filter = ("payment_status", "is_paid")
+    search_fields = ("id", "user__username", "event__name", "cashfree_order_id")
+    list_select_related = ("user", "event")
+
+    actions = ["release_bookings"]
+
+    @admin.action(description="Release selected paid bookings (void tickets)")
+    def release_bookings(self, request, queryset):
+        released = 0
+        for booking in queryset.filter(is_paid=True):
+            with transaction.atomic():
+                claimed = Booking.objects.filter(id=booking.id, is_paid=True).update(
+                    is_paid=False,
+                    payment_status=Booking.PAYMENT_FAILED,
+                )
+                if not claimed:
+                    continue
+                Ticket.objects.filter(booking_ref=str(booking.id)).delete()
+                record_booking_released(booking)
+            released += 1
+
+        self.message_user(request, f"{released} booking(s) released.", messages.SUCCESS)
+
+
+# =====================================================
+# SALES DASHBOARD (READS ONLY THE SUMMARY TABLES)
+# =====================================================
+class SectionSalesSummaryInline(admin.TabularInline):
+    model = SectionSalesSummary
+    fk_name = "event"
+    extra = 0
+    can_delete = False
+    fields = ("section", "tickets_sold", "seats_total", "occupancy_display", "revenue", "updated_at")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Occupancy")
+    def occupancy_display(self, obj):
+        return f"{obj.occupancy}%"
+
+
+@admin.register(EventSalesSummary)
+class EventSalesSummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "event",
+        "paid_bookings",
+        "tickets_sold",
+        "seats_total",
+        "occupancy_display",
+        "revenue",
+        "updated_at",
+    )
+    list_select_related = ("event",)
+    search_fields = ("event__name",)
+    ordering = ("-revenue",)
+    readonly_fields = ("event", "revenue", "paid_bookings", "tickets_sold", "seats_total", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_inlines(self, request, obj):
+        return [SectionSalesSummaryInline] if obj else []
+
+    @admin.display(description="Occupancy")
+    def occupancy_display(self, obj):
+        return f"{obj.occupancy}%"
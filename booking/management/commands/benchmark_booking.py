@@ -0,0 +1,235 @@
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+
+from booking.models import Booking, Ticket
+from booking.views import _complete_booking_payment
+from events.models import Event, Seat
+
+
+SQLITE_PROFILES = ("sqlite-default", "sqlite-tuned")
+
+
+def _worker_init():
+    # Needed when the pool uses "spawn"; harmless after "fork"
+    django.setup()
+
+
+def _booking_flow(user_id, event_id, seat_ids):
+    """
+    The writes of one booking, step by step as the views issue them; the
+    payment is completed by the webhook's own code.
+    """
+    # book_event_view
+    booking = Booking.objects.create(
+        user_id=user_id,
+        event_id=event_id,
+        num_tickets=len(seat_ids),
+        total_price=100 * len(seat_ids),
+        payment_status=Booking.PAYMENT_PENDING,
+        is_paid=False,
+    )
+
+    # select_seats_view
+    booking.seats.add(*seat_ids)
+
+    # process_payment_view
+    booking.cashfree_order_id = f"cf_booking_{uuid.uuid4().hex[:12]}"
+    booking.save(update_fields=["cashfree_order_id"])
+
+    # cashfree_webhook: the same lookup and completion transaction
+    booking = Booking.objects.get(cashfree_order_id=booking.cashfree_order_id)
+    _complete_booking_payment(booking, {"cf_payment_id": "bench"})
+
+    # booking_detail_view
+    list(Ticket.objects.filter(booking_ref=str(booking.id)))
+
+
+def _run_worker(user_id, event_id, seat_chunks):
+    timings = []
+    errors = 0
+    started = time.time()
+
+    for seat_ids in seat_chunks:
+        t0 = time.perf_counter()
+        try:
+            _booking_flow(user_id, event_id, seat_ids)
+        except OperationalError:
+            # "database is locked" and friends
+            errors += 1
+            continue
+        timings.append(time.perf_counter() - t0)
+
+    connections.close_all()
+    return started, time.time(), timings, errors
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark booking-flow throughput with concurrent worker processes "
+        "under each database profile"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help=(
+                "sqlite-default, sqlite-tuned or postgres (repeatable; "
+                "defaults to both SQLite profiles)"
+            ),
+        )
+        parser.add_argument(
+            "--postgres-url",
+            default=os.getenv("BENCH_POSTGRES_URL", ""),
+            help="Scratch PostgreSQL database for the postgres profile",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--bookings", type=int, default=50,
+                            help="Bookings per worker")
+        parser.add_argument("--seats", type=int, default=2,
+                            help="Seats per booking")
+        parser.add_argument("--run", action="store_true",
+                            help="Internal: benchmark the configured database")
+
+    def handle(self, *args, **options):
+        if options["run"]:
+            self._run(options)
+            return
+
+        profiles = options["profiles"] or list(SQLITE_PROFILES)
+        results = []
+        for profile in profiles:
+            with tempfile.TemporaryDirectory() as tmp:
+                env = self._profile_env(profile, tmp, options["postgres_url"])
+                results.append(self._run_profile(profile, env, options))
+
+        self.stdout.write(
+            f"\n{'profile':<16}{'bookings/s':>12}{'p50 ms':>10}"
+            f"{'p95 ms':>10}{'errors':>8}"
+        )
+        for profile, result in zip(profiles, results):
+            self.stdout.write(
+                f"{profile:<16}{result['per_second']:>12.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                f"{result['errors']:>8}"
+            )
+
+    # -------------------------------------------------
+    # Parent: one fresh database and subprocess per profile
+    # -------------------------------------------------
+    def _profile_env(self, profile, tmp, postgres_url):
+        env = dict(os.environ)
+        if profile in SQLITE_PROFILES:
+            env["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.sqlite3'}"
+            env["SQLITE_PROFILE"] = profile.split("-", 1)[1]
+        elif profile == "postgres":
+            if not postgres_url:
+                raise CommandError(
+                    "The postgres profile needs --postgres-url "
+                    "(or BENCH_POSTGRES_URL)"
+                )
+            env["DATABASE_URL"] = postgres_url
+        else:
+            raise CommandError(f"Unknown profile '{profile}'")
+        return env
+
+    def _run_profile(self, profile, env, options):
+        manage = [sys.executable, str(settings.BASE_DIR / "manage.py")]
+        self.stdout.write(f"{profile}: migrating")
+        subprocess.run(
+            manage + ["migrate", "--no-input", "-v", "0"],
+            env=env,
+            check=True,
+        )
+
+        self.stdout.write(f"{profile}: running")
+        run = subprocess.run(
+            manage + [
+                "benchmark_booking", "--run",
+                "--workers", str(options["workers"]),
+                "--bookings", str(options["bookings"]),
+                "--seats", str(options["seats"]),
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return json.loads(run.stdout.strip().splitlines()[-1])
+
+    # -------------------------------------------------
+    # Child: seed, then hammer the configured database
+    # -------------------------------------------------
+    def _run(self, options):
+        workers = options["workers"]
+        per_worker = options["bookings"]
+        per_booking = options["seats"]
+
+        tag = uuid.uuid4().hex[:8]
+        event = Event.objects.create(
+            name=f"Benchmark {tag}",
+            description="",
+            location="Benchmark",
+            price=100,
+        )
+        Seat.objects.bulk_create(
+            [
+                Seat(event=event, section="Bench", row_number=str(i // 1000),
+                     seat_number=i % 1000)
+                for i in range(workers * per_worker * per_booking)
+            ],
+            batch_size=1000,
+        )
+        users = User.objects.bulk_create([
+            User(username=f"bench-{tag}-{i}") for i in range(workers)
+        ])
+        user_ids = [user.id for user in users]
+        seat_ids = list(
+            Seat.objects.filter(event=event).order_by("id").values_list("id", flat=True)
+        )
+
+        # Disjoint seats per worker: contention is on the database, not seats
+        jobs = []
+        for w, user_id in enumerate(user_ids):
+            mine = seat_ids[w * per_worker * per_booking:(w + 1) * per_worker * per_booking]
+            chunks = [mine[i:i + per_booking] for i in range(0, len(mine), per_booking)]
+            jobs.append((user_id, event.id, chunks))
+
+        # Children must open their own connections, never share the parent's
+        connections.close_all()
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_worker_init,
+        ) as pool:
+            outcomes = list(pool.map(_run_worker, *zip(*jobs)))
+
+        timings = sorted(t for _, _, worker_timings, _ in outcomes for t in worker_timings)
+        wall = max(end for _, end, _, _ in outcomes) - min(start for start, _, _, _ in outcomes)
+
+        result = {
+            "bookings": len(timings),
+            "errors": sum(errors for _, _, _, errors in outcomes),
+            "seconds": wall,
+            "per_second": len(timings) / wall if wall else 0.0,
+            "p50_ms": statistics.median(timings) * 1000 if timings else 0.0,
+            "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000 if timings else 0.0,
+        }
+        self.stdout.write(json.dumps(result))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.summary import rebuild_all_summaries, rebuild_event_summary
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-event sales summaries from bookings (nightly drift correction)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            type=int,
+            action="append",
+            dest="events",
+            help="Only rebuild this event id (repeatable)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep rebuilding every N seconds (0 = run once)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            if options["events"]:
+                for event_id in options["events"]:
+                    rebuild_event_summary(event_id)
+                count = len(options["events"])
+            else:
+                count = rebuild_all_summaries()
+
+            self.stdout.write(f"Rebuilt sales summaries for {count} events")
+
+            if not interval:
+                break
+            time.sleep(interval)
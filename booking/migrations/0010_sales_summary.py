@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-19 04:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_alter_bookingcontact_phone_number_and_more'),
+        ('events', '0007_event_location_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSalesSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_bookings', models.PositiveIntegerField(default=0)),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('seats_total', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sales_summary', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'event sales summary',
+                'verbose_name_plural': 'event sales summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='SectionSalesSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=50)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('tickets_sold', models.PositiveIntegerField(default=0)),
+                ('seats_total', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='section_sales', to='events.event')),
+            ],
+            options={
+                'ordering': ['section'],
+                'constraints': [models.UniqueConstraint(fields=('event', 'section'), name='unique_section_sales_per_event')],
+            },
+        ),
+    ]
@@ -169,4 +169,65 @@ class Ticket(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Ticket {self.ticket_id} - {self.event.name}"
\ No newline at end of file
+        return f"Ticket {self.ticket_id} - {self.event.name}"
+
+
+# ============================================================
+# SALES SUMMARY (maintained by booking.summary)
+# ============================================================
+class EventSalesSummary(models.Model):
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="sales_summary"
+    )
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_bookings = models.PositiveIntegerField(default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+    seats_total = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "event sales summary"
+        verbose_name_plural = "event sales summaries"
+
+    def __str__(self):
+        return f"Sales for {self.event_id}"
+
+    @property
+    def occupancy(self):
+        if not self.seats_total:
+            return 0
+        return round(100 * self.tickets_sold / self.seats_total, 1)
+
+
+class SectionSalesSummary(models.Model):
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="section_sales"
+    )
+    section = models.CharField(max_length=50)
+    # List value of the sold seats (seat price, or event price if unset)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+    seats_total = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["section"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "section"],
+                name="unique_section_sales_per_event",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.section} sales for {self.event_id}"
+
+    @property
+    def occupancy(self):
+        if not self.seats_total:
+            return 0
+        return round(100 * self.tickets_sold / self.seats_total, 1)
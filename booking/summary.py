@@ -0,0 +1,203 @@
+# booking/summary.py
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, NullIf
+
+from events.models import Event, Seat
+from .models import Booking, EventSalesSummary, SectionSalesSummary
+
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def _seat_value(prefix=""):
+    """A seat's own price, or the event price when the seat has none."""
+    return Coalesce(
+        NullIf(F(f"{prefix}price"), Value(Decimal("0"))),
+        F(f"{prefix}event__price"),
+        output_field=MONEY,
+    )
+
+
+def _bump(field, delta):
+    # Clamp at zero so drift can never violate the unsigned columns;
+    # the nightly rebuild corrects any drift.
+    return Greatest(F(field) + delta, Value(0))
+
+
+# =====================================================
+# INCREMENTAL
+# =====================================================
+def _create_missing_rows(event_id):
+    """
+    Zeroed summary rows for the event and each of its sections. A
+    concurrent first sale may insert the same rows; the conflicting insert
+    is skipped, and each sale then adds only its own delta.
+    """
+    capacity = dict(
+        Seat.objects.filter(event_id=event_id)
+        .order_by().values("section").annotate(n=Count("id"))
+        .values_list("section", "n")
+    )
+    EventSalesSummary.objects.bulk_create(
+        [EventSalesSummary(event_id=event_id, seats_total=sum(capacity.values()))],
+        ignore_conflicts=True,
+    )
+    SectionSalesSummary.objects.bulk_create(
+        [
+            SectionSalesSummary(event_id=event_id, section=section, seats_total=total)
+            for section, total in capacity.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _apply(booking, sign):
+    sections = list(
+        booking.seats
+        .order_by()
+        .values("section")
+        .annotate(sold=Count("id"), revenue=Sum(_seat_value()))
+    )
+    tickets = sum(row["sold"] for row in sections)
+
+    def bump_event():
+        return EventSalesSummary.objects.filter(event_id=booking.event_id).update(
+            revenue=_bump("revenue", sign * booking.total_price),
+            paid_bookings=_bump("paid_bookings", sign),
+            tickets_sold=_bump("tickets_sold", sign * tickets),
+        )
+
+    def bump_section(row):
+        return SectionSalesSummary.objects.filter(
+            event_id=booking.event_id,
+            section=row["section"],
+        ).update(
+            revenue=_bump("revenue", sign * (row["revenue"] or 0)),
+            tickets_sold=_bump("tickets_sold", sign * row["sold"]),
+        )
+
+    with transaction.atomic():
+        # Always deltas, never a rebuild: a rebuild here could not see a
+        # concurrent sale's uncommitted booking and would drop it
+        if not bump_event():
+            # First sale for this event
+            _create_missing_rows(booking.event_id)
+            bump_event()
+
+        for row in sections:
+            if not bump_section(row):
+                # Section added since the rows were created
+                _create_missing_rows(booking.event_id)
+                bump_section(row)
+
+
+def record_booking_paid(booking):
+    """Add a booking that just became paid to its event's summary."""
+    _apply(booking, 1)
+
+
+def record_booking_released(booking):
+    """Remove a previously paid booking from its event's summary."""
+    _apply(booking, -1)
+
+
+# =====================================================
+# FULL REBUILD
+# =====================================================
+def _compute(event_ids=None):
+    events = Event.objects.all()
+    seats = Seat.objects.all()
+    paid = Booking.objects.filter(is_paid=True)
+    sold = Seat.objects.filter(bookings__is_paid=True)
+
+    if event_ids is not None:
+        events = events.filter(id__in=event_ids)
+        seats = seats.filter(event_id__in=event_ids)
+        paid = paid.filter(event_id__in=event_ids)
+        sold = sold.filter(event_id__in=event_ids)
+
+    totals = {
+        row["event"]: row for row in
+        paid.order_by().values("event")
+        .annotate(revenue=Sum("total_price"), bookings=Count("id"))
+    }
+    tickets = dict(
+        sold.order_by().values("event").annotate(n=Count("id"))
+        .values_list("event", "n")
+    )
+    capacity = dict(
+        seats.order_by().values("event").annotate(n=Count("id"))
+        .values_list("event", "n")
+    )
+
+    section_capacity = {
+        (row["event"], row["section"]): row["n"] for row in
+        seats.order_by().values("event", "section").annotate(n=Count("id"))
+    }
+    section_sold = {
+        (row["event"], row["section"]): row for row in
+        sold.order_by().values("event", "section")
+        .annotate(n=Count("id"), revenue=Sum(_seat_value()))
+    }
+
+    event_rows = [
+        EventSalesSummary(
+            event_id=event_id,
+            revenue=totals.get(event_id, {}).get("revenue") or 0,
+            paid_bookings=totals.get(event_id, {}).get("bookings") or 0,
+            tickets_sold=tickets.get(event_id, 0),
+            seats_total=capacity.get(event_id, 0),
+        )
+        for event_id in events.values_list("id", flat=True)
+    ]
+
+    section_rows = [
+        SectionSalesSummary(
+            event_id=event_id,
+            section=section,
+            revenue=section_sold.get((event_id, section), {}).get("revenue") or 0,
+            tickets_sold=section_sold.get((event_id, section), {}).get("n") or 0,
+            seats_total=section_capacity.get((event_id, section), 0),
+        )
+        for event_id, section in section_capacity.keys() | section_sold.keys()
+    ]
+
+    return event_rows, section_rows
+
+
+def _rebuild(event_ids=None):
+    event_rows, section_rows = _compute(event_ids)
+
+    with transaction.atomic():
+        EventSalesSummary.objects.bulk_create(
+            event_rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["event"],
+            update_fields=[
+                "revenue", "paid_bookings", "tickets_sold",
+                "seats_total", "updated_at",
+            ],
+        )
+
+        stale = SectionSalesSummary.objects.all()
+        if event_ids is not None:
+            stale = stale.filter(event_id__in=event_ids)
+        stale.delete()
+        SectionSalesSummary.objects.bulk_create(section_rows, batch_size=500)
+
+    return len(event_rows)
+
+
+def rebuild_event_summary(event_id):
+    """Recompute one event's summary rows from bookings and seats."""
+    return _rebuild([event_id])
+
+
+def rebuild_all_summaries():
+    """Nightly drift correction: recompute every event with a few aggregates."""
+    return _rebuild()
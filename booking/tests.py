@@ -1,3 +1,211 @@
-from django.test import TestCase
+import json
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetTestCase, make_events, make_user
+from events.models import Seat
+
+from .models import (
+    Booking, BookingContact, EventSalesSummary, SectionSalesSummary, Ticket,
+)
+from .summary import (
+    rebuild_all_summaries, record_booking_paid, record_booking_released,
+)
+from .views import scan_ticket
+
+
+def _gateway_response():
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"payment_session_id": "session_test"}
+    return response
+
+
+class SalesSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("fan")
+        # 6 seats: North and South at the event price (150), VIP at 250
+        cls.event = make_events(1, seats_per_event=6)[0]
+        cls.seats = list(Seat.objects.filter(event=cls.event).order_by("id"))
+
+    def book(self, *seats):
+        booking = Booking.objects.create(
+            user=self.user,
+            event=self.event,
+            num_tickets=len(seats),
+            total_price=sum(seat.price or self.event.price for seat in seats),
+            is_paid=True,
+        )
+        booking.seats.set(seats)
+        return booking
+
+    def summary(self):
+        event = EventSalesSummary.objects.get(event=self.event)
+        sections = {
+            row.section: (row.tickets_sold, row.revenue, row.seats_total)
+            for row in SectionSalesSummary.objects.filter(event=self.event)
+        }
+        return (event.paid_bookings, event.tickets_sold, event.revenue, event.seats_total), sections
+
+    def test_first_sale_creates_rows_from_its_own_delta(self):
+        first = self.book(self.seats[0], self.seats[2])
+        # Paid concurrently; its transaction has not reached the summary yet
+        second = self.book(self.seats[1])
+
+        record_booking_paid(first)
+        self.assertEqual(self.summary()[0], (1, 2, Decimal("400.00"), 6))
+
+        record_booking_paid(second)
+        self.assertEqual(self.summary(), (
+            (2, 3, Decimal("550.00"), 6),
+            {
+                "North": (1, Decimal("150.00"), 2),
+                "South": (1, Decimal("150.00"), 2),
+                "VIP": (1, Decimal("250.00"), 2),
+            },
+        ))
+
+    def test_release_subtracts_and_rebuild_agrees(self):
+        kept = self.book(self.seats[0])
+        released = self.book(self.seats[1], self.seats[2])
+        record_booking_paid(kept)
+        record_booking_paid(released)
+
+        Booking.objects.filter(id=released.id).update(is_paid=False)
+        record_booking_released(released)
+        incremental = self.summary()
+        self.assertEqual(incremental[0], (1, 1, Decimal("150.00"), 6))
+
+        rebuild_all_summaries()
+        self.assertEqual(self.summary(), incremental)
+
+
+class BookingQueryBudgetTests(QueryBudgetTestCase):
+    """Query budgets for every URL in booking.urls, for a regular fan."""
+
+    urlconf_namespace = "booking"
+
+    BOOKINGS = 15
+    SEATS_PER_BOOKING = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("fan")
+        cls.events = make_events(3, seats_per_event=120)
+        cls.event = cls.events[0]
+
+        cls.contact = BookingContact.objects.create(
+            user=cls.user,
+            full_name="Meena Devi",
+            email="fan@example.com",
+            phone_number="9876543210",
+        )
+
+        seats = list(Seat.objects.filter(event=cls.event).order_by("id"))
+        for number in range(cls.BOOKINGS):
+            mine = seats[number * cls.SEATS_PER_BOOKING:(number + 1) * cls.SEATS_PER_BOOKING]
+            booking = Booking.objects.create(
+                user=cls.user,
+                event=cls.event,
+                num_tickets=len(mine),
+                total_price=cls.event.price * len(mine),
+                contact=cls.contact,
+                payment_status=Booking.PAYMENT_SUCCESSFUL,
+                is_paid=True,
+            )
+            booking.seats.set(mine)
+            Ticket.objects.bulk_create([
+                Ticket(user=cls.user, event=cls.event, seat=seat, booking_ref=str(booking.id))
+                for seat in mine
+            ])
+
+        cls.booking = booking
+        cls.ticket = Ticket.objects.filter(booking_ref=str(booking.id)).first()
+        cls.pending = Booking.objects.create(
+            user=cls.user,
+            event=cls.events[1],
+            num_tickets=2,
+            total_price=cls.events[1].price * 2,
+            contact=cls.contact,
+        )
+        cls.pending.seats.set(Seat.objects.filter(event=cls.events[1])[:2])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    # -------------------------------------------------
+    # Booking flow
+    # -------------------------------------------------
+    def test_book_event(self):
+        url = reverse("booking:book_event", args=[self.event.id])
+        self.assertBudget("GET", url, queries=2)
+        self.assertBudget("POST", url, queries=3, status=302, data={"num_tickets": 2})
+
+    def test_select_seats(self):
+        url = reverse("booking:select_seats", args=[self.pending.id])
+        self.assertBudget("GET", url, queries=5)
+
+    def test_add_booking_contact(self):
+        url = reverse("booking:add_booking_contact", args=[self.pending.id])
+        self.assertBudget("GET", url, queries=3)
+
+    @mock.patch("booking.views.requests.post", return_value=_gateway_response())
+    def test_process_payment(self, _post):
+        url = reverse("booking:process_payment", args=[self.pending.id])
+        self.assertBudget("GET", url, queries=5)
+
+    def test_cashfree_webhook(self):
+        Booking.objects.filter(id=self.pending.id).update(cashfree_order_id="cf_booking_test")
+        payload = {
+            "type": "PAYMENT_SUCCESS_WEBHOOK",
+            "data": {
+                "order": {"order_id": "cf_booking_test"},
+                "payment": {"payment_status": "SUCCESS", "cf_payment_id": 7},
+            },
+        }
+        self.assertBudget(
+            "POST", reverse("booking:cashfree_webhook"), queries=21,
+            data=json.dumps(payload), content_type="application/json",
+        )
+        self.assertEqual(Ticket.objects.filter(booking_ref=str(self.pending.id)).count(), 2)
+
+    def test_payment_success(self):
+        url = reverse("booking:payment_success", args=[self.booking.id])
+        self.assertBudget("GET", url, queries=2)
+
+    def test_payment_failed(self):
+        url = reverse("booking:payment_failed", args=[self.pending.id])
+        self.assertBudget("GET", url, queries=2)
+
+    # -------------------------------------------------
+    # Tickets
+    # -------------------------------------------------
+    def test_booking_detail(self):
+        url = reverse("booking:booking_detail", args=[self.booking.id])
+        self.assertBudget("GET", url, queries=4)
+
+    def test_download_ticket(self):
+        url = reverse("booking:download_ticket", args=[self.ticket.ticket_id])
+        self.assertBudget("GET", url, queries=2, seconds=5.0)
+
+    def test_scan_ticket(self):
+        # Not routed in booking.urls; exercised directly
+        request = RequestFactory().post("/scan/", {"ticket_id": str(self.ticket.ticket_id)})
+        with self.assertNumQueries(2):
+            response = async_to_sync(scan_ticket)(request)
+        self.assertEqual(json.loads(response.content)["status"], "VALID")
+
+        response = async_to_sync(scan_ticket)(request)
+        self.assertEqual(json.loads(response.content)["status"], "INVALID")
+
+    def test_every_url_has_a_budget(self):
+        self.assertAllUrlsCovered([
+            "book_event", "select_seats", "add_booking_contact",
+            "process_payment", "cashfree_webhook", "payment_success",
+            "payment_failed", "booking_detail", "download_ticket",
+        ])
@@ -1,8 +1,9 @@
-import qrcode
 from io import BytesIO
 
 
 def generate_ticket_qr(ticket):
+    import qrcode  # only ticket downloads need it
+
     data = f"TICKET:{ticket.ticket_id}"
     qr = qrcode.make(data)
 
@@ -3,13 +3,14 @@
 import json
 import uuid
 import logging
-import requests
+import time
 from itertools import groupby
 from operator import attrgetter
 from io import BytesIO
 from django.http import Http404
 
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
@@ -18,19 +19,28 @@ from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.urls import reverse
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader   # ✅ REQUIRED
-
+from core.cache import tiered_cache, versioned_key
+from core.lazy import lazy_import
+from core.routers import replica_view
+from core.shortcuts import arender
+from core.metrics import (
+    GATEWAY_ERRORS, PDF_RENDER, TICKET_SCANS, WEBHOOK_LATENCY, gateway_call,
+)
 from events.models import Event, Seat
 from .models import Booking, ShippingAddress, BookingContact, Ticket
 from .forms import ShippingAddressForm, BookingContactForm
+from .summary import record_booking_paid
 from .utils import generate_ticket_qr
 
 
 
 logger = logging.getLogger(__name__)
 
+# Only the payment views call the gateway
+requests = lazy_import("requests")
+
+SEAT_MAP_CACHE_TIMEOUT = 60 * 10
+
 # =====================================================
 # 1) BOOK EVENT
 # =====================================================
@@ -58,6 +68,24 @@ def book_event_view(request, event_id):
 # =====================================================
 # 2) SELECT SEATS
 # =====================================================
+def seat_map(event_id):
+    """[(section, [(row, [seat, ...]), ...]), ...] for an event, cached."""
+    def build():
+        seats = Seat.objects.filter(event_id=event_id).order_by("section", "row_number")
+        grouped = []
+        for section, sec_group in groupby(seats, key=attrgetter("section")):
+            rows = []
+            for row, row_group in groupby(sec_group, key=attrgetter("row_number")):
+                rows.append((row, list(row_group)))
+            grouped.append((section, rows))
+        return grouped
+
+    # Single-flight: an on-sale's seat map is rebuilt once, not per request
+    return tiered_cache.get_or_build(
+        versioned_key(f"seats:{event_id}", "map"), build, SEAT_MAP_CACHE_TIMEOUT
+    )
+
+
 @login_required
 def select_seats_view(request, booking_id):
     booking = get_object_or_404(Booking, id=booking_id, user=request.user)
@@ -77,21 +105,15 @@ def select_seats_view(request, booking_id):
 
         return redirect("booking:add_booking_contact", booking_id=booking.id)
 
-    seats = Seat.objects.filter(event=event).order_by("section", "row_number")
-    grouped = []
-    for section, sec_group in groupby(seats, key=attrgetter("section")):
-        rows = []
-        for row, row_group in groupby(sec_group, key=attrgetter("row_number")):
-            rows.append((row, list(row_group)))
-        grouped.append((section, rows))
-
     return render(
         request,
         "booking/select_seats.html",
         {
             "booking": booking,
             "event": event,
-            "seats_by_section_and_row": grouped,
+            "seats_by_section_and_row": seat_map(event.id),
+            # One query, not a booking.seats lookup per seat in the map
+            "selected_seat_ids": set(booking.seats.values_list("id", flat=True)),
         },
     )
 
@@ -180,16 +202,20 @@ def process_payment_view(request, booking_id):
         "Content-Type": "application/json",
     }
 
-    res = requests.post(
-        f"{settings.CASHFREE_BASE_URL}/orders",
-        json=payload,
-        headers=headers,
-        timeout=10,
-    )
+    with gateway_call("booking_create_order"):
+        res = requests.post(
+            f"{settings.CASHFREE_BASE_URL}/orders",
+            json=payload,
+            headers=headers,
+            timeout=10,
+        )
 
     data = res.json()
 
     if res.status_code != 200 or "payment_session_id" not in data:
+        GATEWAY_ERRORS.inc(
+            operation="booking_create_order", reason=f"http_{res.status_code}"
+        )
         messages.error(request, "Payment initiation failed")
         return redirect("booking:booking_detail", booking_id=booking.id)
 
@@ -204,9 +230,39 @@ def process_payment_view(request, booking_id):
     )
 # =====================================================
 # 5) CASHFREE WEBHOOK
-@csrf_exempt
 @transaction.atomic
-def cashfree_webhook(request):
+def _complete_booking_payment(booking, payment):
+    """Mark ``booking`` paid and issue its tickets; False if already done."""
+    # Conditional update: concurrent webhook retries cannot both pass
+    claimed = Booking.objects.filter(id=booking.id, is_paid=False).update(
+        is_paid=True,
+        payment_status=Booking.PAYMENT_SUCCESSFUL,
+        cashfree_payment_id=str(payment.get("cf_payment_id")),
+    )
+    if not claimed:
+        return False
+
+    # The conditional update above runs once per booking, so the tickets
+    # cannot exist yet
+    Ticket.objects.bulk_create([
+        Ticket(
+            user_id=booking.user_id,
+            event_id=booking.event_id,
+            seat=seat,
+            booking_ref=str(booking.id),
+        )
+        for seat in booking.seats.all()
+    ])
+
+    record_booking_paid(booking)
+    return True
+
+
+@csrf_exempt
+@WEBHOOK_LATENCY.time(webhook="booking")
+async def cashfree_webhook(request):
+    # Async, so gateway retries and duplicates cost no worker thread
+    # until there is work to do; the transaction itself runs in one
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
@@ -233,24 +289,11 @@ def cashfree_webhook(request):
     if not order_id:
         return JsonResponse({"status": "missing order id"}, status=400)
 
-    booking = get_object_or_404(Booking, cashfree_order_id=order_id)
+    booking = await aget_object_or_404(Booking, cashfree_order_id=order_id)
 
-    if booking.is_paid:
+    if not await sync_to_async(_complete_booking_payment)(booking, payment):
         return JsonResponse({"status": "already processed"})
 
-    booking.is_paid = True
-    booking.payment_status = Booking.PAYMENT_SUCCESSFUL
-    booking.cashfree_payment_id = str(payment.get("cf_payment_id"))
-    booking.save()
-
-    for seat in booking.seats.all():
-        Ticket.objects.get_or_create(
-            user=booking.user,
-            event=booking.event,
-            seat=seat,
-            booking_ref=str(booking.id),
-        )
-
     logger.warning(f"✅ BOOKING {booking.id} MARKED AS PAID")
 
     return JsonResponse({"status": "success"})
@@ -261,19 +304,23 @@ def cashfree_webhook(request):
 # 6) BOOKING DETAIL
 # =====================================================
 @login_required
-def booking_detail_view(request, booking_id):
-    booking = get_object_or_404(
-        Booking,
+@replica_view
+async def booking_detail_view(request, booking_id):
+    user = await request.auser()
+    booking = await aget_object_or_404(
+        Booking.objects.select_related("user", "event").prefetch_related("seats"),
         id=booking_id,
-        user=request.user
+        user=user
     )
 
-    tickets = Ticket.objects.filter(
-        booking_ref=str(booking.id),
-        user=request.user
-    )
+    tickets = [
+        ticket async for ticket in Ticket.objects.filter(
+            booking_ref=str(booking.id),
+            user=user
+        ).select_related("seat")
+    ]
 
-    return render(
+    return await arender(
         request,
         "booking/booking_detail.html",
         {
@@ -288,8 +335,18 @@ def booking_detail_view(request, booking_id):
 # =====================================================
 @login_required
 def download_ticket(request, ticket_id):
-    ticket = get_object_or_404(Ticket, ticket_id=ticket_id, user=request.user)
+    ticket = get_object_or_404(
+        Ticket.objects.select_related("event", "seat"),
+        ticket_id=ticket_id,
+        user=request.user,
+    )
+
+    # Heavy and only needed here; loaded on the first download
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
 
+    render_started = time.perf_counter()
     buffer = BytesIO()
     p = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
@@ -367,6 +424,7 @@ def download_ticket(request, ticket_id):
     p.showPage()
     p.save()
     buffer.seek(0)
+    PDF_RENDER.observe(time.perf_counter() - render_started, document="ticket")
 
     response = HttpResponse(buffer, content_type="application/pdf")
     response["Content-Disposition"] = (
@@ -380,16 +438,26 @@ def download_ticket(request, ticket_id):
 # 8) QR SCAN ENDPOINT
 # =====================================================
 @csrf_exempt
-def scan_ticket(request):
+async def scan_ticket(request):
+    # Async: gate scanners burst at kick-off, and each scan is two
+    # short queries
     ticket_id = request.POST.get("ticket_id")
 
-    ticket = get_object_or_404(Ticket, ticket_id=ticket_id)
+    ticket = await aget_object_or_404(
+        Ticket.objects.select_related("event", "seat"), ticket_id=ticket_id
+    )
+
+    # Conditional update: two scanners reading the same QR code at once
+    # cannot both admit it
+    admitted = await Ticket.objects.filter(
+        id=ticket.id, is_used=False
+    ).aupdate(is_used=True)
 
-    if ticket.is_used:
+    if not admitted:
+        TICKET_SCANS.inc(result="invalid")
         return JsonResponse({"status": "INVALID"})
 
-    ticket.is_used = True
-    ticket.save(update_fields=["is_used"])
+    TICKET_SCANS.inc(result="valid")
 
     return JsonResponse({
         "status": "VALID",
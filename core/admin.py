@@ -1,3 +1,19 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Job, OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("to_email", "subject", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to_email", "subject")
+    readonly_fields = ("claim_token", "last_error", "created_at", "sent_at")
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task_name", "queue", "priority", "status", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "queue")
+    search_fields = ("task_name",)
+    readonly_fields = ("locked_by", "locked_at", "last_error", "created_at", "finished_at")
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+def install_sql_timer(sender, connection, **kwargs):
+    from .timing import sql_timer
+
+    # Fires again on reconnect; the wrapper list outlives the connection
+    if sql_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_timer)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Every connection, in whichever thread opens it, feeds the
+        # per-request SQL timings
+        connection_created.connect(install_sql_timer, dispatch_uid="core_sql_timer")
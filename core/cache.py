@@ -0,0 +1,344 @@
+# core/cache.py
+#
+# Two cache tiers: a small in-process LRU in front of the shared
+# backend (CACHES["default"]: Redis in production). Keys are namespaced
+# and versioned, so an entry's value never changes once written and the
+# local tier can keep it; bumping a namespace (from model signals)
+# switches every reader to fresh keys. Version tokens themselves are
+# only held locally for CACHE_VERSION_TTL seconds. Hot pages that also
+# go stale with time use get_or_build(), which rebuilds a key in place,
+# once for all processes, before or just after it expires.
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_MISSING = object()
+
+# What get_or_build() stores: the value, how long it took to build and
+# when (wall clock, shared by every process) it is due for a rebuild
+_Built = namedtuple("_Built", "value delta expires")
+
+# How often a request waiting on another builder looks for its result
+_COALESCE_POLL_SECONDS = 0.025
+
+
+def _due(entry):
+    """
+    Whether to rebuild ``entry`` now. Probabilistic early refresh
+    (XFetch): the closer to expiry and the slower the build, the likelier
+    one request rebuilds ahead of time, so hot keys rarely expire at all.
+    """
+    jitter = -math.log(1.0 - random.random())
+    early = entry.delta * settings.CACHE_EARLY_REFRESH_BETA * jitter
+    return time.time() + early >= entry.expires
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded in-process cache with per-entry expiry."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache:
+    """
+    Local LRU first, then the shared backend. Only use it for keys from
+    versioned_key(): the local tier is never told about changes made by
+    other processes. Cached values are shared between requests of this
+    process and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.local = LocalLRU(settings.CACHE_LOCAL_MAX_ENTRIES)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _local_timeout(self, timeout):
+        local = settings.CACHE_LOCAL_TIMEOUT
+        return local if timeout is None else min(timeout, local)
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+
+        self._count("shared_hits")
+        self.local.set(key, value, settings.CACHE_LOCAL_TIMEOUT)
+        return value
+
+    def set(self, key, value, timeout=None):
+        cache.set(key, value, timeout)
+        self.local.set(key, value, self._local_timeout(timeout))
+
+    async def aget(self, key, default=None):
+        """get() for async views; local hits never leave the event loop."""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._count("local_hits")
+            return value
+
+        value = await cache.aget(key, _MISSING)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+
+        self._count("shared_hits")
+        self.local.set(key, value, settings.CACHE_LOCAL_TIMEOUT)
+        return value
+
+    async def aset(self, key, value, timeout=None):
+        await cache.aset(key, value, timeout)
+        self.local.set(key, value, self._local_timeout(timeout))
+
+    def get_or_set(self, key, compute, timeout=None):
+        """Return the cached value, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, timeout)
+        return value
+
+    # -------------------------------------------------
+    # Single-flight builds
+    # -------------------------------------------------
+    def get_or_build(self, key, build, timeout):
+        """
+        get_or_set() for hot values that are expensive to build. One
+        caller at a time rebuilds a key, holding a lock in the shared
+        tier; meanwhile the others get the previous value, kept for
+        CACHE_STALE_SECONDS past its expiry, or, when there is none, wait
+        up to CACHE_COALESCE_WAIT_SECONDS for the builder's result.
+        """
+        entry = self.get(key)
+        if entry is not None and not _due(entry):
+            return entry.value
+        if entry is not None:
+            # Another process may have rebuilt it since this one cached it
+            shared = cache.get(key)
+            if shared is not None and not _due(shared):
+                self.local.set(key, shared, self._local_timeout(timeout))
+                return shared.value
+
+        lock_key = f"{key}:building"
+        if cache.add(lock_key, 1, settings.CACHE_BUILD_LOCK_SECONDS):
+            try:
+                return self._build(key, build, timeout)
+            finally:
+                cache.delete(lock_key)
+
+        if entry is not None:
+            self._count("coalesced")
+            return entry.value
+
+        deadline = time.monotonic() + settings.CACHE_COALESCE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(_COALESCE_POLL_SECONDS)
+            # A builder in this process also fills the local tier: no
+            # unpickling a copy per waiting thread
+            entry = self.local.get(key)
+            if entry is _MISSING:
+                entry = cache.get(key)
+                if entry is not None:
+                    self.local.set(key, entry, self._local_timeout(timeout))
+            if entry is not None:
+                self._count("coalesced")
+                return entry.value
+
+        # The builder is stuck or gone; don't keep the request waiting
+        return self._build(key, build, timeout)
+
+    def _build(self, key, build, timeout):
+        started = time.perf_counter()
+        value = build()
+        self._store(key, value, time.perf_counter() - started, timeout)
+        return value
+
+    async def aget_or_build(self, key, build, timeout):
+        """get_or_build() for async views; ``build`` is a coroutine function."""
+        entry = await self.aget(key)
+        if entry is not None and not _due(entry):
+            return entry.value
+        if entry is not None:
+            shared = await cache.aget(key)
+            if shared is not None and not _due(shared):
+                self.local.set(key, shared, self._local_timeout(timeout))
+                return shared.value
+
+        lock_key = f"{key}:building"
+        if await cache.aadd(lock_key, 1, settings.CACHE_BUILD_LOCK_SECONDS):
+            try:
+                return await self._abuild(key, build, timeout)
+            finally:
+                await cache.adelete(lock_key)
+
+        if entry is not None:
+            self._count("coalesced")
+            return entry.value
+
+        deadline = time.monotonic() + settings.CACHE_COALESCE_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_COALESCE_POLL_SECONDS)
+            entry = self.local.get(key)
+            if entry is _MISSING:
+                entry = await cache.aget(key)
+                if entry is not None:
+                    self.local.set(key, entry, self._local_timeout(timeout))
+            if entry is not None:
+                self._count("coalesced")
+                return entry.value
+
+        return await self._abuild(key, build, timeout)
+
+    async def _abuild(self, key, build, timeout):
+        started = time.perf_counter()
+        value = await build()
+        self._store(key, value, time.perf_counter() - started, timeout)
+        return value
+
+    def _store(self, key, value, delta, timeout):
+        self._count("builds")
+        entry = _Built(value, delta, time.time() + timeout)
+        # Kept past its expiry so it can be served while being rebuilt
+        physical = timeout + settings.CACHE_STALE_SECONDS
+        cache.set(key, entry, physical)
+        self.local.set(key, entry, self._local_timeout(physical))
+
+    def delete(self, key):
+        cache.delete(key)
+        self.local.delete(key)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                "local_hits": 0, "shared_hits": 0, "misses": 0,
+                "builds": 0, "coalesced": 0,
+            }
+
+    def stats(self):
+        """Hit/miss counters of this process since start (or reset)."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            (stats["local_hits"] + stats["shared_hits"]) / lookups
+            if lookups else 0.0
+        )
+        stats["local_entries"] = len(self.local)
+        return stats
+
+
+tiered_cache = TwoTierCache()
+
+
+# =====================================================
+# NAMESPACES
+# =====================================================
+def _version_key(namespace):
+    return f"ns:{namespace}:version"
+
+
+def namespace_version(namespace):
+    """Current version token of a cache namespace."""
+    key = _version_key(namespace)
+    version = tiered_cache.local.get(key)
+    if version is not _MISSING:
+        return version
+
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+
+    tiered_cache.local.set(key, version, settings.CACHE_VERSION_TTL)
+    return version
+
+
+async def anamespace_version(namespace):
+    """namespace_version() for async views."""
+    key = _version_key(namespace)
+    version = tiered_cache.local.get(key)
+    if version is not _MISSING:
+        return version
+
+    version = await cache.aget(key)
+    if version is None:
+        version = time.time_ns()
+        await cache.aadd(key, version, None)
+        version = await cache.aget(key, version)
+
+    tiered_cache.local.set(key, version, settings.CACHE_VERSION_TTL)
+    return version
+
+
+def bump_namespace(namespace):
+    """
+    Invalidate every key in a namespace at once. Old entries are never
+    read again and simply age out of both tiers.
+    """
+    key = _version_key(namespace)
+    version = time.time_ns()
+    cache.set(key, version, None)
+    tiered_cache.local.set(key, version, settings.CACHE_VERSION_TTL)
+
+
+def versioned_key(namespace, *parts):
+    """Build a key that changes whenever the namespace is bumped."""
+    suffix = ":".join(str(part) for part in parts)
+    return f"{namespace}:{namespace_version(namespace)}:{suffix}"
+
+
+async def aversioned_key(namespace, *parts):
+    """versioned_key() for async views."""
+    suffix = ":".join(str(part) for part in parts)
+    return f"{namespace}:{await anamespace_version(namespace)}:{suffix}"
@@ -0,0 +1,180 @@
+# core/images.py
+
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_init, post_save
+
+from .cache import bump_namespace
+
+
+RENDITION_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+# Per model label: the core.cache namespace its cached pages live in
+_cache_namespaces = {}
+
+
+def rendition_name(name, width, ext):
+    """events/cricket.jpg -> events/renditions/cricket_320.webp"""
+    folder, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(folder, "renditions", f"{stem}_{width}.{ext}")
+
+
+def stored_renditions(renditions):
+    """
+    {width: {ext: name}} from an ``image_renditions`` value. The names are
+    the ones storage.save() returned (Cloudinary adds a suffix and drops
+    the extension), so they cannot be rebuilt from the original's name.
+    """
+    return {
+        entry["width"]: entry
+        for entry in renditions or ()
+        # Older rows kept bare widths; those get rebuilt
+        if isinstance(entry, dict)
+    }
+
+
+def rendition_url(fieldfile, renditions, width, ext="jpg"):
+    """
+    URL of the smallest stored rendition at least ``width`` wide, falling
+    back to the largest one, then to the original. Never touches storage.
+    """
+    if not fieldfile:
+        return ""
+    stored = stored_renditions(renditions)
+    if not stored:
+        return fieldfile.url
+
+    fitting = [w for w in stored if w >= width]
+    chosen = min(fitting) if fitting else max(stored)
+    return fieldfile.storage.url(stored[chosen][ext])
+
+
+def srcset(fieldfile, renditions, ext="webp"):
+    """'url 320w, url 640w, ...' for the stored renditions."""
+    if not fieldfile:
+        return ""
+    stored = stored_renditions(renditions)
+    storage = fieldfile.storage
+    return ", ".join(
+        f"{storage.url(stored[width][ext])} {width}w"
+        for width in sorted(stored)
+    )
+
+
+# =====================================================
+# GENERATION
+# =====================================================
+def build_renditions(fieldfile):
+    """
+    Write resized WebP and JPEG copies next to the original and return
+    one {"width": ..., "webp": name, "jpg": name} entry per width, with
+    the names storage saved them under. Images are never upscaled.
+    """
+    # Pillow only in the job worker: every web worker imports this module
+    from PIL import Image, ImageOps
+
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, "rb") as fh:
+        original = Image.open(fh)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    renditions = []
+    for width in sorted(settings.IMAGE_RENDITION_WIDTHS):
+        if width >= original.width and renditions:
+            break
+
+        target = min(width, original.width)
+        height = max(1, round(original.height * target / original.width))
+        resized = original.resize((target, height), Image.LANCZOS)
+
+        entry = {"width": width}
+        for ext, (fmt, options) in RENDITION_FORMATS.items():
+            image = resized
+            if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+
+            buffer = BytesIO()
+            image.save(buffer, fmt, **options)
+
+            name = rendition_name(fieldfile.name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            entry[ext] = storage.save(name, ContentFile(buffer.getvalue()))
+
+        renditions.append(entry)
+
+    return renditions
+
+
+def render_model_image(model_label, pk, field_name="image"):
+    """Job body: build renditions for one object and record their names."""
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+
+    fieldfile = getattr(instance, field_name)
+    renditions = build_renditions(fieldfile) if fieldfile else []
+
+    # Guard against the image having been replaced meanwhile
+    updated = model.objects.filter(pk=pk, **{field_name: fieldfile.name}).update(
+        image_renditions=renditions
+    )
+
+    # update() sends no post_save: drop the cached pages showing the original
+    namespace = _cache_namespaces.get(model._meta.label)
+    if updated and namespace:
+        bump_namespace(namespace)
+
+
+# =====================================================
+# WIRING
+# =====================================================
+def track_image_renditions(model, field_name="image", cache_namespace=None):
+    """
+    Queue rendition generation whenever ``field_name`` of ``model`` is
+    saved with a new file. The model needs an ``image_renditions`` field.
+    ``cache_namespace`` is bumped once the renditions are stored.
+    """
+    from .tasks import generate_renditions_task
+
+    _cache_namespaces[model._meta.label] = cache_namespace
+
+    def _raw_name(instance):
+        # Read __dict__ directly: touching a deferred field would cost a query
+        value = instance.__dict__.get(field_name)
+        return getattr(value, "name", value)
+
+    def remember(sender, instance, **kwargs):
+        instance._original_image_name = _raw_name(instance)
+
+    def on_save(sender, instance, created, raw=False, **kwargs):
+        if raw or field_name not in instance.__dict__:
+            return
+
+        name = _raw_name(instance)
+        if not created and name == getattr(instance, "_original_image_name", None):
+            return
+        instance._original_image_name = name
+
+        if instance.image_renditions:
+            sender.objects.filter(pk=instance.pk).update(image_renditions=[])
+            instance.image_renditions = []
+
+        if name:
+            generate_renditions_task.delay(
+                model._meta.label, instance.pk, field_name
+            )
+
+    post_init.connect(remember, sender=model, weak=False)
+    post_save.connect(on_save, sender=model, weak=False)
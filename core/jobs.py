@@ -0,0 +1,276 @@
+# core/jobs.py
+#
+# A small job queue on the project database: no broker needed.
+# Tasks are declared with @task (or the Celery-style alias shared_task)
+# and enqueued with .delay() / .apply_async(); `manage.py run_jobs`
+# starts the worker processes.
+
+import logging
+import os
+import signal
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class Retry(Exception):
+    """Raised by Task.retry() to reschedule the running job."""
+
+    def __init__(self, exc=None, countdown=None):
+        self.exc = exc
+        self.countdown = countdown
+        super().__init__(str(exc) if exc else "retry requested")
+
+
+# =====================================================
+# TASKS
+# =====================================================
+class Task:
+    """
+    Wraps a function so it can be called inline or enqueued as a Job.
+    Mirrors the parts of Celery's task API the project uses.
+    """
+
+    def __init__(self, func, name=None, queue="default", priority=0,
+                 max_retries=None, retry_backoff=None, bind=False):
+        self.func = func
+        self.name = name or f"{func.__module__}.{func.__qualname__}"
+        self.queue = queue
+        self.priority = priority
+        self.max_retries = (
+            settings.JOBS_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.retry_backoff = (
+            settings.JOBS_RETRY_BACKOFF_SECONDS
+            if retry_backoff is None else retry_backoff
+        )
+        self.bind = bind
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        if self.bind:
+            return self.func(self, *args, **kwargs)
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.apply_async(args=args, kwargs=kwargs)
+
+    def apply_async(self, args=None, kwargs=None, countdown=None, eta=None,
+                    priority=None, queue=None):
+        """
+        Insert the job row. Inside a transaction the job only becomes
+        visible to workers if that transaction commits.
+        """
+        run_at = eta or timezone.now()
+        if countdown:
+            run_at += timedelta(seconds=countdown)
+
+        return Job.objects.create(
+            task_name=self.name,
+            args=list(args or ()),
+            kwargs=dict(kwargs or {}),
+            queue=queue or self.queue,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_retries + 1,
+            run_at=run_at,
+        )
+
+    def retry(self, exc=None, countdown=None):
+        raise Retry(exc, countdown)
+
+
+def task(func=None, **options):
+    """Declare a job task: ``@task`` or ``@task(queue="pdf", priority=5)``."""
+    def register(f):
+        wrapped = Task(f, **options)
+        _registry[wrapped.name] = wrapped
+        return wrapped
+
+    return register(func) if func is not None else register
+
+
+# Drop-in for ``from celery import shared_task``
+shared_task = task
+
+
+def get_task(name):
+    if name not in _registry:
+        autodiscover_modules("tasks")
+    if name not in _registry:
+        found = import_string(name)
+        if not isinstance(found, Task):
+            found = Task(found, name=name)
+        _registry[name] = found
+    return _registry[name]
+
+
+# =====================================================
+# CLAIMING
+# =====================================================
+def _due(queues):
+    return Job.objects.filter(
+        queue__in=queues,
+        status=Job.STATUS_QUEUED,
+        run_at__lte=timezone.now(),
+    ).order_by("-priority", "run_at", "id")
+
+
+def claim_job(queues, worker_id):
+    """
+    Take the most urgent due job, or return None.
+
+    PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers
+    never wait on or double-claim a row. SQLite has no row locks; there
+    the claim is a compare-and-set UPDATE on status and a worker that
+    loses the race simply tries the next candidate.
+    """
+    now = timezone.now()
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _due(queues).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = Job.STATUS_RUNNING
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.attempts += 1
+            job.save(update_fields=[
+                "status", "locked_by", "locked_at", "attempts"
+            ])
+            return job
+
+    for _ in range(5):
+        candidate = _due(queues).values_list("id", flat=True).first()
+        if candidate is None:
+            return None
+
+        won = Job.objects.filter(
+            id=candidate,
+            status=Job.STATUS_QUEUED,
+        ).update(
+            status=Job.STATUS_RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if won:
+            return Job.objects.get(id=candidate)
+    return None
+
+
+def requeue_stale_jobs(timeout=None):
+    """Return jobs held by a worker that died mid-run to the queue."""
+    timeout = timeout or settings.JOBS_STALE_SECONDS
+    return Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=Job.STATUS_QUEUED, locked_by="", locked_at=None)
+
+
+# =====================================================
+# EXECUTION
+# =====================================================
+def run_job(job):
+    """Execute one claimed job and record the outcome."""
+    try:
+        get_task(job.task_name)(*job.args, **job.kwargs)
+    except Exception as exc:
+        countdown = getattr(exc, "countdown", None)
+        error = getattr(exc, "exc", None) or exc
+
+        job.last_error = f"{type(error).__name__}: {error}"[:2000]
+        job.locked_by = ""
+        job.locked_at = None
+
+        if job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+            logger.exception("Job %s (%s) failed for good", job.id, job.task_name)
+        else:
+            if countdown is None:
+                task_obj = _registry.get(job.task_name)
+                base = task_obj.retry_backoff if task_obj else settings.JOBS_RETRY_BACKOFF_SECONDS
+                countdown = base * 2 ** (job.attempts - 1)
+            job.status = Job.STATUS_QUEUED
+            job.run_at = timezone.now() + timedelta(seconds=countdown)
+            logger.warning(
+                "Job %s (%s) retry %s in %ss: %s",
+                job.id, job.task_name, job.attempts, countdown, error,
+            )
+
+        job.save(update_fields=[
+            "status", "last_error", "locked_by", "locked_at",
+            "run_at", "finished_at",
+        ])
+        return False
+
+    Job.objects.filter(id=job.id).update(
+        status=Job.STATUS_DONE,
+        finished_at=timezone.now(),
+        locked_by="",
+        locked_at=None,
+    )
+    return True
+
+
+class Worker:
+    """
+    Claim-and-run loop for one process. Every JOBS_REQUEUE_SECONDS it also
+    returns jobs stuck on a crashed worker to the queue, so they do not
+    wait for the next restart.
+    """
+
+    def __init__(self, queues=("default",), poll_interval=None, burst=False):
+        self.queues = list(queues)
+        self.poll_interval = poll_interval or settings.JOBS_POLL_SECONDS
+        self.requeue_interval = settings.JOBS_REQUEUE_SECONDS
+        self.burst = burst
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = False
+
+    def stop(self, *args):
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        autodiscover_modules("tasks")
+
+        processed = 0
+        next_requeue = 0.0
+        while not self._stopping:
+            close_old_connections()
+
+            if time.monotonic() >= next_requeue:
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    logger.warning("Requeued %s stale jobs", requeued)
+                next_requeue = time.monotonic() + self.requeue_interval
+
+            job = claim_job(self.queues, self.worker_id)
+
+            if job is None:
+                if self.burst:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            run_job(job)
+            processed += 1
+
+        return processed
@@ -0,0 +1,23 @@
+# core/lazy.py
+
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Return module ``name`` without executing it until an attribute is
+    first read (importlib.util.LazyLoader). Keeps heavy dependencies of
+    a few endpoints out of every worker's boot, while module-level
+    names like ``requests.post`` stay patchable in tests.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
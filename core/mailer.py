@@ -0,0 +1,224 @@
+# core/mailer.py
+
+import logging
+import time
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# QUEUE
+# =====================================================
+def _build(to_email, subject, template_name, context=None, html_template_name=""):
+    return OutboundEmail(
+        to_email=to_email,
+        subject=subject,
+        template_name=template_name,
+        html_template_name=html_template_name,
+        context=context or {},
+    )
+
+
+def queue_email(to_email, subject, template_name, context=None, html_template_name=""):
+    """
+    Queue one email. ``context`` must be JSON-serializable; the templates
+    are rendered by the mailer worker, not on the request path.
+    """
+    email = _build(to_email, subject, template_name, context, html_template_name)
+    email.save()
+    return email
+
+
+def queue_emails(messages):
+    """
+    Queue many emails with a single bulk insert. ``messages`` yields dicts
+    with the keyword arguments of queue_email.
+    """
+    return OutboundEmail.objects.bulk_create(
+        [_build(**message) for message in messages],
+        batch_size=500,
+    )
+
+
+# =====================================================
+# RENDER
+# =====================================================
+@lru_cache(maxsize=64)
+def _template(name):
+    # Compiled once per worker process; templates only change on deploy
+    return get_template(name)
+
+
+def _render(email):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=_template(email.template_name).render(email.context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email],
+    )
+    if email.html_template_name:
+        message.attach_alternative(
+            _template(email.html_template_name).render(email.context),
+            "text/html",
+        )
+    return message
+
+
+# =====================================================
+# DRAIN
+# =====================================================
+def _claim(batch_size):
+    """
+    Atomically take up to ``batch_size`` due emails. The claim token makes
+    concurrent drainers skip rows another worker already grabbed; losing
+    every row of a pick to one means looking again, not an empty outbox.
+    Returns [] only when nothing is due.
+    """
+    token = uuid.uuid4()
+    while True:
+        due_ids = list(
+            OutboundEmail.objects
+            .filter(
+                status=OutboundEmail.STATUS_QUEUED,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not due_ids:
+            return []
+
+        claimed = OutboundEmail.objects.filter(
+            id__in=due_ids,
+            status=OutboundEmail.STATUS_QUEUED,
+        ).update(
+            status=OutboundEmail.STATUS_SENDING,
+            claim_token=token,
+            # Doubles as the claim time while the row is "sending"
+            next_attempt_at=timezone.now(),
+        )
+        if claimed:
+            return list(OutboundEmail.objects.filter(claim_token=token))
+
+
+def _fail(email, error):
+    """Schedule a retry with exponential backoff, or give up."""
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+
+    if email.attempts >= settings.MAILER_MAX_ATTEMPTS:
+        email.status = OutboundEmail.STATUS_FAILED
+        logger.error("Giving up on email %s: %s", email.id, error)
+    else:
+        delay = settings.MAILER_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+        email.status = OutboundEmail.STATUS_QUEUED
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+
+    email.save(update_fields=[
+        "attempts", "last_error", "status", "next_attempt_at"
+    ])
+
+
+def _reopen(connection):
+    """A failed send can leave the SMTP session unusable: start a new one."""
+    try:
+        connection.close()
+    except Exception:
+        pass
+    try:
+        connection.open()
+    except Exception as exc:
+        # send_messages() opens it again on the next email
+        logger.warning("Mail connection did not reopen: %s", exc)
+
+
+def _send_batch(connection, batch):
+    """
+    Send one claimed batch message by message over the reused connection;
+    returns (sent, failed). Each email is marked sent as soon as the server
+    accepts it, so a failure later in the batch never resends it.
+    """
+    sent = 0
+    failed = 0
+    for email in batch:
+        try:
+            message = _render(email)
+        except Exception as exc:
+            # A broken template will not fix itself: no retries
+            email.attempts = settings.MAILER_MAX_ATTEMPTS - 1
+            _fail(email, exc)
+            failed += 1
+            continue
+
+        try:
+            connection.send_messages([message])
+        except Exception as exc:
+            _fail(email, exc)
+            failed += 1
+            _reopen(connection)
+            continue
+
+        OutboundEmail.objects.filter(id=email.id).update(
+            status=OutboundEmail.STATUS_SENT,
+            sent_at=timezone.now(),
+            claim_token=None,
+        )
+        sent += 1
+
+    return sent, failed
+
+
+def drain_outbox(batch_size=None, max_batches=None, connection=None):
+    """
+    Send queued emails in batches over one reused mail connection until
+    the queue has nothing due. Returns throughput stats.
+    """
+    batch_size = batch_size or settings.MAILER_BATCH_SIZE
+    connection = connection or get_connection()
+
+    stats = {"sent": 0, "failed": 0, "batches": 0}
+    started = time.perf_counter()
+
+    connection.open()
+    try:
+        while max_batches is None or stats["batches"] < max_batches:
+            batch = _claim(batch_size)
+            if not batch:
+                break
+
+            sent, failed = _send_batch(connection, batch)
+            stats["sent"] += sent
+            stats["failed"] += failed
+            stats["batches"] += 1
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    stats["per_second"] = stats["sent"] / elapsed if elapsed else 0.0
+
+    if stats["batches"]:
+        logger.info(
+            "Mailer sent %(sent)s, failed %(failed)s in %(batches)s batches "
+            "(%(per_second).1f/s)", stats
+        )
+    return stats
+
+
+def release_stale_claims(older_than=timedelta(minutes=15)):
+    """Put back emails a crashed worker claimed but never finished."""
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENDING,
+        next_attempt_at__lt=timezone.now() - older_than,
+    ).update(status=OutboundEmail.STATUS_QUEUED, claim_token=None)
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SERVERS = ("wsgi", "asgi")
+DEFAULT_PATHS = ("/events/", "/store/shop/")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)] * 1000 if timings else 0.0
+
+
+async def _load(base_url, paths, concurrency, duration):
+    """``concurrency`` clients requesting ``paths`` in turn for ``duration`` s."""
+    timings = []
+    errors = 0
+    # Served as if behind the TLS-terminating proxy, like production
+    headers = {"X-Forwarded-Proto": "https"}
+
+    async def client(offset, session, deadline):
+        nonlocal errors
+        number = offset
+        while time.perf_counter() < deadline:
+            path = paths[number % len(paths)]
+            number += 1
+            t0 = time.perf_counter()
+            try:
+                async with session.get(base_url + path, allow_redirects=False) as response:
+                    await response.read()
+                    ok = response.status < 400
+            except aiohttp.ClientError:
+                ok = False
+            if ok:
+                timings.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        # Warm caches and connections; not counted
+        for path in paths:
+            async with session.get(base_url + path) as response:
+                await response.read()
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            client(offset, session, deadline) for offset in range(concurrency)
+        ))
+        wall = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "seconds": wall,
+        "per_second": len(timings) / wall if wall else 0.0,
+        "p50_ms": statistics.median(timings) * 1000 if timings else 0.0,
+        "p95_ms": _percentile(timings, 0.95),
+        "p99_ms": _percentile(timings, 0.99),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare gunicorn (WSGI) and uvicorn (ASGI) throughput and latency "
+        "on a freshly seeded database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            action="append",
+            dest="servers",
+            help="wsgi or asgi (repeatable; defaults to both)",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="URL path to request (repeatable; defaults to /events/ and /store/shop/)",
+        )
+        parser.add_argument("--workers", type=int, default=2,
+                            help="Server processes")
+        parser.add_argument("--threads", type=int, default=4,
+                            help="Threads per gunicorn worker")
+        parser.add_argument("--concurrency", type=int, default=64,
+                            help="Concurrent client connections")
+        parser.add_argument("--duration", type=float, default=10.0,
+                            help="Seconds of load per server")
+        parser.add_argument("--scale", type=float, default=0.01,
+                            help="seed_synthetic_data --scale for the database")
+
+    def handle(self, *args, **options):
+        servers = options["servers"] or list(SERVERS)
+        unknown = set(servers) - set(SERVERS)
+        if unknown:
+            raise CommandError(f"Unknown server '{unknown.pop()}'")
+        paths = options["paths"] or list(DEFAULT_PATHS)
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            env = self._env(tmp)
+            self._prepare_database(env, options["scale"])
+            for server in servers:
+                results.append(self._run_server(server, env, paths, options))
+
+        self.stdout.write(
+            f"\n{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'errors':>8}"
+        )
+        for server, result in zip(servers, results):
+            self.stdout.write(
+                f"{server:<8}{result['per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+                f"{result['p99_ms']:>10.1f}{result['errors']:>8}"
+            )
+        self.stdout.write(json.dumps(dict(zip(servers, results))))
+
+    # -------------------------------------------------
+    # Database shared by both servers
+    # -------------------------------------------------
+    def _env(self, tmp):
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.sqlite3'}"
+        # No uploads are involved; keep image URLs off the network
+        env["MEDIA_STORAGE_BACKEND"] = "django.core.files.storage.FileSystemStorage"
+        # Seeded events have no images; their placeholder is not in the manifest
+        env["STATIC_STORAGE_BACKEND"] = "django.contrib.staticfiles.storage.StaticFilesStorage"
+        env.pop("METRICS_DIR", None)
+        return env
+
+    def _prepare_database(self, env, scale):
+        manage = [sys.executable, str(settings.BASE_DIR / "manage.py")]
+        self.stdout.write("Migrating and seeding")
+        subprocess.run(manage + ["migrate", "--no-input", "-v", "0"], env=env, check=True)
+        subprocess.run(
+            manage + ["seed_synthetic_data", "--scale", str(scale), "-v", "0"],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    # -------------------------------------------------
+    # One server at a time
+    # -------------------------------------------------
+    def _command(self, server, port, options):
+        if server == "wsgi":
+            return [
+                sys.executable, "-m", "gunicorn", "rural_sports.wsgi:application",
+                "--bind", f"127.0.0.1:{port}",
+                "--workers", str(options["workers"]),
+                "--worker-class", "gthread",
+                "--threads", str(options["threads"]),
+            ]
+        return [
+            sys.executable, "-m", "uvicorn", "rural_sports.asgi:application",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(options["workers"]),
+            "--no-access-log",
+        ]
+
+    def _run_server(self, server, env, paths, options):
+        port = _free_port()
+        self.stdout.write(f"{server}: starting")
+        # Per-request log lines would measure the terminal, not the server
+        process = subprocess.Popen(
+            self._command(server, port, options),
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self._wait_until_listening(process, port)
+            self.stdout.write(f"{server}: running")
+            return asyncio.run(_load(
+                f"http://127.0.0.1:{port}",
+                paths,
+                options["concurrency"],
+                options["duration"],
+            ))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def _wait_until_listening(self, process, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited with status {process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server did not listen on port {port} within {timeout}s")
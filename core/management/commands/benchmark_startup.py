@@ -0,0 +1,117 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# What a web worker does before its first response: load the WSGI app
+# (django.setup(), middleware) and the URLconf with every view module
+BOOT = (
+    "import json, sys\n"
+    "import rural_sports.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+    # core.lazy modules sit in sys.modules unexecuted until first use
+    "print(json.dumps(sorted(\n"
+    "    name for name, module in sys.modules.items()\n"
+    "    if type(module).__name__ != '_LazyModule'\n"
+    ")))\n"
+)
+
+# Needed by a few endpoints or by background jobs only; loaded on first use
+HEAVY_MODULES = ("celery", "PIL", "qrcode", "reportlab", "requests")
+
+
+def _boot(importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    started = time.perf_counter()
+    run = subprocess.run(
+        command + ["-c", BOOT],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, run
+
+
+def parse_importtime(stderr):
+    """Self import time in µs per top-level package, from -X importtime output."""
+    packages = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        packages[name.strip().split(".")[0]] += int(self_us)
+    return packages
+
+
+def boot_profile():
+    """Import breakdown of one worker boot and the heavy modules it loaded."""
+    _, run = _boot(importtime=True)
+    loaded = set(json.loads(run.stdout))
+    return {
+        "packages": parse_importtime(run.stderr),
+        "heavy_loaded": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Time web-worker startup in fresh interpreters and break import "
+        "time down by package; fails above --max-ms or when a heavy module "
+        "is imported at boot"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5,
+                            help="Timed boots (the median is reported)")
+        parser.add_argument("--max-ms", type=float, default=1500.0,
+                            help="Fail when the median boot exceeds this")
+        parser.add_argument("--top", type=int, default=15,
+                            help="Packages to list by import time")
+
+    def handle(self, *args, **options):
+        # Warm the bytecode and OS file caches: restarts are warm too
+        _boot()
+        timings = sorted(_boot()[0] for _ in range(options["runs"]))
+        median_ms = statistics.median(timings) * 1000
+
+        profile = boot_profile()
+        packages = profile["packages"]
+        import_ms = sum(packages.values()) / 1000
+
+        self.stdout.write(f"{'package':<24}{'import ms':>10}")
+        for name, self_us in packages.most_common(options["top"]):
+            self.stdout.write(f"{name:<24}{self_us / 1000:>10.1f}")
+        self.stdout.write(
+            f"\nboot: median {median_ms:.0f} ms, min {timings[0] * 1000:.0f} ms "
+            f"over {len(timings)} runs; imports {import_ms:.0f} ms "
+            f"({len(packages)} packages)"
+        )
+        self.stdout.write(json.dumps({
+            "median_ms": median_ms,
+            "min_ms": timings[0] * 1000,
+            "import_ms": import_ms,
+            "heavy_loaded": profile["heavy_loaded"],
+        }))
+
+        if profile["heavy_loaded"]:
+            raise CommandError(
+                "Imported at boot, should load on first use: "
+                + ", ".join(profile["heavy_loaded"])
+            )
+        if median_ms > options["max_ms"]:
+            raise CommandError(
+                f"Worker boot took {median_ms:.0f} ms, budget is "
+                f"{options['max_ms']:.0f} ms"
+            )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.tasks import generate_renditions_task
+from events.models import Event
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Queue rendition jobs for event and product images that have none yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Rebuild renditions even where they exist")
+
+    def handle(self, *args, **options):
+        queued = 0
+        for model in (Event, Product):
+            objects = model.objects.exclude(image="").exclude(image__isnull=True)
+            if not options["all"]:
+                objects = objects.filter(image_renditions=[])
+
+            for pk in objects.values_list("pk", flat=True).iterator():
+                generate_renditions_task.delay(model._meta.label, pk, "image")
+                queued += 1
+
+        self.stdout.write(f"Queued {queued} rendition jobs")
@@ -0,0 +1,60 @@
+import multiprocessing
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import Worker
+
+
+def _work(queues, burst):
+    django.setup()
+    Worker(queues=queues, burst=burst).run()
+
+
+class Command(BaseCommand):
+    help = "Run background job workers against the database queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to consume (repeatable, default: default)",
+        )
+        parser.add_argument("--concurrency", type=int, default=1,
+                            help="Number of worker processes")
+        parser.add_argument("--burst", action="store_true",
+                            help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        queues = options["queues"] or ["default"]
+        concurrency = max(1, options["concurrency"])
+        burst = options["burst"]
+
+        if concurrency == 1:
+            processed = Worker(queues=queues, burst=burst).run()
+            self.stdout.write(f"Processed {processed} jobs")
+            return
+
+        # Each worker process opens its own database connection
+        connections.close_all()
+
+        workers = [
+            multiprocessing.Process(target=_work, args=(queues, burst))
+            for _ in range(concurrency)
+        ]
+        for process in workers:
+            process.start()
+        self.stdout.write(
+            f"Started {concurrency} workers on {', '.join(queues)}"
+        )
+
+        try:
+            for process in workers:
+                process.join()
+        except KeyboardInterrupt:
+            for process in workers:
+                process.terminate()
+            for process in workers:
+                process.join()
@@ -0,0 +1,444 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from booking.models import Booking, Ticket
+from booking.summary import rebuild_all_summaries
+from core.cache import bump_namespace
+from events.models import Event, Seat, normalize_location
+from store.models import Address, Cart, CartItem, Order, OrderItem, OrderStatusHistory, Product
+
+
+# Production-scale defaults; --scale shrinks or grows all of them at once
+DEFAULTS = {
+    "users": 100_000,
+    "products": 200,
+    "events": 500,
+    "seats_per_event": 2_400,
+    "tickets": 1_000_000,
+    "orders": 300_000,
+}
+
+USERNAME_PREFIX = "synth_"
+PASSWORD = "synthetic"
+
+SECTIONS = ("North", "South", "East", "West", "VIP")
+SEATS_PER_ROW = 25
+VIP_PRICE = Decimal("500.00")
+
+TOWNS = (
+    "Madurai", "Erode", "Karur", "Hosur", "Salem", "Nashik", "Sangli",
+    "Satara", "Hubli", "Mandya", "Dharwad", "Ongole", "Nalgonda", "Bathinda",
+    "Moga", "Sikar", "Jhunjhunu", "Rewari", "Hisar", "Karnal",
+)
+STATES = ("Tamil Nadu", "Maharashtra", "Karnataka", "Andhra Pradesh",
+          "Telangana", "Punjab", "Rajasthan", "Haryana")
+CATEGORIES = [value for value, _ in Event.CATEGORY_CHOICES]
+PRODUCT_KINDS = ("Cricket bat", "Football", "Volleyball net", "Kabaddi mat",
+                 "Jersey", "Shin guard", "Stumps set", "Water bottle")
+
+ORDER_STATUSES = (
+    ("DELIVERED", 50), ("SHIPPED", 15), ("PROCESSING", 15),
+    ("PENDING", 10), ("CANCELLED", 10),
+)
+PAYMENT_FOR_STATUS = {"PENDING": "PENDING", "CANCELLED": "FAILED"}
+
+BookingSeat = Booking.seats.through
+
+# Tables filled by _insert(), whose primary key sequences need a reset
+RAW_MODELS = (
+    User, Address, Cart, CartItem, Seat, Booking, BookingSeat, Ticket,
+    Order, OrderItem, OrderStatusHistory,
+)
+
+
+def _row_label(index):
+    """0 -> 'A', 25 -> 'Z', 26 -> 'AA' ..."""
+    label = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        label = chr(ord("A") + rest) + label
+    return label
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill an empty database with deterministic synthetic users, events, seat "
+        "maps, bookings, tickets, orders and carts for benchmarks and profiling. "
+        f"Every synthetic user has the password '{PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiply every default count, e.g. 0.01 for a quick local dataset",
+        )
+        for name, default in DEFAULTS.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                dest=name,
+                help=f"Override the scaled count (default {default:,})",
+            )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed: the same seed generates the same rows",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Rows per executemany() call",
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            name: options[name] if options[name] is not None
+            else max(1, round(default * options["scale"]))
+            for name, default in DEFAULTS.items()
+        }
+        # Seat maps stay realistic under --scale; only the event count shrinks
+        if options["seats_per_event"] is None:
+            counts["seats_per_event"] = DEFAULTS["seats_per_event"]
+
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError(
+                "Synthetic data is already present; seed a fresh database "
+                "(manage.py flush) instead"
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        # Timestamps are relative to today, so reruns on the same day are identical
+        self.today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        started = time.perf_counter()
+        self.user_ids = self._step("users", self._seed_users, counts["users"])
+        self.products = self._step("products", self._seed_products, counts["products"])
+        self.events = self._step(
+            "events", self._seed_events, counts["events"], counts["seats_per_event"],
+            counts["tickets"],
+        )
+        self.address_ids = self._step("addresses", self._seed_addresses)
+        self._step("orders", self._seed_orders, counts["orders"])
+        self._step("carts", self._seed_carts)
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), RAW_MODELS):
+                cursor.execute(sql)
+
+        # Raw inserts skip the signals that keep these up to date
+        self._step("sales summaries", rebuild_all_summaries)
+        for namespace in ("events", "shop"):
+            bump_namespace(namespace)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded synthetic data in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _step(self, label, seed, *args):
+        started = time.perf_counter()
+        result = seed(*args)
+        rows = result if isinstance(result, int) else len(result)
+        self.stdout.write(
+            f"{label:<16} {rows:>10,} rows  {time.perf_counter() - started:7.1f}s"
+        )
+        return result
+
+    def _ago(self, max_days):
+        return self.today - timedelta(seconds=self.rng.randrange(max_days * 86_400))
+
+    # -------------------------------------------------
+    # Raw inserts
+    # -------------------------------------------------
+    def _reserve_ids(self, model, count):
+        """Primary keys for ``count`` new rows, assigned up front."""
+        start = (model.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        return range(start, start + count)
+
+    def _insert(self, model, columns, rows):
+        """
+        executemany() INSERT of value tuples in ``columns`` order. Several
+        times faster than bulk_create() at millions of rows, since no model
+        instances are built; in exchange every non-null column (including
+        auto_now_add ones) must be listed.
+        """
+        # The wrapper itself, not the thread-local django.db.connection proxy
+        # that every value would otherwise be prepared through
+        db = connections[DEFAULT_DB_ALIAS]
+        fields = [model._meta.get_field(name) for name in columns]
+        quote = db.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(model._meta.db_table),
+            ", ".join(quote(field.column) for field in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        prepare = [field.get_db_prep_save for field in fields]
+
+        with db.cursor() as cursor:
+            for chunk in _chunks(rows, self.batch_size):
+                cursor.executemany(sql, [
+                    [prep(value, db) for prep, value in zip(prepare, row)]
+                    for row in chunk
+                ])
+        return len(rows)
+
+    def _insert_new(self, model, columns, rows):
+        """_insert() for rows nothing else references: primary keys added here."""
+        ids = self._reserve_ids(model, len(rows))
+        return self._insert(
+            model, ("id", *columns), [(pk, *row) for pk, row in zip(ids, rows)]
+        )
+
+    # -------------------------------------------------
+    # Users & catalogue
+    # -------------------------------------------------
+    def _seed_users(self, count):
+        # Hashed once: hashing 100k passwords would take longer than all the rest
+        password = make_password(PASSWORD)
+        user_ids = self._reserve_ids(User, count)
+        with transaction.atomic():
+            self._insert(
+                User,
+                ("id", "password", "is_superuser", "username", "first_name",
+                 "last_name", "email", "is_staff", "is_active", "date_joined"),
+                [
+                    (user_id, password, False, f"{USERNAME_PREFIX}{number:07d}",
+                     f"Fan{number}", "", f"{USERNAME_PREFIX}{number:07d}@example.com",
+                     False, True, self._ago(730))
+                    for number, user_id in enumerate(user_ids)
+                ],
+            )
+        return list(user_ids)
+
+    def _seed_products(self, count):
+        rng = self.rng
+        return Product.objects.bulk_create([
+            Product(
+                name=f"{PRODUCT_KINDS[number % len(PRODUCT_KINDS)]} {number}",
+                description="Synthetic catalogue item",
+                price=Decimal(rng.randrange(99, 4999)),
+                stock=rng.randrange(0, 500),
+                is_active=rng.random() > 0.05,
+            )
+            for number in range(count)
+        ])
+
+    # -------------------------------------------------
+    # Events, seats, bookings & tickets
+    # -------------------------------------------------
+    def _seed_events(self, count, seats_per_event, tickets):
+        rng = self.rng
+        events = []
+        for number in range(count):
+            location = f"{rng.choice(TOWNS)} Ground {number % 7 + 1}"
+            events.append(Event(
+                name=f"{rng.choice(TOWNS)} {rng.choice(CATEGORIES).title()} Cup {number}",
+                description="Synthetic village tournament",
+                location=location,
+                location_normalized=normalize_location(location),
+                category=rng.choice(CATEGORIES),
+                date=self.today + timedelta(days=rng.randint(-180, 180), hours=rng.randint(8, 20)),
+                price=Decimal(rng.choice((50, 100, 150, 200, 300))),
+                available_tickets=seats_per_event,
+            ))
+        events = Event.objects.bulk_create(events)
+
+        # Spread the tickets evenly; no event can sell more seats than it has
+        per_event, extra = divmod(tickets, count)
+        for index, event in enumerate(events):
+            sold = min(per_event + (index < extra), seats_per_event)
+            with transaction.atomic():
+                self._seed_event_sales(event, seats_per_event, sold)
+        return events
+
+    def _seed_event_sales(self, event, seats_per_event, sold):
+        rng = self.rng
+        # Sold seats in purchase order
+        purchases = rng.sample(range(seats_per_event), sold)
+        sold_indexes = set(purchases)
+
+        seat_ids = self._reserve_ids(Seat, seats_per_event)
+        per_section = -(-seats_per_event // len(SECTIONS))
+        prices = []
+        seats = []
+        for index, seat_id in enumerate(seat_ids):
+            section = SECTIONS[index // per_section]
+            prices.append(VIP_PRICE if section == "VIP" else event.price)
+            seats.append((
+                seat_id, event.id, section,
+                VIP_PRICE if section == "VIP" else Decimal("0"),
+                _row_label(index % per_section // SEATS_PER_ROW),
+                index % per_section % SEATS_PER_ROW + 1,
+                index in sold_indexes,
+            ))
+        self._insert(
+            Seat,
+            ("id", "event", "section", "price", "row_number", "seat_number", "is_sold"),
+            seats,
+        )
+        Event.objects.filter(id=event.id).update(available_tickets=seats_per_event - sold)
+
+        # Consecutive purchases grouped into bookings of 1-6 seats
+        groups = []
+        start = 0
+        while start < sold:
+            size = rng.randint(1, 6)
+            groups.append(purchases[start:start + size])
+            start += size
+
+        booking_ids = self._reserve_ids(Booking, len(groups))
+        bookings = []
+        booking_seats = []
+        tickets = []
+        for number, (booking_id, group) in enumerate(zip(booking_ids, groups)):
+            user_id = rng.choice(self.user_ids)
+            booked = min(event.date, self.today) - timedelta(minutes=rng.randrange(60 * 24 * 60))
+            bookings.append((
+                booking_id, user_id, event.id, len(group),
+                sum(prices[index] for index in group), booked,
+                f"synth_booking_{event.id}_{number}", f"synth_{rng.getrandbits(40)}",
+                Booking.PAYMENT_SUCCESSFUL, True,
+            ))
+            for index in group:
+                booking_seats.append((booking_id, seat_ids[index]))
+                tickets.append((
+                    uuid.UUID(int=rng.getrandbits(128), version=4), user_id, event.id,
+                    seat_ids[index], str(booking_id),
+                    event.date < self.today and rng.random() < 0.8, booked,
+                ))
+
+        self._insert(
+            Booking,
+            ("id", "user", "event", "num_tickets", "total_price", "booking_date",
+             "cashfree_order_id", "cashfree_payment_id", "payment_status", "is_paid"),
+            bookings,
+        )
+        self._insert_new(BookingSeat, ("booking", "seat"), booking_seats)
+        self._insert_new(
+            Ticket,
+            ("ticket_id", "user", "event", "seat", "booking_ref", "is_used", "created_at"),
+            tickets,
+        )
+
+    # -------------------------------------------------
+    # Store
+    # -------------------------------------------------
+    def _seed_addresses(self):
+        rng = self.rng
+        # Six in ten users have ever checked out
+        owners = [user_id for user_id in self.user_ids if rng.random() < 0.6]
+        address_ids = dict(zip(owners, self._reserve_ids(Address, len(owners))))
+        with transaction.atomic():
+            self._insert(
+                Address,
+                ("id", "user", "full_name", "address_line_1", "city", "state",
+                 "postal_code", "country", "phone_number"),
+                [
+                    (address_id, user_id, f"Fan {user_id}",
+                     f"{rng.randint(1, 400)} Temple Street", rng.choice(TOWNS),
+                     rng.choice(STATES), str(rng.randint(500000, 699999)), "India",
+                     f"9{rng.randint(0, 999_999_999):09d}")
+                    for user_id, address_id in address_ids.items()
+                ],
+            )
+        return address_ids
+
+    def _seed_orders(self, count):
+        rng = self.rng
+        buyers = list(self.address_ids)
+        if not buyers:
+            return 0
+        statuses = [status for status, _ in ORDER_STATUSES]
+        weights = [weight for _, weight in ORDER_STATUSES]
+
+        orders = []
+        items = []
+        history = []
+        for number, order_id in enumerate(self._reserve_ids(Order, count)):
+            user_id = rng.choice(buyers)
+            status = rng.choices(statuses, weights)[0]
+            created = self._ago(365)
+            basket = [
+                (rng.choice(self.products), rng.randint(1, 3))
+                for _ in range(rng.randint(1, 5))
+            ]
+            orders.append((
+                order_id, user_id, self.address_ids[user_id], created, status,
+                PAYMENT_FOR_STATUS.get(status, "COMPLETED"),
+                sum(product.price * quantity for product, quantity in basket),
+                f"synth_order_{number}",
+                created + timedelta(days=rng.randint(2, 9)) if status == "DELIVERED" else None,
+                False,
+            ))
+            items += [
+                (order_id, product.id, quantity, product.price)
+                for product, quantity in basket
+            ]
+            if status != "PENDING":
+                history.append((
+                    order_id, "PENDING", status,
+                    "payment" if status == "PROCESSING" else "system",
+                    created + timedelta(minutes=5),
+                ))
+
+        with transaction.atomic():
+            self._insert(
+                Order,
+                ("id", "user", "address", "created_at", "order_status", "payment_status",
+                 "total_amount", "payment_gateway_order_id", "delivered_at", "stock_reserved"),
+                orders,
+            )
+            self._insert_new(
+                OrderItem, ("order", "product", "quantity", "price_at_purchase"), items
+            )
+            self._insert_new(
+                OrderStatusHistory,
+                ("order", "from_status", "to_status", "source", "created_at"),
+                history,
+            )
+        return count
+
+    def _seed_carts(self):
+        rng = self.rng
+        # One user in five has something sitting in their cart
+        owners = [user_id for user_id in self.user_ids if rng.random() < 0.2]
+        upcoming = [event for event in self.events if event.date >= self.today]
+
+        carts = []
+        items = []
+        for user_id, cart_id in zip(owners, self._reserve_ids(Cart, len(owners))):
+            updated = self._ago(30)
+            carts.append((cart_id, user_id, updated, updated))
+            products = rng.sample(self.products, min(rng.randint(1, 4), len(self.products)))
+            items += [
+                (cart_id, product.id, None, rng.randint(1, 3))
+                for product in products
+            ]
+            if upcoming and rng.random() < 0.3:
+                items.append((cart_id, None, rng.choice(upcoming).id, 1))
+
+        with transaction.atomic():
+            self._insert(Cart, ("id", "user", "created_at", "updated_at"), carts)
+            self._insert_new(CartItem, ("cart", "product", "event", "quantity"), items)
+        return len(carts)
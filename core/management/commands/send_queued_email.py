@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mailer import drain_outbox, release_stale_claims
+
+
+class Command(BaseCommand):
+    help = "Send queued emails in batches over a single mail connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep draining every N seconds (0 = run once)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            release_stale_claims()
+            stats = drain_outbox(batch_size=options["batch_size"])
+            self.stdout.write(
+                f"Sent {stats['sent']}, failed {stats['failed']} "
+                f"in {stats['batches']} batches, {stats['seconds']:.2f}s "
+                f"({stats['per_second']:.1f} emails/s)"
+            )
+
+            if not interval:
+                break
+            time.sleep(interval)
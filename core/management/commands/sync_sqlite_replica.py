@@ -0,0 +1,55 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+SQLITE_ENGINE = "django.db.backends.sqlite3"
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the SQLite replicas "
+        "(local stand-in for replication)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep copying every N seconds, i.e. the simulated lag (0 = run once)",
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replicas = [
+            settings.DATABASES[alias] for alias in settings.DATABASE_REPLICAS
+            if settings.DATABASES[alias]["ENGINE"] == SQLITE_ENGINE
+        ]
+        if primary["ENGINE"] != SQLITE_ENGINE or not replicas:
+            raise CommandError(
+                "Needs a SQLite primary and at least one SQLite replica "
+                "in DATABASE_REPLICA_URLS"
+            )
+
+        interval = options["interval"]
+        while True:
+            source = sqlite3.connect(primary["NAME"])
+            try:
+                for replica in replicas:
+                    target = sqlite3.connect(replica["NAME"])
+                    try:
+                        # Online backup: consistent snapshot, writers keep going
+                        source.backup(target)
+                    finally:
+                        target.close()
+            finally:
+                source.close()
+
+            self.stdout.write(f"Copied primary to {len(replicas)} replica(s)")
+            if not interval:
+                break
+            time.sleep(interval)
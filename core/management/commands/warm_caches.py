@@ -0,0 +1,118 @@
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from booking.views import seat_map
+from events.models import Event
+from events.views import VALID_CATEGORIES, events_page
+from store.views import shop_page
+
+
+def _walk_pages(build, pages, *args):
+    """Build the first ``pages`` pages of one listing, following its cursors."""
+    cursor = ""
+    built = 0
+    while built < pages:
+        page = async_to_sync(build)(*args, cursor)
+        built += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    return built
+
+
+def _build_seat_map(event_id):
+    seat_map(event_id)
+    return 1
+
+
+def _timed(kind, label, work, *args):
+    started = time.perf_counter()
+    try:
+        count = work(*args)
+    finally:
+        # One connection per pool thread; none may outlive the command
+        connections.close_all()
+    return kind, label, count, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-build cached pages and seat maps for active events and "
+        "products, e.g. right after a deploy"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4,
+                            help="Structures built at once (database connections)")
+        parser.add_argument("--events", type=int, default=100,
+                            help="Seat maps for the soonest N upcoming events")
+        parser.add_argument("--pages", type=int, default=3,
+                            help="Pages per events/shop listing")
+
+    def handle(self, *args, **options):
+        # Web workers only see what lands in a shared backend
+        backend = caches["default"]
+        if isinstance(backend, (LocMemCache, DummyCache)):
+            raise CommandError(
+                f"The default cache ({type(backend).__name__}) is not shared "
+                "with the web workers, so there is nothing to warm; set "
+                "REDIS_URL or CACHE_DIR"
+            )
+
+        started = time.perf_counter()
+
+        jobs = [("shop", "shop", _walk_pages, shop_page, options["pages"])]
+        for category in (None, *sorted(VALID_CATEGORIES)):
+            jobs.append((
+                "events", category or "all",
+                _walk_pages, events_page, options["pages"], category,
+            ))
+
+        # Undated events stay bookable, like the listing's last page
+        upcoming = (
+            Event.objects
+            .filter(is_active=True)
+            .filter(Q(date__gte=timezone.now()) | Q(date__isnull=True))
+            .order_by(F("date").asc(nulls_last=True), "id")
+            .values_list("id", flat=True)[:options["events"]]
+        )
+        for event_id in upcoming:
+            jobs.append(("seat_maps", event_id, _build_seat_map, event_id))
+        connections.close_all()
+
+        totals = defaultdict(lambda: {"warmed": 0, "seconds": 0.0, "slowest": 0.0})
+        with ThreadPoolExecutor(max_workers=max(1, options["concurrency"])) as pool:
+            futures = [pool.submit(_timed, *job) for job in jobs]
+            for future in as_completed(futures):
+                kind, label, count, seconds = future.result()
+                total = totals[kind]
+                total["warmed"] += count
+                total["seconds"] += seconds
+                total["slowest"] = max(total["slowest"], seconds)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{kind} {label}: {count} in {seconds * 1000:.0f} ms")
+
+        wall = time.perf_counter() - started
+
+        self.stdout.write(f"{'structure':<12}{'warmed':>8}{'total s':>10}{'slowest ms':>12}")
+        for kind, total in totals.items():
+            self.stdout.write(
+                f"{kind:<12}{total['warmed']:>8}{total['seconds']:>10.2f}"
+                f"{total['slowest'] * 1000:>12.0f}"
+            )
+        self.stdout.write(
+            f"Warmed {sum(total['warmed'] for total in totals.values())} entries "
+            f"in {wall:.2f}s with concurrency {options['concurrency']}"
+        )
+        self.stdout.write(json.dumps({"seconds": wall, **totals}))
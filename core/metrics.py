@@ -0,0 +1,300 @@
+# core/metrics.py
+#
+# A small Prometheus-style registry: counters and histograms kept in
+# process memory, updated under one lock (a dict lookup and an add on
+# the hot path). With METRICS_DIR set, each process also snapshots its
+# values into its own file there at most every METRICS_FLUSH_SECONDS,
+# and /metrics sums the files of every gunicorn worker, like
+# prometheus_client's multiprocess mode. Files of exited workers are
+# kept so counters never go backwards; clear the directory on deploy.
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+from .timing import timed
+
+
+# Seconds; suits page views and gateway calls alike
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._reset()
+        # A forked worker starts from zero; its parent's values are the parent's
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        # Serializes flushes: one file per process, one writer at a time
+        self._flush_lock = threading.Lock()
+        self._values = {}
+        self._file = None
+        self._next_flush = 0.0
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    # -------------------------------------------------
+    # Hot path
+    # -------------------------------------------------
+    def _inc(self, key, amount):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._maybe_flush()
+
+    def _observe(self, key, bucket, value, size):
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * size, 0.0]
+            entry[0][bucket] += 1
+            entry[1] += value
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if settings.METRICS_DIR and time.monotonic() >= self._next_flush:
+            self.flush()
+
+    # -------------------------------------------------
+    # Multiprocess files
+    # -------------------------------------------------
+    def flush(self):
+        """Write this process's values to its file in METRICS_DIR."""
+        if not settings.METRICS_DIR:
+            return
+        self._next_flush = time.monotonic() + settings.METRICS_FLUSH_SECONDS
+
+        # Not self._lock: the hot path keeps counting while the file is written
+        with self._flush_lock:
+            if self._file is None:
+                directory = Path(settings.METRICS_DIR)
+                directory.mkdir(parents=True, exist_ok=True)
+                # Unique per process lifetime: a recycled pid must not overwrite
+                self._file = directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+
+            # Taken inside the flush lock, so an older snapshot never
+            # replaces a newer one
+            with self._lock:
+                snapshot = [[*key, value] for key, value in self._values.items()]
+
+            tmp = self._file.with_suffix(".tmp")
+            tmp.write_text(json.dumps(snapshot))
+            os.replace(tmp, self._file)
+
+    def _merged(self):
+        """Values of every process (or just this one without METRICS_DIR)."""
+        if not settings.METRICS_DIR:
+            with self._lock:
+                return {
+                    key: [list(value[0]), value[1]] if isinstance(value, list) else value
+                    for key, value in self._values.items()
+                }
+
+        self.flush()
+        merged = {}
+        for path in Path(settings.METRICS_DIR).glob("*.json"):
+            try:
+                rows = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # replaced or half-written mid-read; next scrape has it
+            for name, labels, value in rows:
+                key = (name, tuple(labels))
+                if isinstance(value, list):
+                    current = merged.setdefault(key, [[0] * len(value[0]), 0.0])
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    # -------------------------------------------------
+    # Exposition
+    # -------------------------------------------------
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        values = self._merged()
+        by_metric = {}
+        for (name, labels), value in sorted(values.items()):
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in by_metric.get(name, []):
+                lines += metric.samples(labels, value)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def inc(self, amount=1, **labels):
+        values = tuple(str(labels[name]) for name in self.labelnames)
+        registry._inc((self.name, values), amount)
+
+    def samples(self, labels, value):
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        registry.register(self)
+
+    def observe(self, seconds, **labels):
+        values = tuple(str(labels[name]) for name in self.labelnames)
+        # Index len(buckets) is the +Inf bucket
+        bucket = bisect_left(self.buckets, seconds)
+        registry._observe((self.name, values), bucket, seconds, len(self.buckets) + 1)
+
+    def time(self, **labels):
+        """Observe the duration of a block; also decorates sync and async functions."""
+        return _Timer(self, labels)
+
+    def samples(self, labels, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            le = _format_labels(self.labelnames, labels, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        plain = _format_labels(self.labelnames, labels)
+        lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+        lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self._started, **self.labels)
+
+    def __call__(self, func):
+        # A fresh timer per call: concurrent calls must not share _started
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def timed_async(*args, **kwargs):
+                with _Timer(self.histogram, self.labels):
+                    return await func(*args, **kwargs)
+            return timed_async
+
+        @wraps(func)
+        def timed_sync(*args, **kwargs):
+            with _Timer(self.histogram, self.labels):
+                return func(*args, **kwargs)
+        return timed_sync
+
+
+# =====================================================
+# APPLICATION METRICS
+# =====================================================
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, by URL name.",
+    ("view", "method", "status"),
+)
+GATEWAY_LATENCY = Histogram(
+    "payment_gateway_request_duration_seconds",
+    "Time spent waiting on the payment gateway.",
+    ("operation",),
+)
+GATEWAY_ERRORS = Counter(
+    "payment_gateway_errors_total",
+    "Payment gateway calls that raised or returned an error.",
+    ("operation", "reason"),
+)
+WEBHOOK_LATENCY = Histogram(
+    "payment_webhook_duration_seconds",
+    "Time to process a payment webhook, including its transaction.",
+    ("webhook",),
+)
+TICKET_SCANS = Counter(
+    "ticket_scans_total",
+    "Tickets scanned at the gate; rate() gives scans per second.",
+    ("result",),
+)
+PDF_RENDER = Histogram(
+    "pdf_render_duration_seconds",
+    "Time to draw a PDF document.",
+    ("document",),
+)
+CART_OPERATIONS = Counter(
+    "cart_operations_total",
+    "Items added to or removed from carts.",
+    ("operation", "item"),
+)
+
+
+@contextmanager
+def gateway_call(operation):
+    """
+    Wrap one payment gateway request: charged to the request's "gateway"
+    timing and the latency histogram, with exceptions counted as errors.
+    Error responses are for the caller to count in GATEWAY_ERRORS.
+    """
+    started = time.perf_counter()
+    try:
+        with timed("gateway"):
+            yield
+    except Exception as exc:
+        GATEWAY_ERRORS.inc(operation=operation, reason=type(exc).__name__)
+        raise
+    finally:
+        GATEWAY_LATENCY.observe(time.perf_counter() - started, operation=operation)
@@ -0,0 +1,179 @@
+# core/middleware.py
+
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import REQUEST_LATENCY
+from .routers import track_writes
+from .timing import collect
+
+
+perf_logger = logging.getLogger("core.performance")
+
+
+class PerformanceMiddleware:
+    """
+    Time every request: SQL count and duration, template rendering and
+    gateway calls. Reported in a Server-Timing header, one JSON log
+    line per request and the request latency histogram. With
+    PERF_DETECT_N_PLUS_ONE (debug and tests) it also warns about SQL
+    repeated PERF_N_PLUS_ONE_THRESHOLD times or more.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    # SQL is timed by core.timing.sql_timer, installed on every new
+    # connection (CoreConfig.ready()): under ASGI the ORM runs in worker
+    # threads whose connections this middleware never sees.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        with collect(track_queries=settings.PERF_DETECT_N_PLUS_ONE) as metrics:
+            response = self.get_response(request)
+        return self.report(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with collect(track_queries=settings.PERF_DETECT_N_PLUS_ONE) as metrics:
+            response = await self.get_response(request)
+        return self.report(request, response, metrics, started)
+
+    def report(self, request, response, metrics, started):
+        total = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+
+        # Unresolved paths share one label: arbitrary 404 URLs would
+        # otherwise each become a time series
+        REQUEST_LATENCY.observe(
+            total,
+            view=match.view_name if match else "unresolved",
+            method=request.method,
+            status=response.status_code,
+        )
+
+        timings = [
+            f'db;dur={metrics.durations["db"] * 1000:.1f};desc="{metrics.counts["db"]} queries"'
+        ]
+        for name in ("template", "gateway"):
+            if metrics.counts[name]:
+                timings.append(f"{name};dur={metrics.durations[name] * 1000:.1f}")
+        timings.append(f"total;dur={total * 1000:.1f}")
+        response["Server-Timing"] = ", ".join(timings)
+
+        perf_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "db_queries": metrics.counts["db"],
+            "db_ms": round(metrics.durations["db"] * 1000, 1),
+            "template_ms": round(metrics.durations["template"] * 1000, 1),
+            "gateway_calls": metrics.counts["gateway"],
+            "gateway_ms": round(metrics.durations["gateway"] * 1000, 1),
+        }))
+
+        for sql, count in metrics.repeated_queries(settings.PERF_N_PLUS_ONE_THRESHOLD):
+            perf_logger.warning(
+                "Possible N+1 in view %s: %s executions of %s",
+                view, count, sql[:500],
+            )
+
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keep a client on the primary database for REPLICA_PIN_SECONDS after
+    it writes, so replica lag never hides its own changes. Sits above
+    SessionMiddleware so session saves count as writes.
+    """
+
+    cookie_name = "pin_primary"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with track_writes(self.cookie_name in request.COOKIES) as wrote_anything:
+            response = self.get_response(request)
+            wrote = wrote_anything()
+        return self.pin(request, response, wrote)
+
+    async def __acall__(self, request):
+        # sync_to_async copies context changes back, so writes made in
+        # the ORM's worker threads are seen here
+        with track_writes(self.cookie_name in request.COOKIES) as wrote_anything:
+            response = await self.get_response(request)
+            wrote = wrote_anything()
+        return self.pin(request, response, wrote)
+
+    def pin(self, request, response, wrote):
+        if wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, minus the sync-only restriction: under ASGI the stock
+    middleware forces Django to run the whole stack below it through
+    sync_to_async, one thread hop per request. Static files are still
+    served from the file index built at startup.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Development only: scans the filesystem
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,115 @@
+# core/pagination.py
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def _json_default(value):
+    # Full isoformat: DjangoJSONEncoder drops microseconds, which would
+    # make rows sharing a millisecond fall between two pages.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values):
+    """Pack the ordering values of the last row into an opaque URL token."""
+    raw = json.dumps(list(values), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Returns None for a missing or broken token."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def canonical_cursor(model, ordering, cursor):
+    """
+    ``cursor`` re-encoded from its decoded values, or "" if it does not
+    decode for ``ordering``. Cache keys use this, so made-up tokens cannot
+    mint new entries and equivalent tokens share one.
+    """
+    values = _cursor_values(model, ordering, cursor)
+    return "" if values is None else encode_cursor(values)
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=20):
+    """
+    Return (rows, next_cursor) for one page of ``queryset``.
+
+    ``ordering`` is a tuple like ("-created_at", "-id") whose last field
+    must be unique. Instead of OFFSET, the page starts strictly after the
+    row encoded in ``cursor``, so every page costs the same index range
+    scan no matter how deep the user scrolls.
+    """
+    page = _page_queryset(queryset, ordering, cursor, page_size)
+    return _split_page(list(page), ordering, page_size)
+
+
+async def akeyset_page(queryset, ordering, cursor=None, page_size=20):
+    """keyset_page() for async views."""
+    page = _page_queryset(queryset, ordering, cursor, page_size)
+    return _split_page([row async for row in page], ordering, page_size)
+
+
+def _cursor_values(model, ordering, cursor):
+    """Decoded cursor values as Python objects, or None if unusable."""
+    fields = [name.lstrip("-") for name in ordering]
+    values = decode_cursor(cursor)
+    if values is None or len(values) != len(fields):
+        return None
+    try:
+        values = [
+            model._meta.get_field(name).to_python(value)
+            for name, value in zip(fields, values)
+        ]
+    except (ValidationError, TypeError):
+        return None
+    # Ordering fields of a real row are never null here; None is no bound
+    return None if None in values else values
+
+
+def _page_queryset(queryset, ordering, cursor, page_size):
+    # One row past the page tells whether there is a next one
+    values = _cursor_values(queryset.model, ordering, cursor)
+    if values is not None:
+        queryset = queryset.filter(_after(ordering, values))
+
+    return queryset.order_by(*ordering)[:page_size + 1]
+
+
+def _split_page(rows, ordering, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, name.lstrip("-")) for name in ordering
+        )
+    return rows, next_cursor
+
+
+def _after(ordering, values):
+    """
+    Build the row-value comparison (a, b) > (x, y) as
+    a > x OR (a = x AND b > y), honouring each field's direction.
+    """
+    condition = Q()
+    equal = Q()
+    for name, value in zip(ordering, values):
+        field = name.lstrip("-")
+        lookup = "lt" if name.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{field}__{lookup}": value})
+        equal &= Q(**{field: value})
+    return condition
@@ -0,0 +1,98 @@
+# core/routers.py
+#
+# Primary/replica routing. Reads only go to a replica inside a
+# replica_reads() block (or a view wrapped in @replica_view), never
+# inside a transaction, and never for a client that wrote recently:
+# ReplicaPinningMiddleware pins it to the primary for
+# REPLICA_PIN_SECONDS so it always reads its own writes.
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Replica alias chosen for the current block, or None
+_replica = ContextVar("replica", default=None)
+# Set when the client wrote recently (pin cookie)
+_pinned = ContextVar("pinned_to_primary", default=False)
+# Set once this context wrote anything
+_wrote = ContextVar("wrote_to_primary", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Send reads in this block to one replica, if any are configured."""
+    replicas = settings.DATABASE_REPLICAS
+    token = _replica.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def replica_view(view):
+    """Serve GET/HEAD requests of a read-only view from a replica."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapped_async(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await view(request, *args, **kwargs)
+            # The ORM's worker threads inherit this context
+            with replica_reads():
+                return await view(request, *args, **kwargs)
+
+        return wrapped_async
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+
+    return wrapped
+
+
+@contextmanager
+def track_writes(pinned=False):
+    """
+    Scope for one request: ``pinned`` keeps every read on the primary.
+    Yields a callable telling whether anything was written meanwhile.
+    """
+    pinned_token = _pinned.set(pinned)
+    wrote_token = _wrote.set(False)
+    try:
+        yield _wrote.get
+    finally:
+        _pinned.reset(pinned_token)
+        _wrote.reset(wrote_token)
+
+
+class PrimaryReplicaRouter:
+    """Writes and migrations on the primary, opted-in reads on a replica."""
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None or _pinned.get() or _wrote.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see its writes
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes: everything after a write stays on the primary
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,15 @@
+# core/shortcuts.py
+
+from django.shortcuts import render
+
+
+async def arender(request, template_name, context=None, status=None):
+    """
+    render() for async views. base.html and the auth/messages context
+    processors read request.user and the session synchronously, which
+    would query the database from the event loop; loading both through
+    the async API first leaves rendering itself free of queries.
+    """
+    # auser() also loads the session, which messages read from
+    request.user = await request.auser()
+    return render(request, template_name, context, status=status)
@@ -0,0 +1,16 @@
+# core/tasks.py
+from .images import render_model_image
+from .jobs import shared_task
+
+
+@shared_task(queue="images")
+def generate_renditions_task(model_label, pk, field_name="image"):
+    """
+    Builds the resized WebP/JPEG renditions of an uploaded image.
+
+    Args:
+        model_label (str): e.g. "events.Event".
+        pk (int): Primary key of the object that owns the image.
+        field_name (str): Name of the ImageField.
+    """
+    render_model_image(model_label, pk, field_name)
@@ -0,0 +1,47 @@
+from django import template
+from django.utils.html import format_html
+
+from core.images import rendition_url as _rendition_url, srcset as _srcset
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def rendition_url(obj, width, ext="jpg"):
+    """{% rendition_url event 320 %} -> URL of a rendition >= 320px wide."""
+    return _rendition_url(obj.image, obj.image_renditions, int(width), ext)
+
+
+@register.simple_tag
+def image_srcset(obj, ext="webp"):
+    """{% image_srcset product %} -> 'url 320w, url 640w, ...'"""
+    return _srcset(obj.image, obj.image_renditions, ext)
+
+
+@register.simple_tag
+def responsive_image(obj, sizes="100vw", alt="", width=640, css_class=""):
+    """
+    <picture> with a WebP srcset and a JPEG fallback, or the plain
+    original while renditions are still being generated.
+    """
+    if not obj.image:
+        return ""
+
+    fallback = _rendition_url(obj.image, obj.image_renditions, int(width))
+    webp_srcset = _srcset(obj.image, obj.image_renditions, "webp")
+    if not webp_srcset:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="lazy">',
+            fallback, alt, css_class,
+        )
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">'
+        '</picture>',
+        webp_srcset, sizes,
+        fallback, _srcset(obj.image, obj.image_renditions, "jpg"), sizes,
+        alt, css_class,
+    )
@@ -0,0 +1,173 @@
+# core/testing.py
+#
+# Shared pieces of the per-app query-budget suites (store/tests.py,
+# booking/tests.py, events/tests.py).
+
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from django.utils import timezone
+
+from events.models import Event, Seat, normalize_location
+from store.models import Product
+
+from .cache import tiered_cache
+
+
+# Scale the wall-clock ceilings on slow machines, e.g. PERF_TEST_TIME_SCALE=3
+TIME_SCALE = float(os.getenv("PERF_TEST_TIME_SCALE", "1"))
+DEFAULT_SECONDS = 2.0
+
+_LITERALS = re.compile(r"'[^']*'|\b\d+(?:\.\d+)?\b")
+
+
+def format_queries(queries):
+    """Numbered SQL listing with the most repeated statements flagged."""
+    # Literals stripped, so statements differing only in ids group together
+    repeated = Counter(
+        _LITERALS.sub("?", query["sql"]) for query in queries
+    )
+    lines = [
+        f"{number:>3}. {query['sql']}"
+        for number, query in enumerate(queries, 1)
+    ]
+    suspects = [
+        f"  {count}x {sql[:300]}"
+        for sql, count in repeated.most_common()
+        if count > 1
+    ]
+    if suspects:
+        lines += ["", "Repeated statements (likely N+1):", *suspects]
+    return "\n".join(lines)
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+    MEDIA_ROOT=tempfile.mkdtemp(prefix="rural_sports_test_media_"),
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    },
+)
+class QueryBudgetTestCase(TestCase):
+    """
+    Every request goes through assertBudget(), which fails when a view
+    runs more SQL queries than its budget or exceeds its wall-clock
+    ceiling, printing the SQL it ran. Caches start cold and invoice PDFs
+    are written to a fresh directory for every test.
+    """
+
+    # Set by subclasses: the URL namespace this suite must fully cover
+    urlconf_namespace = None
+
+    def setUp(self):
+        cache.clear()
+        tiered_cache.local.clear()
+        invoices = self.enterContext(
+            tempfile.TemporaryDirectory(prefix="rural_sports_test_invoices_")
+        )
+        self.enterContext(override_settings(INVOICE_ROOT=invoices))
+
+    def assertBudget(self, method, url, queries, seconds=DEFAULT_SECONDS,
+                     status=200, **kwargs):
+        request = getattr(self.client, method.lower())
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request(url, **kwargs)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(
+            response.status_code, status,
+            f"{method} {url} returned {response.status_code}, expected {status}",
+        )
+        self.assertLessEqual(
+            len(captured), queries,
+            f"{method} {url} ran {len(captured)} queries, budget is {queries}:\n"
+            + format_queries(captured.captured_queries),
+        )
+        self.assertLessEqual(
+            elapsed, seconds * TIME_SCALE,
+            f"{method} {url} took {elapsed:.3f}s, ceiling is "
+            f"{seconds * TIME_SCALE:.3f}s",
+        )
+        return response
+
+    def assertAllUrlsCovered(self, covered):
+        """Fail when a URL name in ``urlconf_namespace`` has no budget test."""
+        _, resolver = get_resolver().namespace_dict[self.urlconf_namespace]
+        names = {
+            pattern.name for pattern in resolver.url_patterns if pattern.name
+        }
+        self.assertEqual(
+            names - set(covered), set(),
+            "URLs without a query-budget test",
+        )
+
+
+# =====================================================
+# SEED DATA
+# =====================================================
+def make_user(username="shopper"):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="pass12345",
+    )
+
+
+def make_events(count=10, seats_per_event=60):
+    now = timezone.now()
+    events = Event.objects.bulk_create([
+        Event(
+            name=f"Match {number}",
+            description="Village tournament",
+            location=f"Ground {number % 3}",
+            location_normalized=normalize_location(f"Ground {number % 3}"),
+            category=("cricket", "football", "volleyball")[number % 3],
+            date=now + timedelta(days=number + 1),
+            price=Decimal("150.00"),
+            available_tickets=seats_per_event,
+        )
+        for number in range(count)
+    ])
+    Seat.objects.bulk_create([
+        Seat(
+            event=event,
+            section=("North", "South", "VIP")[number % 3],
+            row_number=chr(ord("A") + number // 20),
+            seat_number=number % 20 + 1,
+            price=Decimal("250.00") if number % 3 == 2 else Decimal("0"),
+        )
+        for event in events
+        for number in range(seats_per_event)
+    ])
+    return events
+
+
+def make_products(count=40):
+    return Product.objects.bulk_create([
+        Product(
+            name=f"Cricket bat {number}",
+            description="Willow bat, full size",
+            price=Decimal("999.00") + number,
+            stock=100,
+        )
+        for number in range(count)
+    ])
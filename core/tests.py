@@ -1,3 +1,658 @@
-from django.test import TestCase
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import router, transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from booking.models import Booking, EventSalesSummary, Ticket
+from booking.views import seat_map
+from core.cache import (
+    LocalLRU, bump_namespace, namespace_version, tiered_cache, versioned_key,
+)
+from core.images import render_model_image, rendition_url, srcset
+from core.jobs import Worker, task
+from core.mailer import drain_outbox, queue_email, queue_emails
+from core.middleware import PerformanceMiddleware, ReplicaPinningMiddleware
+from core.management.commands.benchmark_startup import boot_profile
+from core.metrics import PDF_RENDER, TICKET_SCANS, registry
+from core.models import Job, OutboundEmail
+from core.routers import replica_reads, replica_view, track_writes
+from core.testing import make_events, make_products
+from events.models import Event, Seat
+from store.models import Order, OrderItem, Product
+from store.views import shop_page
+
+
+class SeedSyntheticDataTests(TestCase):
+    def seed(self, **options):
+        call_command("seed_synthetic_data", stdout=StringIO(), **options)
+
+    def test_small_dataset(self):
+        self.seed(users=50, products=5, events=3, seats_per_event=40, tickets=100, orders=30)
+
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(Seat.objects.count(), 120)
+        self.assertEqual(Ticket.objects.count(), 100)
+        self.assertEqual(Seat.objects.filter(is_sold=True).count(), 100)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertTrue(OrderItem.objects.exists())
+        self.assertEqual(
+            sum(Booking.objects.values_list("num_tickets", flat=True)), 100
+        )
+        # Summaries are rebuilt, since bulk inserts bypass the signals
+        self.assertEqual(
+            sum(EventSalesSummary.objects.values_list("tickets_sold", flat=True)), 100
+        )
+
+    def test_same_seed_same_data(self):
+        def snapshot():
+            return (
+                list(Event.objects.order_by("id").values_list("name", flat=True)),
+                list(Ticket.objects.order_by("id").values_list("ticket_id", flat=True)),
+            )
+
+        options = dict(users=20, products=3, events=2, seats_per_event=30, tickets=40, orders=10)
+        self.seed(**options)
+        first = snapshot()
+        call_command("flush", interactive=False, verbosity=0)
+        self.seed(**options)
+        self.assertEqual(snapshot(), first)
+
+    def test_refuses_to_seed_twice(self):
+        self.seed(users=5, products=1, events=1, seats_per_event=10, tickets=5, orders=1)
+        with self.assertRaises(CommandError):
+            self.seed(users=5)
+
+
+class FlakyConnection:
+    """Mail connection whose session breaks when sending to ``broken``."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.delivered = []
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.broken:
+                raise OSError("connection reset")
+            self.delivered.append(message.to[0])
+        return len(messages)
+
+
+@override_settings(MAILER_MAX_ATTEMPTS=3, MAILER_RETRY_BASE_SECONDS=60)
+class MailerTests(TestCase):
+    def queue(self, *recipients, template="store/email/order_status.txt"):
+        queue_emails(
+            {
+                "to_email": to_email,
+                "subject": "Order update",
+                "template_name": template,
+                "context": {"order_id": 1, "username": "fan", "status_label": "Shipped"},
+            }
+            for to_email in recipients
+        )
+
+    def statuses(self):
+        return dict(OutboundEmail.objects.values_list("to_email", "status"))
+
+    def test_failure_mid_batch_resends_nothing_already_sent(self):
+        self.queue("a@example.com", "b@example.com", "c@example.com")
+        connection = FlakyConnection(broken={"b@example.com"})
+
+        stats = drain_outbox(connection=connection)
+
+        self.assertEqual((stats["sent"], stats["failed"]), (2, 1))
+        self.assertEqual(connection.delivered, ["a@example.com", "c@example.com"])
+        # Opened for the drain, then again after the failure
+        self.assertEqual(connection.opened, 2)
+        self.assertEqual(self.statuses(), {
+            "a@example.com": "sent",
+            "b@example.com": "queued",
+            "c@example.com": "sent",
+        })
+
+    def test_lost_claim_race_does_not_end_the_drain(self):
+        self.queue("a@example.com", "b@example.com", "c@example.com")
+        update = QuerySet.update
+
+        def rival_claims_first(queryset, **fields):
+            # Another drainer claims the picked rows between select and update
+            if fields.get("status") == OutboundEmail.STATUS_SENDING and not rival:
+                rival.extend(queryset.values_list("to_email", flat=True))
+                update(
+                    queryset,
+                    status=OutboundEmail.STATUS_SENDING,
+                    claim_token=uuid.uuid4(),
+                )
+            return update(queryset, **fields)
+
+        rival = []
+        connection = FlakyConnection()
+        with mock.patch.object(QuerySet, "update", rival_claims_first):
+            stats = drain_outbox(batch_size=2, connection=connection)
+
+        self.assertEqual(rival, ["a@example.com", "b@example.com"])
+        self.assertEqual(stats["sent"], 1)
+        self.assertEqual(connection.delivered, ["c@example.com"])
+
+    def test_failed_email_backs_off_then_gives_up(self):
+        self.queue("b@example.com")
+        connection = FlakyConnection(broken={"b@example.com"})
+
+        drain_outbox(connection=connection)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, email.created_at)
+        # Not due yet
+        self.assertEqual(drain_outbox(connection=connection)["batches"], 0)
+
+        for _ in range(2):
+            OutboundEmail.objects.update(next_attempt_at=email.created_at)
+            drain_outbox(connection=connection)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("failed", 3))
+
+    def test_broken_template_is_not_retried(self):
+        self.queue("a@example.com", template="store/email/missing.txt")
+        drain_outbox(connection=FlakyConnection())
+        self.assertEqual(self.statuses(), {"a@example.com": "failed"})
+
+    def test_html_alternative_is_attached(self):
+        queue_email(
+            "a@example.com", "Order #1 Confirmation",
+            "store/email/order_confirmation.txt",
+            context={"order_id": 1, "username": "fan", "total_amount": "10.00"},
+            html_template_name="store/email/order_confirmation.html",
+        )
+        connection = FlakyConnection()
+        sent = []
+        connection.send_messages = lambda messages: sent.extend(messages) or len(messages)
+
+        drain_outbox(connection=connection)
+        self.assertEqual(sent[0].alternatives[0][1], "text/html")
+
+
+CALLS = []
+
+
+@task
+def record_call(value):
+    CALLS.append(value)
+
+
+@task(max_retries=1, retry_backoff=60)
+def always_fails():
+    raise ValueError("gateway down")
+
+
+@task(priority=5)
+def crash_a_worker():
+    # Leaves a job behind as if its worker died mid-run
+    Job.objects.filter(id=record_call.delay("recovered").id).update(
+        status=Job.STATUS_RUNNING,
+        locked_by="gone:1",
+        locked_at=timezone.now() - timedelta(hours=1),
+    )
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def work(self):
+        return Worker(burst=True).run()
+
+    def test_jobs_run_by_priority(self):
+        record_call.delay("low")
+        record_call.apply_async(args=["high"], priority=9)
+        self.assertEqual(self.work(), 2)
+        self.assertEqual(CALLS, ["high", "low"])
+        self.assertEqual(
+            set(Job.objects.values_list("status", flat=True)), {Job.STATUS_DONE}
+        )
+
+    def test_countdown_delays_a_job(self):
+        record_call.apply_async(args=["later"], countdown=60)
+        self.assertEqual(self.work(), 0)
+        self.assertEqual(CALLS, [])
+
+    def test_failures_back_off_then_fail(self):
+        job = always_fails.delay()
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.work()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=50))
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        with self.assertLogs("core.jobs", "ERROR"):
+            self.work()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+        self.assertEqual(job.last_error, "ValueError: gateway down")
+
+    @override_settings(JOBS_REQUEUE_SECONDS=0, JOBS_STALE_SECONDS=60)
+    def test_running_worker_recovers_stale_jobs(self):
+        crash_a_worker.delay()
+        # The stale job appears after the worker started
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.assertEqual(self.work(), 2)
+        self.assertEqual(CALLS, ["recovered"])
+
+
+class SuffixingStorage(FileSystemStorage):
+    """Saves like Cloudinary's use_filename: random suffix, no extension."""
+
+    def _save(self, name, content):
+        stem = name.rsplit(".", 1)[0]
+        return super()._save(f"{stem}_x7k2", content)
+
+
+def _jpeg(width=800, height=400):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "green").save(buffer, "JPEG")
+    return SimpleUploadedFile("bat.jpg", buffer.getvalue(), "image/jpeg")
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "core.tests.SuffixingStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    },
+    IMAGE_RENDITION_WIDTHS=[320, 640, 1280],
+)
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tiered_cache.local.clear()
+        media = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.product = Product.objects.create(
+            name="Bat", description="Willow", price=1, stock=1, image=_jpeg(),
+        )
+
+    def test_urls_use_the_names_storage_returned(self):
+        render_model_image("store.Product", self.product.id)
+        self.product.refresh_from_db()
+        renditions = self.product.image_renditions
+
+        # Never upscaled: nothing past the 800px original
+        self.assertEqual([entry["width"] for entry in renditions], [320, 640])
+        self.assertEqual(
+            renditions[0]["webp"], "products/renditions/bat_x7k2_320_x7k2"
+        )
+        chosen = rendition_url(self.product.image, renditions, 500)
+        self.assertEqual(chosen, f"/media/{renditions[1]['jpg']}")
+        self.assertTrue(self.product.image.storage.exists(renditions[1]["jpg"]))
+        self.assertEqual(
+            srcset(self.product.image, renditions),
+            f"/media/{renditions[0]['webp']} 320w, /media/{renditions[1]['webp']} 640w",
+        )
+
+    def test_width_only_entries_fall_back_to_the_original(self):
+        self.assertEqual(
+            rendition_url(self.product.image, [320, 640], 320), self.product.image.url
+        )
+        self.assertEqual(srcset(self.product.image, [320, 640]), "")
+
+    def test_cached_shop_page_picks_up_renditions(self):
+        before = async_to_sync(shop_page)("")
+        self.assertNotIn("<picture>", before["products_html"])
+        version = namespace_version("shop")
+
+        render_model_image("store.Product", self.product.id)
+
+        self.assertNotEqual(namespace_version("shop"), version)
+        self.assertIn("<picture>", async_to_sync(shop_page)("")["products_html"])
+
+
+@override_settings(PERF_DETECT_N_PLUS_ONE=True, PERF_N_PLUS_ONE_THRESHOLD=3)
+class PerformanceMiddlewareTests(TestCase):
+    def respond(self, path, lookups=1):
+        def view(request):
+            for event_id in range(lookups):
+                Event.objects.filter(id=event_id).exists()
+            return HttpResponse(
+                render_to_string("events/event_cards.html", {"events": []})
+            )
+
+        return PerformanceMiddleware(view)(RequestFactory().get(path))
+
+    def test_server_timing_header(self):
+        header = self.respond("/timed/", lookups=2)["Server-Timing"]
+        self.assertRegex(
+            header,
+            r'^db;dur=\d+\.\d;desc="2 queries", template;dur=\d+\.\d, '
+            r"total;dur=\d+\.\d$",
+        )
+
+    def test_one_json_line_per_request(self):
+        with self.assertLogs("core.performance", level="INFO") as logs:
+            self.respond("/logged/", lookups=2)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            {key: line[key] for key in ("method", "path", "view", "status", "db_queries")},
+            {"method": "GET", "path": "/logged/", "view": "/logged/",
+             "status": 200, "db_queries": 2},
+        )
+        self.assertLessEqual(line["db_ms"], line["total_ms"])
+        self.assertLessEqual(line["template_ms"], line["total_ms"])
+        self.assertEqual(line["gateway_calls"], 0)
+
+    def test_repeated_query_is_reported(self):
+        with self.assertLogs("core.performance", level="WARNING") as logs:
+            self.respond("/loop/", lookups=3)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn(
+            "Possible N+1 in view /loop/: 3 executions of", logs.records[0].getMessage()
+        )
+
+        with self.assertNoLogs("core.performance", level="WARNING"):
+            self.respond("/loop/", lookups=2)
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TransactionTestCase):
+    # No test transaction around each test: reads inside one stay on the
+    # primary. Only routing decisions are checked; replica1 is never opened.
+
+    def test_reads_opt_in_to_the_replica(self):
+        with track_writes():
+            self.assertEqual(router.db_for_read(Event), "default")
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Event), "replica1")
+            self.assertEqual(router.db_for_read(Event), "default")
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        with track_writes() as wrote_anything, replica_reads():
+            self.assertEqual(router.db_for_write(Event), "default")
+            self.assertTrue(wrote_anything())
+            self.assertEqual(router.db_for_read(Event), "default")
+
+    def test_pinned_client_and_transactions_read_the_primary(self):
+        with track_writes(pinned=True), replica_reads():
+            self.assertEqual(router.db_for_read(Event), "default")
+        with track_writes(), replica_reads(), transaction.atomic():
+            self.assertEqual(router.db_for_read(Event), "default")
+
+    def test_replica_view_serves_get_only(self):
+        @replica_view
+        def view(request):
+            return HttpResponse(router.db_for_read(Event))
+
+        factory = RequestFactory()
+        with track_writes():
+            self.assertEqual(view(factory.get("/")).content, b"replica1")
+            self.assertEqual(view(factory.post("/")).content, b"default")
+
+    def test_writing_client_is_pinned(self):
+        def writes(request):
+            router.db_for_write(Event)
+            return HttpResponse()
+
+        cookie = ReplicaPinningMiddleware.cookie_name
+        factory = RequestFactory()
+        response = ReplicaPinningMiddleware(writes)(factory.post("/"))
+        self.assertEqual(response.cookies[cookie]["max-age"], 10)
+
+        reads = ReplicaPinningMiddleware(lambda request: HttpResponse())
+        self.assertNotIn(cookie, reads(factory.get("/")).cookies)
+
+
+class MetricsTests(TestCase):
+    def test_histogram_exposition(self):
+        for seconds in (0.004, 0.2, 30):
+            PDF_RENDER.observe(seconds, document="test-exposition")
+        text = registry.render()
+
+        label = 'document="test-exposition"'
+        self.assertIn("# TYPE pdf_render_duration_seconds histogram", text)
+        self.assertIn(f'pdf_render_duration_seconds_bucket{{{label},le="0.005"}} 1', text)
+        self.assertIn(f'pdf_render_duration_seconds_bucket{{{label},le="0.25"}} 2', text)
+        self.assertIn(f'pdf_render_duration_seconds_bucket{{{label},le="+Inf"}} 3', text)
+        self.assertIn(f"pdf_render_duration_seconds_count{{{label}}} 3", text)
+
+    def test_workers_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory):
+            # Another worker's snapshot
+            Path(directory, "99999-other.json").write_text(json.dumps(
+                [["ticket_scans_total", ["test-workers"], 5]]
+            ))
+            TICKET_SCANS.inc(result="test-workers")
+            TICKET_SCANS.inc(result="test-workers")
+
+            text = registry.render()
+            # Its file goes with the directory
+            registry._file = None
+
+        self.assertIn('ticket_scans_total{result="test-workers"} 7', text)
+
+    def test_concurrent_flushes_share_one_file(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_DIR=directory):
+            TICKET_SCANS.inc(result="test-flush")
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                # Raises if one thread's replace took another's tmp file
+                list(pool.map(lambda _: registry.flush(), range(64)))
+
+            files = list(Path(directory).iterdir())
+            registry._file = None
+
+        self.assertEqual(len(files), 1)
+        self.assertEqual(files[0].suffix, ".json")
+
+    @override_settings(METRICS_TOKEN="scrape-token", SECURE_SSL_REDIRECT=False)
+    def test_endpoint_needs_token_or_staff(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+        response = self.client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer scrape-token"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE http_request_duration_seconds histogram", response.content)
+
+
+class StartupTests(SimpleTestCase):
+    def test_heavy_modules_load_lazily(self):
+        # A fresh interpreter booting like a web worker
+        self.assertEqual(boot_profile()["heavy_loaded"], [])
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+)
+class WarmCachesTests(TransactionTestCase):
+    # Committed data: the command builds in its own threads and connections
+
+    def setUp(self):
+        # Shared like Redis: the test client reads what the command wrote
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory,
+            }
+        }))
+        tiered_cache.local.clear()
+
+    def test_warmed_pages_need_no_queries(self):
+        events = make_events(3, seats_per_event=20)
+        make_products(5)
+
+        output = StringIO()
+        call_command("warm_caches", stdout=output)
+        self.assertIn("seat_maps", output.getvalue())
+
+        # A fresh worker: only the shared tier is warm
+        tiered_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/events/").status_code, 200)
+            self.assertEqual(self.client.get("/store/shop/").status_code, 200)
+            seat_map(events[0].id)
+
+    def test_process_local_cache_is_refused(self):
+        with override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }):
+            with self.assertRaisesMessage(CommandError, "LocMemCache"):
+                call_command("warm_caches", stdout=StringIO())
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    },
+    CACHE_VERSION_TTL=2,
+)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        tiered_cache.local.clear()
+        tiered_cache.reset_stats()
+
+    def test_local_tier_answers_first(self):
+        tiered_cache.set("tier:local", "page", 60)
+        # Gone from the shared tier; this process still has it
+        cache.delete("tier:local")
+        self.assertEqual(tiered_cache.get("tier:local"), "page")
+        self.assertEqual(tiered_cache.stats()["local_hits"], 1)
+
+    def test_shared_hit_fills_local_tier(self):
+        cache.set("tier:shared", "page")
+        self.assertEqual(tiered_cache.get("tier:shared"), "page")
+        cache.delete("tier:shared")
+        self.assertEqual(tiered_cache.get("tier:shared"), "page")
+
+        stats = tiered_cache.stats()
+        self.assertEqual((stats["shared_hits"], stats["local_hits"]), (1, 1))
+        self.assertIsNone(tiered_cache.get("tier:missing"))
+        self.assertEqual(tiered_cache.stats()["misses"], 1)
+
+    def test_local_tier_drops_least_recently_used(self):
+        local = LocalLRU(max_entries=2)
+        local.set("a", 1, 60)
+        local.set("b", 2, 60)
+        local.get("a")
+        local.set("c", 3, 60)
+        self.assertEqual(local.get("a"), 1)
+        self.assertEqual(local.get("c"), 3)
+        self.assertEqual(len(local), 2)
+
+    def test_bump_switches_to_fresh_keys(self):
+        key = versioned_key("tier", "page")
+        tiered_cache.set(key, "old", 60)
+
+        bump_namespace("tier")
+
+        fresh = versioned_key("tier", "page")
+        self.assertNotEqual(fresh, key)
+        self.assertIsNone(tiered_cache.get(fresh))
+
+    def test_other_process_bump_seen_after_version_ttl(self):
+        key = versioned_key("tier", "page")
+        # Another process bumps the namespace in the shared tier
+        cache.set("ns:tier:version", namespace_version("tier") + 1, None)
+        self.assertEqual(versioned_key("tier", "page"), key)
+
+        later = time.monotonic() + 3
+        with mock.patch("core.cache.time.monotonic", return_value=later):
+            self.assertNotEqual(versioned_key("tier", "page"), key)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    },
+    CACHE_EARLY_REFRESH_BETA=0,
+)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        tiered_cache.local.clear()
+        self.builds = 0
+
+    def slow_build(self):
+        self.builds += 1
+        time.sleep(0.2)
+        return "page"
+
+    def test_cold_key_is_built_once(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda _: tiered_cache.get_or_build("sf:cold", self.slow_build, 60),
+                range(8),
+            ))
+        self.assertEqual(results, ["page"] * 8)
+        self.assertEqual(self.builds, 1)
+
+    def test_expired_value_is_served_while_rebuilding(self):
+        tiered_cache.get_or_build("sf:stale", lambda: "old", 60)
+        with mock.patch("core.cache.time.time", return_value=time.time() + 61):
+            # Someone else holds the build lock
+            cache.add("sf:stale:building", 1)
+            self.assertEqual(
+                tiered_cache.get_or_build("sf:stale", self.slow_build, 60), "old"
+            )
+            cache.delete("sf:stale:building")
+            self.assertEqual(
+                tiered_cache.get_or_build("sf:stale", self.slow_build, 60), "page"
+            )
+        self.assertEqual(self.builds, 1)
+
+    def test_async_cold_key_is_built_once(self):
+        async def build():
+            self.builds += 1
+            await asyncio.sleep(0.2)
+            return "page"
+
+        async def herd():
+            return await asyncio.gather(*(
+                tiered_cache.aget_or_build("sf:async", build, 60) for _ in range(8)
+            ))
+
+        self.assertEqual(async_to_sync(herd)(), ["page"] * 8)
+        self.assertEqual(self.builds, 1)
@@ -0,0 +1,121 @@
+# core/timing.py
+#
+# Per-request timing buckets filled by PerformanceMiddleware: SQL (via
+# connection.execute_wrapper), template rendering (via the
+# InstrumentedDjangoTemplates backend) and anything wrapped in
+# timed(), such as payment gateway calls. Outside a request every hook
+# is a no-op.
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Timings (in seconds) and call counts collected for one request."""
+
+    def __init__(self, track_queries=False):
+        self.durations = Counter()
+        self.counts = Counter()
+        # SQL text -> executions, only kept when hunting N+1 patterns
+        self.queries = Counter() if track_queries else None
+        self._template_depth = 0
+
+    def add(self, name, seconds, calls=1):
+        self.durations[name] += seconds
+        self.counts[name] += calls
+
+    def repeated_queries(self, threshold):
+        """SQL statements executed at least ``threshold`` times."""
+        if self.queries is None:
+            return []
+        return [
+            (sql, count) for sql, count in self.queries.most_common()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def collect(track_queries=False):
+    """Make a fresh RequestMetrics current for the enclosed block."""
+    metrics = RequestMetrics(track_queries)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def current_metrics():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """Charge the enclosed block to the ``name`` bucket, e.g. "gateway"."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - started)
+
+
+def sql_timer(execute, sql, params, many, context):
+    """connection.execute_wrapper hook."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add("db", time.perf_counter() - started)
+        if metrics.queries is not None:
+            # Placeholders, not values: N+1 loops differ only in params
+            metrics.queries[sql] += 1
+
+
+# =====================================================
+# TEMPLATES
+# =====================================================
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+
+        # render_to_string() inside a rendering template is already timed
+        metrics._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._template_depth -= 1
+            if not metrics._template_depth:
+                metrics.add("template", time.perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The stock Django backend, with render time charged to the request."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
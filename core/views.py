@@ -1,5 +1,34 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from .cache import tiered_cache
+from .metrics import registry
+
+
 def home_view(request):
     return render(request, 'index.html' , {})
 
 
+@staff_member_required
+def cache_stats_view(request):
+    """Hit/miss counters of the serving process's two-tier cache."""
+    return JsonResponse(tiered_cache.stats())
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint: every worker's metrics, summed."""
+    token = settings.METRICS_TOKEN
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        )
+    )
+    if not authorized:
+        return HttpResponse(status=403)
+
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
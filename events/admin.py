@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from core.images import rendition_url
 from .models import Event
 
 
@@ -21,7 +22,7 @@ class EventAdmin(admin.ModelAdmin):
             if obj.image and hasattr(obj.image, "url"):
                 return format_html(
                     '<img src="{}" style="width:50px;height:50px;object-fit:cover;border-radius:6px;" />',
-                    obj.image.url
+                    rendition_url(obj.image, obj.image_renditions, 100)
                 )
         except Exception:
             pass
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
+
+    def ready(self):
+        from core.images import track_image_renditions
+        from . import signals  # noqa: F401
+        from .models import Event
+
+        track_image_renditions(Event, cache_namespace="events")
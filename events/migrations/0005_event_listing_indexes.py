@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_seat_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'category', 'date'], name='events_even_is_acti_6c69eb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['is_active', 'date'], name='events_even_is_acti_85e9ee_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 04:48
+
+import re
+
+from django.db import migrations, models
+
+
+def backfill_location_normalized(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    events = list(Event.objects.only("id", "location"))
+    for event in events:
+        event.location_normalized = re.sub(r"\s+", " ", event.location or "").strip().lower()
+    Event.objects.bulk_update(events, ["location_normalized"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='location_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_location_normalized, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location_normalized', 'date'], name='events_even_locatio_903a9d_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_forget_unnamed_renditions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='event',
+            name='events_even_locatio_903a9d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['location_normalized', 'date'], name='event_location_prefix_idx', opclasses=['varchar_pattern_ops', 'timestamptz_ops']),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Full-text index over event names for the search API.
+#
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# PostgreSQL: a GIN index over a tsvector expression.
+#
+# SQLite drops the triggers whenever a migration rebuilds events_event
+# (adding or altering a column); such a migration must recreate them.
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE events_event_fts USING fts5(
+        name,
+        content='events_event', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER events_event_fts_ai AFTER INSERT ON events_event BEGIN
+        INSERT INTO events_event_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_ad AFTER DELETE ON events_event BEGIN
+        INSERT INTO events_event_fts(events_event_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER events_event_fts_au AFTER UPDATE OF name ON events_event BEGIN
+        INSERT INTO events_event_fts(events_event_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO events_event_fts(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    "INSERT INTO events_event_fts(events_event_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS events_event_fts_au",
+    "DROP TRIGGER IF EXISTS events_event_fts_ad",
+    "DROP TRIGGER IF EXISTS events_event_fts_ai",
+    "DROP TABLE IF EXISTS events_event_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX events_event_name_search_idx ON events_event
+    USING GIN ((to_tsvector('english', coalesce(name, ''))))
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS events_event_name_search_idx",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_location_prefix_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
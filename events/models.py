@@ -1,6 +1,13 @@
+import re
+
 from django.db import models
 
 
+def normalize_location(value):
+    """'  New  Delhi ' -> 'new delhi' (what location search matches on)."""
+    return re.sub(r"\s+", " ", value or "").strip().lower()
+
+
 class Event(models.Model):
     CATEGORY_CHOICES = [
         ("cricket", "Cricket"),
@@ -14,6 +21,11 @@ class Event(models.Model):
     description = models.TextField()
     date = models.DateTimeField(null=True, blank=True)
     location = models.CharField(max_length=200)
+    location_normalized = models.CharField(
+        max_length=200,
+        blank=True,
+        editable=False
+    )
     price = models.DecimalField(max_digits=10, decimal_places=2)
     available_tickets = models.IntegerField(default=0)
 
@@ -28,12 +40,34 @@ class Event(models.Model):
         null=True,
         blank=True
     )
+    # Stored names of the resized copies built by core.images (empty until ready)
+    image_renditions = models.JSONField(default=list, blank=True, editable=False)
 
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_active", "category", "date"]),
+            models.Index(fields=["is_active", "date"]),
+            # Pattern ops: on Postgres a plain btree cannot serve the
+            # LIKE 'x%' of the search API's location prefix match
+            models.Index(
+                fields=["location_normalized", "date"],
+                name="event_location_prefix_idx",
+                opclasses=["varchar_pattern_ops", "timestamptz_ops"],
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.location_normalized = normalize_location(self.location)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "location" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "location_normalized"}
+        super().save(*args, **kwargs)
+
 
 class Seat(models.Model):
     event = models.ForeignKey(
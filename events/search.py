@@ -0,0 +1,50 @@
+# events/search.py
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Keep in sync with the expression indexed in 0010_event_name_search_index
+POSTGRES_VECTOR = "to_tsvector('english', coalesce(\"events_event\".\"name\", ''))"
+
+
+def _tokens(query):
+    return TOKEN_RE.findall(query.lower())[:8]
+
+
+def filter_by_name(events, query):
+    """
+    Narrow ``events`` to those whose name has every word of ``query``,
+    the last one as a prefix, through the name full-text index. The
+    queryset stays lazy, so further filters, facets and keyset pages
+    still run as single queries.
+    """
+    tokens = _tokens(query or "")
+    if not tokens:
+        return events
+
+    if connection.vendor == "sqlite":
+        # Quoted, so user input can never be read as FTS5 syntax
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return events.filter(id__in=RawSQL(
+            "SELECT rowid FROM events_event_fts WHERE events_event_fts MATCH %s",
+            [match],
+        ))
+
+    if connection.vendor == "postgresql":
+        return events.filter(RawSQL(
+            f"{POSTGRES_VECTOR} @@ to_tsquery('english', %s)",
+            [" & ".join(f"{token}:*" for token in tokens)],
+            output_field=BooleanField(),
+        ))
+
+    # No full-text index on this backend: plain scan
+    condition = Q()
+    for token in tokens:
+        condition &= Q(name__icontains=token)
+    return events.filter(condition)
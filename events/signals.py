@@ -0,0 +1,20 @@
+# events/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_namespace
+
+from .models import Event, Seat
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_event_pages(sender, **kwargs):
+    """Drop every cached listing page, for all categories at once."""
+    bump_namespace("events")
+
+
+@receiver([post_save, post_delete], sender=Seat)
+def invalidate_seat_map(sender, instance, **kwargs):
+    """Seat maps are cached per event."""
+    bump_namespace(f"seats:{instance.event_id}")
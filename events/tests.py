@@ -1,3 +1,189 @@
-from django.test import TestCase
+import re
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from django.utils import timezone
+
+from core.pagination import encode_cursor
+from core.testing import QueryBudgetTestCase, make_events, make_user
+
+from .models import Event
+from .views import EVENTS_PAGE_SIZE, events_page
+
+
+def _names(page):
+    return re.findall(r"Match \d+", page["events_html"])
+
+
+class EventListingTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.events = make_events(EVENTS_PAGE_SIZE + 4, seats_per_event=1)
+        Event.objects.create(name="Match 900", price=0, available_tickets=0, date=None)
+        Event.objects.create(
+            name="Match 901", price=0, available_tickets=0,
+            date=timezone.now() - timedelta(days=1),
+        )
+        Event.objects.create(
+            name="Match 902", price=0, available_tickets=0,
+            date=timezone.now() + timedelta(days=2), is_active=False,
+        )
+
+    def page(self, cursor="", category=None):
+        return async_to_sync(events_page)(category, cursor)
+
+    def test_pages_run_by_date_then_undated(self):
+        first = self.page()
+        second = self.page(first["next_cursor"])
+
+        self.assertEqual(
+            _names(first) + _names(second),
+            [event.name for event in self.events] + ["Match 900"],
+        )
+        self.assertIsNone(second["next_cursor"])
+
+    def test_every_undated_event_is_reachable(self):
+        undated = Event.objects.bulk_create([
+            Event(name=f"Match {number}", price=0, available_tickets=0, date=None)
+            for number in range(910, 910 + EVENTS_PAGE_SIZE + 2)
+        ])
+        names, cursor = [], ""
+        while True:
+            page = self.page(cursor)
+            names += _names(page)
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(
+            names,
+            [event.name for event in self.events]
+            + ["Match 900"] + [event.name for event in undated],
+        )
+
+    def test_category_filter(self):
+        names = _names(self.page(category="football"))
+        self.assertEqual(
+            names, [event.name for event in self.events if event.category == "football"]
+        )
+
+    def test_saving_an_event_refreshes_pages(self):
+        self.assertIn("Match 0", _names(self.page()))
+        event = self.events[0]
+        event.name = "Renamed final"
+        event.save()
+        self.assertNotIn("Match 0", _names(self.page()))
+
+    def test_made_up_cursors_share_the_first_page(self):
+        first = self.page()
+        with self.assertNumQueries(0):
+            for cursor in (
+                "junk", encode_cursor(["soon", 1]), encode_cursor([1, 2, 3]),
+                encode_cursor([None, 1]), encode_cursor(["x"]), encode_cursor([None]),
+            ):
+                self.assertEqual(self.page(cursor), first)
+
+    def test_null_cursor_serves_the_first_page(self):
+        response = self.client.get(
+            reverse("events:events_list"), {"cursor": encode_cursor([None, 1])}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class EventSearchTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        soon = timezone.now() + timedelta(days=3)
+
+        def event(name, location, category="cricket", **fields):
+            return Event.objects.create(
+                name=name, location=location, category=category, date=soon,
+                price=100, available_tickets=10, **fields,
+            )
+
+        cls.final = event("District Cricket Final", "Madurai  Ground")
+        cls.semi = event("Cricket semi-finals", "Madurai Stadium")
+        cls.kabaddi = event("Kabaddi league final", "Salem", category="kabaddi")
+        event("Cricket trials", "Madurai", is_active=False)
+
+    def search(self, **params):
+        response = self.client.get(reverse("events:event_search"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def names(self, **params):
+        return sorted(result["name"] for result in self.search(**params)["results"])
+
+    def test_name_words_match_anywhere_and_last_as_prefix(self):
+        self.assertEqual(
+            self.names(q="final"),
+            ["Cricket semi-finals", "District Cricket Final", "Kabaddi league final"],
+        )
+        self.assertEqual(self.names(q="cricket fin"), ["Cricket semi-finals", "District Cricket Final"])
+        self.assertEqual(self.names(q='"final" OR *'), [])
+
+    def test_renamed_event_is_found_by_its_new_name(self):
+        self.kabaddi.name = "Kho-kho league final"
+        self.kabaddi.save()
+        self.assertEqual(self.names(q="kho"), ["Kho-kho league final"])
+        self.assertEqual(self.names(q="kabaddi"), [])
+
+    def test_location_is_a_normalized_prefix(self):
+        self.assertEqual(
+            self.names(location="  MADURAI "),
+            ["Cricket semi-finals", "District Cricket Final"],
+        )
+        self.assertEqual(self.names(location="madurai g"), ["District Cricket Final"])
+
+    def test_facets_ignore_the_category_filter(self):
+        data = self.search(q="final", category="kabaddi")
+        self.assertEqual([r["name"] for r in data["results"]], ["Kabaddi league final"])
+        self.assertEqual(data["facets"]["category"], {"cricket": 2, "kabaddi": 1})
+
+    def test_null_cursor_starts_over(self):
+        cursor = encode_cursor([None, 1])
+        self.assertEqual(len(self.search(cursor=cursor)["results"]), 3)
+
+    def test_bad_dates_are_rejected(self):
+        response = self.client.get(reverse("events:event_search"), {"date_from": "soon"})
+        self.assertEqual(response.status_code, 400)
+
+
+class EventsQueryBudgetTests(QueryBudgetTestCase):
+    """Query budgets for every URL in events.urls, over several pages of events."""
+
+    urlconf_namespace = "events"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("fan")
+        cls.events = make_events(60, seats_per_event=10)
+
+    def test_events_list(self):
+        url = reverse("events:events_list")
+        self.assertBudget("GET", url, queries=1)
+        # Second page, then a category filter: still one page of events each
+        first = self.client.get(url)
+        self.assertBudget("GET", f"{url}?cursor={first.context['next_cursor']}", queries=1)
+        self.assertBudget("GET", f"{url}?category=football", queries=1)
+
+    def test_events_list_cached(self):
+        url = reverse("events:events_list")
+        self.client.get(url)
+        self.assertBudget("GET", url, queries=0)
+
+    def test_event_search(self):
+        url = reverse("events:event_search")
+        response = self.assertBudget(
+            "GET", f"{url}?q=match&location=ground&category=cricket", queries=2
+        )
+        self.assertEqual(len(response.json()["results"]), 20)
+
+    def test_buy_ticket_now(self):
+        self.client.force_login(self.user)
+        url = reverse("events:buy_ticket_now", args=[self.events[0].id])
+        self.assertBudget("GET", url, queries=10, status=302)
+
+    def test_every_url_has_a_budget(self):
+        self.assertAllUrlsCovered(["events_list", "event_search", "buy_ticket_now"])
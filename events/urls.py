@@ -5,6 +5,7 @@ app_name = "events"
 
 urlpatterns = [
     path("", views.events_list_view, name="events_list"),
+    path("api/search/", views.event_search_api, name="event_search"),
     path(
         "buy/<int:event_id>/",
         views.buy_ticket_now,
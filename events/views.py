@@ -1,28 +1,194 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from datetime import datetime, time, timedelta
+
+from django.shortcuts import redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Event
+from django.db.models import Count
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.cache import aversioned_key, tiered_cache
+from core.metrics import CART_OPERATIONS
+from core.pagination import akeyset_page, canonical_cursor, keyset_page
+from core.routers import replica_view
+from core.shortcuts import arender
+from .models import Event, normalize_location
+from .search import filter_by_name
 from store.models import Cart, CartItem
 
-def events_list_view(request):
-    category = request.GET.get("category")
+EVENTS_PAGE_SIZE = 12
+EVENTS_ORDERING = ("date", "id")
+# Events without a date yet, listed after the dated ones
+UNDATED_ORDERING = ("id",)
+# Short TTL: pages also go stale as events start, not only on save
+EVENTS_CACHE_TIMEOUT = 60 * 2
+
+VALID_CATEGORIES = {value for value, _ in Event.CATEGORY_CHOICES}
 
-    events = Event.objects.filter(is_active=True)
 
+async def _events_page(category, cursor):
+    """
+    Render one page of upcoming events: dated ones by date, then undated
+    ones by id, starting on the last dated page. A one-value cursor
+    continues the undated run.
+    """
+    events = Event.objects.filter(is_active=True)
     if category:
         events = events.filter(category=category)
+    undated = events.filter(date__isnull=True)
+
+    if canonical_cursor(Event, UNDATED_ORDERING, cursor):
+        page, next_cursor = await akeyset_page(
+            undated, UNDATED_ORDERING, cursor=cursor, page_size=EVENTS_PAGE_SIZE
+        )
+    else:
+        page, next_cursor = await akeyset_page(
+            events.filter(date__gte=timezone.now()),
+            EVENTS_ORDERING,
+            cursor=cursor,
+            page_size=EVENTS_PAGE_SIZE,
+        )
+        if next_cursor is None:
+            rest, next_cursor = await akeyset_page(
+                undated, UNDATED_ORDERING, page_size=EVENTS_PAGE_SIZE
+            )
+            page += rest
+
+    return {
+        "events_html": render_to_string(
+            "events/event_cards.html", {"events": page}
+        ),
+        "next_cursor": next_cursor,
+    }
+
 
-    return render(
+async def events_page(category, cursor):
+    """_events_page() through the cache; ``category`` None for all."""
+    cursor = (
+        canonical_cursor(Event, EVENTS_ORDERING, cursor)
+        or canonical_cursor(Event, UNDATED_ORDERING, cursor)
+    )
+    cache_key = await aversioned_key("events", category or "all", cursor)
+    # Single-flight: an expiring page is rebuilt once, not by every request
+    return await tiered_cache.aget_or_build(
+        cache_key, lambda: _events_page(category, cursor), EVENTS_CACHE_TIMEOUT
+    )
+
+
+@replica_view
+async def events_list_view(request):
+    # Async: a cached page is served without leaving the event loop
+    category = request.GET.get("category")
+    cursor = request.GET.get("cursor", "")
+
+    if category and category not in VALID_CATEGORIES:
+        page = {
+            "events_html": render_to_string(
+                "events/event_cards.html", {"events": []}
+            ),
+            "next_cursor": None,
+        }
+    else:
+        page = await events_page(category, cursor)
+
+    return await arender(
         request,
         "events/events_list.html",
         {
-            "events": events,
+            **page,
+            "cursor": cursor,
             "selected_category": category,
         }
     )
 
 
 
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+
+
+def _parse_day(value, name):
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"{name} must be YYYY-MM-DD")
+    return day
+
+
+def event_search_api(request):
+    """
+    GET /events/api/search/?q=&location=&date_from=&date_to=&category=&cursor=
+
+    Compact, keyset-paginated results ordered by date, plus per-category
+    counts for the same filters (ignoring ``category``) from one GROUP BY.
+    """
+    try:
+        date_from = _parse_day(request.GET.get("date_from"), "date_from")
+        date_to = _parse_day(request.GET.get("date_to"), "date_to")
+        page_size = min(
+            int(request.GET.get("limit", SEARCH_PAGE_SIZE)),
+            SEARCH_MAX_PAGE_SIZE,
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    events = Event.objects.filter(is_active=True, date__isnull=False)
+
+    events = filter_by_name(events, request.GET.get("q", ""))
+
+    location = normalize_location(request.GET.get("location", ""))
+    if location:
+        events = events.filter(location_normalized__startswith=location)
+
+    # Compare the raw column (not date__date) so the date index is usable
+    tz = timezone.get_current_timezone()
+    if date_from:
+        events = events.filter(
+            date__gte=datetime.combine(date_from, time.min, tzinfo=tz)
+        )
+    if date_to:
+        events = events.filter(
+            date__lt=datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz)
+        )
+
+    facets = {
+        row["category"]: row["count"]
+        for row in events.order_by().values("category").annotate(count=Count("id"))
+    }
+
+    category = request.GET.get("category")
+    if category:
+        events = events.filter(category=category)
+
+    page, next_cursor = keyset_page(
+        events.only("id", "name", "date", "location", "category", "price"),
+        ("date", "id"),
+        cursor=request.GET.get("cursor"),
+        page_size=max(page_size, 1),
+    )
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": event.id,
+                "name": event.name,
+                "date": event.date.isoformat(),
+                "location": event.location,
+                "category": event.category,
+                "price": str(event.price),
+                "url": reverse("booking:book_event", args=[event.id]),
+            }
+            for event in page
+        ],
+        "next_cursor": next_cursor,
+        "facets": {"category": facets},
+    })
+
+
 @login_required
 def buy_ticket_now(request, event_id):
     event = get_object_or_404(Event, id=event_id)
@@ -38,6 +204,7 @@ def buy_ticket_now(request, event_id):
     if not created:
         cart_item.quantity += 1
         cart_item.save()
+    CART_OPERATIONS.inc(operation="add", item="event")
 
     messages.success(request, f"Ticket for {event.name} added to cart.")
     return redirect("store:cart")
@@ -1,2 +1,10 @@
-from .celery import app as celery_app
-__all__ = ('celery_app',)
\ No newline at end of file
+__all__ = ('celery_app',)
+
+
+def __getattr__(name):
+    # Celery (and kombu, yaml, click) costs web workers ~150 ms at boot,
+    # and background work runs on core.jobs; load it only when asked for
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
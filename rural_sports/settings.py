@@ -1,5 +1,8 @@
 import os
+import sys
 from pathlib import Path
+
+import dj_database_url
 from dotenv import load_dotenv
 
 # ============================================================
@@ -22,6 +25,8 @@ SECRET_KEY = os.getenv(
 
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
+TESTING = sys.argv[1:2] == ["test"]
+
 
 ALLOWED_HOSTS = [
     "127.0.0.1",
@@ -71,8 +76,15 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
 
-    # WhiteNoise must be directly after SecurityMiddleware
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise must be directly after SecurityMiddleware (async-capable
+    # subclass, so ASGI requests stay on the event loop)
+    "core.middleware.AsyncWhiteNoiseMiddleware",
+
+    # SQL / template / gateway timings (Server-Timing + log line)
+    "core.middleware.PerformanceMiddleware",
+
+    # Before sessions, so session writes pin the client to the primary
+    "core.middleware.ReplicaPinningMiddleware",
 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -96,7 +108,8 @@ WSGI_APPLICATION = "rural_sports.wsgi.application"
 # ============================================================
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Stock Django templates, with render time reported per request
+        "BACKEND": "core.timing.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -111,14 +124,136 @@ TEMPLATES = [
 ]
 
 # ============================================================
-# DATABASE (SQLite – Render Free Tier Friendly)
+# DATABASE
+# ============================================================
+# DATABASE_URL picks the backend (postgres://... in production,
+# sqlite:///... locally). Without it the local SQLite file is used.
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'db.sqlite3'}")
+
+# Persistent connections: reused across requests, checked before reuse
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "600"))
+
+# SQLite connection profiles. "tuned" lets several gunicorn workers
+# write concurrently: WAL keeps readers off the writer's lock,
+# IMMEDIATE transactions take the write lock up front (so a busy
+# database waits for `timeout` instead of failing on lock upgrade),
+# and synchronous=NORMAL is safe under WAL. Opt-in (SQLITE_PROFILE=tuned):
+# WAL is recorded in the database file itself, which is committed, and
+# leaves -wal/-shm files beside it.
+SQLITE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "transaction_mode": "IMMEDIATE",
+        "timeout": 20,  # busy_timeout, in seconds
+        "init_command": (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA mmap_size=268435456;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-20000;"
+        ),
+    },
+}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default")
+
+# Server-side pool for PostgreSQL (psycopg 3 with psycopg-pool, both in
+# requirements.txt).
+# Replaces persistent connections, which Django won't combine with it.
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "0"))
+
+
+def _database(url):
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
+    if config["ENGINE"] == "django.db.backends.sqlite3":
+        config["OPTIONS"] = dict(SQLITE_PROFILES[SQLITE_PROFILE])
+    elif DB_POOL_MAX_SIZE:
+        config["CONN_MAX_AGE"] = 0
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": 1,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": 10,
+        }
+    return config
+
+
+DATABASES = {"default": _database(DATABASE_URL)}
+
+# Read replicas (comma-separated URLs), used by views wrapped in
+# core.routers.replica_view. Locally a second SQLite file kept in sync
+# by `manage.py sync_sqlite_replica` stands in for one.
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+DATABASE_REPLICAS = [
+    f"replica{number}" for number in range(1, len(DATABASE_REPLICA_URLS) + 1)
+]
+for alias, url in zip(DATABASE_REPLICAS, DATABASE_REPLICA_URLS):
+    DATABASES[alias] = {**_database(url), "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+
+# How long a client reads from the primary after writing
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "10"))
+
 # ============================================================
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# CACHE
+# ============================================================
+# Shared tier: Redis when REDIS_URL is set, a file cache when CACHE_DIR
+# is set (shared by local worker processes), else per-process memory.
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_DIR = os.getenv("CACHE_DIR")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "rural_sports",
+        }
     }
-}
+elif CACHE_DIR:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "rural_sports",
+        }
+    }
+
+# In-process tier in front of it (core.cache.tiered_cache)
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1000"))
+CACHE_LOCAL_TIMEOUT = int(os.getenv("CACHE_LOCAL_TIMEOUT", "60"))
+# How long a process may serve a namespace after another process bumped it
+CACHE_VERSION_TTL = int(os.getenv("CACHE_VERSION_TTL", "2"))
+# Single-flight rebuilds (tiered_cache.get_or_build): expired values are
+# served for CACHE_STALE_SECONDS while one request rebuilds them; with
+# nothing to serve, others wait up to CACHE_COALESCE_WAIT_SECONDS
+CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", "30"))
+CACHE_BUILD_LOCK_SECONDS = int(os.getenv("CACHE_BUILD_LOCK_SECONDS", "10"))
+CACHE_COALESCE_WAIT_SECONDS = float(os.getenv("CACHE_COALESCE_WAIT_SECONDS", "2"))
+# Early refresh eagerness; 0 turns it off
+CACHE_EARLY_REFRESH_BETA = float(os.getenv("CACHE_EARLY_REFRESH_BETA", "1"))
+
+# ============================================================
+# SESSIONS
+# ============================================================
+# Read through the cache, written to both: an authenticated page no
+# longer queries django_session, and a cache miss (restart, eviction,
+# per-process LocMemCache) falls back to the database row.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "default"
 
 # ============================================================
 # STATIC FILES (RENDER SAFE)
@@ -142,12 +277,25 @@ CLOUDINARY_STORAGE = {
 # ============================================================
 # STORAGE BACKENDS (DJANGO 5.2+)
 # ============================================================
+# Set MEDIA_STORAGE_BACKEND=django.core.files.storage.FileSystemStorage
+# to keep uploads (and their renditions) on local disk, e.g. offline.
+# STATIC_STORAGE_BACKEND=django.contrib.staticfiles.storage.StaticFilesStorage
+# serves without the collectstatic manifest (benchmarks, scratch checkouts)
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 STORAGES = {
     "default": {
-        "BACKEND": "cloudinary_storage.storage.MediaCloudinaryStorage",
+        "BACKEND": os.getenv(
+            "MEDIA_STORAGE_BACKEND",
+            "cloudinary_storage.storage.MediaCloudinaryStorage"
+        ),
     },
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        "BACKEND": os.getenv(
+            "STATIC_STORAGE_BACKEND",
+            "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
     },
 }
 
@@ -216,9 +364,84 @@ CASHFREE_BOOKING_WEBHOOK_URL = os.getenv("CASHFREE_BOOKING_WEBHOOK_URL")
 # ============================================================
 # EMAIL (DEV DEFAULT)
 # ============================================================
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# Use filebased/locmem backends to exercise the mailer offline
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND",
+    "django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", BASE_DIR / "sent_emails")
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "webmaster@localhost")
 
 # ============================================================
 # DEFAULT PRIMARY KEY
 # ============================================================
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# ============================================================
+# STORE INVENTORY
+# ============================================================
+# Unpaid orders give their reserved stock back after this long
+STORE_RESERVATION_TTL_MINUTES = int(
+    os.getenv("STORE_RESERVATION_TTL_MINUTES", "30")
+)
+
+# ============================================================
+# INVOICES
+# ============================================================
+# Rendered invoice PDFs, stored as <order_id>.pdf
+INVOICE_ROOT = os.getenv("INVOICE_ROOT", BASE_DIR / "invoices")
+
+# ============================================================
+# MAILER (core.mailer outbox)
+# ============================================================
+MAILER_BATCH_SIZE = int(os.getenv("MAILER_BATCH_SIZE", "100"))
+MAILER_MAX_ATTEMPTS = int(os.getenv("MAILER_MAX_ATTEMPTS", "5"))
+MAILER_RETRY_BASE_SECONDS = int(os.getenv("MAILER_RETRY_BASE_SECONDS", "60"))
+
+# ============================================================
+# BACKGROUND JOBS (core.jobs, no broker required)
+# ============================================================
+JOBS_MAX_RETRIES = int(os.getenv("JOBS_MAX_RETRIES", "3"))
+JOBS_RETRY_BACKOFF_SECONDS = int(os.getenv("JOBS_RETRY_BACKOFF_SECONDS", "30"))
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "1"))
+JOBS_STALE_SECONDS = int(os.getenv("JOBS_STALE_SECONDS", "900"))
+# How often each worker returns stale jobs to the queue
+JOBS_REQUEUE_SECONDS = int(os.getenv("JOBS_REQUEUE_SECONDS", "60"))
+
+# ============================================================
+# IMAGE RENDITIONS (core.images)
+# ============================================================
+IMAGE_RENDITION_WIDTHS = [100, 320, 640, 1280]
+
+# ============================================================
+# PERFORMANCE INSTRUMENTATION
+# ============================================================
+# Repeated identical SQL within one request is logged as a likely N+1
+PERF_DETECT_N_PLUS_ONE = DEBUG or TESTING
+PERF_N_PLUS_ONE_THRESHOLD = int(os.getenv("PERF_N_PLUS_ONE_THRESHOLD", "5"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # One INFO line per request; tests keep only the N+1 warnings
+        "core.performance": {
+            "handlers": ["console"],
+            "level": os.getenv("PERF_LOG_LEVEL", "WARNING" if TESTING else "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# ============================================================
+# METRICS (core.metrics, served at /metrics)
+# ============================================================
+# Shared directory for multi-worker setups (gunicorn); unset, /metrics
+# only reports the process that serves it
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1"))
+# Bearer token for scrapers; staff sessions are always allowed
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
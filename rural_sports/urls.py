@@ -14,6 +14,8 @@ urlpatterns = [
 
     # ================= CORE =================
     path("", core_views.home_view, name="home"),
+    path("cache/stats/", core_views.cache_stats_view, name="cache_stats"),
+    path("metrics", core_views.metrics_view, name="metrics"),
 
     # ================= APPS =================
     path("store/", include("store.urls")),
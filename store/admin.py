@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import (
     Product,
     Order,
@@ -7,7 +7,9 @@ from .models import (
     Cart,
     CartItem,
     OrderShipping,
+    OrderStatusHistory,
 )
+from .order_status import transition_orders
 
 # =====================================================
 # PRODUCT
@@ -47,6 +49,19 @@ class OrderShippingInline(admin.StackedInline):
     max_num = 1
 
 
+# =====================================================
+# STATUS HISTORY INLINE (READONLY)
+# =====================================================
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    extra = 0
+    readonly_fields = ("from_status", "to_status", "source", "changed_by", "created_at")
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 # =====================================================
 # ORDER
 # =====================================================
@@ -69,7 +84,7 @@ class OrderAdmin(admin.ModelAdmin):
     )
     ordering = ("-created_at",)
 
-    inlines = [OrderItemInline, OrderShippingInline]
+    inlines = [OrderItemInline, OrderShippingInline, OrderStatusHistoryInline]
 
     actions = [
         "mark_as_processing",
@@ -78,17 +93,30 @@ class OrderAdmin(admin.ModelAdmin):
     ]
 
     # ---------- ADMIN ACTIONS ----------
+    def _transition(self, request, queryset, to_status):
+        moved, skipped = transition_orders(
+            queryset, to_status, user=request.user, source="admin"
+        )
+        self.message_user(request, f"{moved} order(s) marked as {to_status}.")
+        if skipped:
+            self.message_user(
+                request,
+                f"{skipped} order(s) skipped: cannot move to {to_status} "
+                f"from their current status.",
+                level=messages.WARNING,
+            )
+
     @admin.action(description="Mark selected orders as PROCESSING")
     def mark_as_processing(self, request, queryset):
-        queryset.update(order_status="PROCESSING")
+        self._transition(request, queryset, "PROCESSING")
 
     @admin.action(description="Mark selected orders as SHIPPED")
     def mark_as_shipped(self, request, queryset):
-        queryset.update(order_status="SHIPPED")
+        self._transition(request, queryset, "SHIPPED")
 
     @admin.action(description="Mark selected orders as DELIVERED")
     def mark_as_delivered(self, request, queryset):
-        queryset.update(order_status="DELIVERED")
+        self._transition(request, queryset, "DELIVERED")
 
 
 # =====================================================
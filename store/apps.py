@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self):
+        from core.images import track_image_renditions
+        from . import signals  # noqa: F401
+        from .models import Product
+
+        track_image_renditions(Product, cache_namespace="shop")
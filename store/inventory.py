@@ -0,0 +1,181 @@
+# store/inventory.py
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from .models import Order, Product
+from .order_status import transition_orders
+
+
+logger = logging.getLogger(__name__)
+
+
+class OutOfStock(Exception):
+    """Raised when a product cannot cover the requested quantity."""
+
+    def __init__(self, product_id, requested):
+        self.product_id = product_id
+        self.requested = requested
+        super().__init__(
+            f"Product {product_id} has less than {requested} in stock"
+        )
+
+
+def _quantities_by_product(lines):
+    """
+    Collapse (product_id, quantity) pairs into one total per product.
+    Sorted by id so concurrent checkouts lock rows in the same order.
+    """
+    totals = defaultdict(int)
+    for product_id, quantity in lines:
+        if product_id:
+            totals[product_id] += quantity
+    return sorted(totals.items())
+
+
+# =====================================================
+# RESERVE
+# =====================================================
+def reserve_stock(lines):
+    """
+    Conditionally decrement stock for every (product_id, quantity) line.
+
+    The product rows are first locked in id order, so concurrent checkouts
+    with overlapping carts queue behind each other instead of deadlocking.
+    All products are then decremented by a single UPDATE whose WHERE clause
+    still requires ``stock >= quantity`` per row (SQLite has no row locks).
+    If a product is short, OutOfStock is raised; this must run inside a
+    transaction so the caller's atomic block rolls any decrement back.
+    """
+    totals = _quantities_by_product(lines)
+    if not totals:
+        return
+
+    product_ids = [product_id for product_id, _ in totals]
+    available = dict(
+        Product.objects
+        .select_for_update()
+        .filter(id__in=product_ids, is_active=True)
+        .order_by("id")
+        .values_list("id", "stock")
+    )
+    for product_id, qty in totals:
+        if available.get(product_id, 0) < qty:
+            raise OutOfStock(product_id, qty)
+
+    wanted = Case(
+        *(When(id=product_id, then=Value(qty)) for product_id, qty in totals),
+        output_field=PositiveIntegerField(),
+    )
+
+    updated = Product.objects.filter(
+        id__in=product_ids,
+        is_active=True,
+        stock__gte=wanted,
+    ).update(stock=F("stock") - wanted)
+
+    if updated != len(totals):
+        short = _first_short_product(totals)
+        raise OutOfStock(*short)
+
+
+def _first_short_product(totals):
+    """Name the line that failed (only queried on the error path)."""
+    available = dict(
+        Product.objects
+        .filter(id__in=[product_id for product_id, _ in totals], is_active=True)
+        .values_list("id", "stock")
+    )
+    for product_id, qty in totals:
+        if available.get(product_id, 0) < qty:
+            return product_id, qty
+    return totals[0]
+
+
+def reserve_order_stock(order):
+    """Reserve stock for an order's product lines and flag it as held."""
+    lines = order.items.values_list("product_id", "quantity")
+
+    with transaction.atomic():
+        # Claim the flag first so a retried webhook cannot reserve twice
+        claimed = Order.objects.filter(
+            id=order.id,
+            stock_reserved=False,
+        ).update(stock_reserved=True)
+
+        if claimed:
+            reserve_stock(lines)
+
+    order.stock_reserved = True
+
+
+# =====================================================
+# RELEASE
+# =====================================================
+def release_order_stock(order):
+    """
+    Return an order's reserved units to stock exactly once.
+    Returns True if this call released the reservation.
+    """
+    with transaction.atomic():
+        released = Order.objects.filter(
+            id=order.id,
+            stock_reserved=True,
+        ).update(stock_reserved=False)
+
+        if not released:
+            return False
+
+        totals = _quantities_by_product(
+            order.items.values_list("product_id", "quantity")
+        )
+        if totals:
+            returned = Case(
+                *(When(id=product_id, then=Value(qty)) for product_id, qty in totals),
+                output_field=PositiveIntegerField(),
+            )
+            Product.objects.filter(
+                id__in=[product_id for product_id, _ in totals]
+            ).update(stock=F("stock") + returned)
+
+    order.stock_reserved = False
+    return True
+
+
+def release_expired_reservations(now=None):
+    """
+    Sweep unpaid orders whose reservation outlived
+    STORE_RESERVATION_TTL_MINUTES, cancel them and put their stock back.
+    Returns the number of orders released.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(minutes=settings.STORE_RESERVATION_TTL_MINUTES)
+
+    expired = Order.objects.filter(
+        stock_reserved=True,
+        payment_status="PENDING",
+        created_at__lt=cutoff,
+    )
+
+    released = 0
+    for order in expired.only("id").iterator():
+        with transaction.atomic():
+            # Locked and re-checked, so a payment webhook landing now
+            # either completes the order first or finds it cancelled
+            still_unpaid = expired.filter(id=order.id).select_for_update()
+            moved, _ = transition_orders(
+                still_unpaid, "CANCELLED", source="system", notify=False
+            )
+            if moved and release_order_stock(order):
+                released += 1
+
+    if released:
+        logger.info("Released stock for %s expired orders", released)
+
+    return released
@@ -0,0 +1,171 @@
+# store/invoices.py
+
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections
+
+from core.metrics import PDF_RENDER
+
+from .models import Order
+
+
+logger = logging.getLogger(__name__)
+
+
+def invoice_storage():
+    """Where invoice PDFs live; INVOICE_ROOT is read on every use."""
+    return FileSystemStorage(location=settings.INVOICE_ROOT)
+
+
+def invoice_name(order_id):
+    return f"{order_id}.pdf"
+
+
+def _invoice_queryset():
+    return (
+        Order.objects
+        .filter(payment_status="COMPLETED")
+        .select_related("shipping")
+        .prefetch_related("items__product", "items__event")
+    )
+
+
+# =====================================================
+# RENDER
+# =====================================================
+@PDF_RENDER.time(document="invoice")
+def render_invoice_pdf(order):
+    """Draw the invoice for a completed order and return the PDF bytes."""
+    # Heavy, and store.views imports this module in every worker
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    x = 50
+    y = height - 60
+
+    p.setFont("Helvetica-Bold", 20)
+    p.drawString(x, y, "INVOICE")
+    y -= 30
+
+    p.setFont("Helvetica", 11)
+    p.drawString(x, y, f"Invoice No: INV-{order.id}")
+    y -= 16
+    p.drawString(x, y, f"Date: {order.created_at:%d %b %Y}")
+    y -= 28
+
+    shipping = getattr(order, "shipping", None)
+    if shipping:
+        p.setFont("Helvetica-Bold", 12)
+        p.drawString(x, y, "Billing / Shipping Address")
+        y -= 16
+        p.setFont("Helvetica", 11)
+        for line in (
+            shipping.full_name,
+            shipping.address_line_1,
+            f"{shipping.city}, {shipping.state} - {shipping.pincode}",
+            f"Phone: {shipping.phone}",
+        ):
+            p.drawString(x, y, line)
+            y -= 14
+        y -= 14
+
+    # Items table
+    columns = (x, x + 280, x + 340, x + 420)
+    p.setFont("Helvetica-Bold", 11)
+    for col, title in zip(columns, ("Item", "Qty", "Price", "Total")):
+        p.drawString(col, y, title)
+    y -= 6
+    p.line(x, y, width - x, y)
+    y -= 16
+
+    p.setFont("Helvetica", 11)
+    for item in order.items.all():
+        if y < 80:
+            p.showPage()
+            p.setFont("Helvetica", 11)
+            y = height - 60
+
+        if item.product:
+            name = item.product.name
+        elif item.event:
+            name = item.event.name
+        else:
+            name = "Unknown item"
+
+        p.drawString(columns[0], y, name[:45])
+        p.drawString(columns[1], y, str(item.quantity))
+        p.drawString(columns[2], y, f"Rs. {item.price_at_purchase}")
+        p.drawString(columns[3], y, f"Rs. {item.sub_total()}")
+        y -= 16
+
+    p.line(x, y + 6, width - x, y + 6)
+    y -= 10
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(columns[2], y, "Grand Total")
+    p.drawString(columns[3], y, f"Rs. {order.total_amount}")
+    y -= 30
+
+    p.setFont("Helvetica", 11)
+    p.drawString(x, y, f"Payment Status: {order.payment_status}")
+
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def store_invoice_pdf(order):
+    """Render and (over)write the stored PDF for an order."""
+    pdf = render_invoice_pdf(order)
+    name = invoice_name(order.id)
+    storage = invoice_storage()
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(pdf))
+    return pdf
+
+
+def get_invoice_pdf(order):
+    """Stored bytes if present, otherwise render once and keep them."""
+    name = invoice_name(order.id)
+    try:
+        with invoice_storage().open(name, "rb") as fh:
+            return fh.read()
+    except FileNotFoundError:
+        pass
+
+    order = _invoice_queryset().get(id=order.id)
+    return store_invoice_pdf(order)
+
+
+# =====================================================
+# BACKGROUND
+# =====================================================
+def generate_invoice(order_id):
+    """Worker entry point: render one invoice by id."""
+    try:
+        order = _invoice_queryset().get(id=order_id)
+    except Order.DoesNotExist:
+        logger.warning("Invoice skipped, order %s not completed", order_id)
+        return
+    store_invoice_pdf(order)
+
+
+def export_invoices(order_ids):
+    """
+    Render and store a batch of invoices. Runs inside process-pool
+    workers for the bulk export command; returns how many were written.
+    """
+    close_old_connections()
+    written = 0
+    for order in _invoice_queryset().filter(id__in=order_ids):
+        store_invoice_pdf(order)
+        written += 1
+    return written
@@ -0,0 +1,92 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time as dt_time, timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from store.invoices import export_invoices, invoice_name, invoice_storage
+from store.models import Order
+
+
+def _worker_init():
+    # Needed when the pool uses "spawn"; harmless after "fork"
+    django.setup()
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = "Render invoice PDFs for completed orders in a date range, in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", required=True,
+                            help="First order date (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", required=True,
+                            help="Last order date, inclusive (YYYY-MM-DD)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument("--force", action="store_true",
+                            help="Re-render invoices that are already stored")
+
+    def handle(self, *args, **options):
+        date_from = _parse_date(options["date_from"])
+        date_to = _parse_date(options["date_to"])
+        if date_from > date_to:
+            raise CommandError("--from must not be after --to")
+
+        tz = timezone.get_current_timezone()
+        start = datetime.combine(date_from, dt_time.min, tzinfo=tz)
+        end = datetime.combine(date_to + timedelta(days=1), dt_time.min, tzinfo=tz)
+
+        order_ids = list(
+            Order.objects
+            .filter(
+                payment_status="COMPLETED",
+                created_at__gte=start,
+                created_at__lt=end,
+            )
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        if not options["force"]:
+            storage = invoice_storage()
+            order_ids = [
+                pk for pk in order_ids
+                if not storage.exists(invoice_name(pk))
+            ]
+
+        if not order_ids:
+            self.stdout.write("No invoices to render")
+            return
+
+        size = options["chunk_size"]
+        chunks = [order_ids[i:i + size] for i in range(0, len(order_ids), size)]
+
+        # Children must open their own connections, never share the parent's
+        connections.close_all()
+
+        started = time.perf_counter()
+        written = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            initializer=_worker_init,
+        ) as pool:
+            futures = [pool.submit(export_invoices, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                written += future.result()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {written} invoices in {elapsed:.1f}s "
+            f"({written / elapsed:.1f}/s, {options['workers']} workers)"
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.inventory import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Return stock held by unpaid orders older than the reservation TTL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep sweeping every N seconds (0 = run once)",
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+
+        while True:
+            released = release_expired_reservations()
+            self.stdout.write(f"Released {released} expired reservations")
+
+            if not interval:
+                break
+            time.sleep(interval)
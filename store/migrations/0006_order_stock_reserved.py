@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 04:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0005_order_delivered_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='stock_reserved',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['stock_reserved', 'payment_status', 'created_at'], name='store_order_stock_r_11c4fb_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_order_stock_reserved'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'created_at'], name='store_produ_is_acti_19c4fd_idx'),
+        ),
+    ]
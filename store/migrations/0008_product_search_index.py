@@ -0,0 +1,81 @@
+# Full-text index for storefront product search.
+#
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# PostgreSQL: a GIN index over a weighted tsvector expression, which the
+# database maintains on every write without an extra column.
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE store_product_fts USING fts5(
+        name, description,
+        content='store_product', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER store_product_fts_ai AFTER INSERT ON store_product BEGIN
+        INSERT INTO store_product_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER store_product_fts_ad AFTER DELETE ON store_product BEGIN
+        INSERT INTO store_product_fts(store_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER store_product_fts_au AFTER UPDATE OF name, description ON store_product BEGIN
+        INSERT INTO store_product_fts(store_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO store_product_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO store_product_fts(store_product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS store_product_fts_au",
+    "DROP TRIGGER IF EXISTS store_product_fts_ad",
+    "DROP TRIGGER IF EXISTS store_product_fts_ai",
+    "DROP TABLE IF EXISTS store_product_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX store_product_search_idx ON store_product USING GIN ((
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ))
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS store_product_search_idx",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_product_active_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            _run({"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# SQLite rebuilds store_product to add a column (0011_image_renditions),
+# and dropping the old table drops its triggers with it: since then the
+# FTS5 index from 0008_product_search_index missed every insert, update
+# and delete. Recreate the triggers and rebuild the index from the table.
+#
+# Any later migration that rebuilds store_product on SQLite needs the same.
+
+from importlib import import_module
+
+from django.db import migrations
+
+
+search_index = import_module("store.migrations.0008_product_search_index")
+
+SQLITE_FORWARD = [
+    sql.replace("CREATE TRIGGER", "CREATE TRIGGER IF NOT EXISTS")
+    for sql in search_index.SQLITE_FORWARD
+    if "CREATE TRIGGER" in sql or "'rebuild'" in sql
+]
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in SQLITE_FORWARD:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
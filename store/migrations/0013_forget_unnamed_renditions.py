@@ -0,0 +1,22 @@
+# image_renditions used to hold bare widths, with URLs rebuilt from the
+# original's name; on Cloudinary those URLs never existed. Entries now
+# carry the names storage returned. Clear the old values so
+# `manage.py build_image_renditions` queues these images again.
+
+from django.db import migrations
+
+
+def forget_unnamed_renditions(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    Product.objects.exclude(image_renditions=[]).update(image_renditions=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_restore_product_search_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(forget_unnamed_renditions, migrations.RunPython.noop),
+    ]
@@ -34,9 +34,16 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField()
     image = models.ImageField(upload_to="products/")
+    # Stored names of the resized copies built by core.images (empty until ready)
+    image_renditions = models.JSONField(default=list, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_active", "created_at"]),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -200,6 +207,15 @@ class Order(models.Model):
         blank=True
     )
 
+    # ✅ Inventory hold (released by the reservation sweeper if unpaid)
+    stock_reserved = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["stock_reserved", "payment_status", "created_at"]),
+            models.Index(fields=["user", "created_at"]),
+        ]
+
     def __str__(self):
         return f"Order #{self.id}"
 
@@ -275,3 +291,49 @@ class OrderShipping(models.Model):
 
     def __str__(self):
         return f"Shipping for Order #{self.order.id}"
+
+
+# ============================================================
+# ORDER STATUS HISTORY
+# ============================================================
+class OrderStatusHistory(models.Model):
+    SOURCE_CHOICES = [
+        ("admin", "Admin"),
+        ("customer", "Customer"),
+        ("payment", "Payment"),
+        ("system", "System"),
+    ]
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="status_history"
+    )
+    from_status = models.CharField(
+        max_length=20,
+        choices=Order.ORDER_STATUS_CHOICES
+    )
+    to_status = models.CharField(
+        max_length=20,
+        choices=Order.ORDER_STATUS_CHOICES
+    )
+    source = models.CharField(
+        max_length=20,
+        choices=SOURCE_CHOICES,
+        default="system"
+    )
+    changed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        verbose_name_plural = "order status history"
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status} → {self.to_status}"
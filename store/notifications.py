@@ -0,0 +1,52 @@
+# store/notifications.py
+
+from core.mailer import queue_email, queue_emails
+
+from .models import Order
+
+
+def queue_status_notifications(order_ids, to_status):
+    """
+    Queue one status email per order with a single bulk insert. Runs in
+    the caller's transaction, so emails exist only if the change commits.
+    """
+    status_label = dict(Order.ORDER_STATUS_CHOICES).get(to_status, to_status)
+
+    rows = (
+        Order.objects
+        .filter(id__in=order_ids)
+        .exclude(user__email="")
+        .values_list("id", "user__username", "user__email")
+    )
+
+    queue_emails(
+        {
+            "to_email": email,
+            "subject": f"Order #{order_id} is now {status_label}",
+            "template_name": "store/email/order_status.txt",
+            "context": {
+                "order_id": order_id,
+                "username": username,
+                "status_label": status_label,
+            },
+        }
+        for order_id, username, email in rows
+    )
+
+
+def queue_order_confirmation(order):
+    """Queue the payment confirmation email for a completed order."""
+    if not order.user.email:
+        return None
+
+    return queue_email(
+        to_email=order.user.email,
+        subject=f"Order #{order.id} Confirmation",
+        template_name="store/email/order_confirmation.txt",
+        html_template_name="store/email/order_confirmation.html",
+        context={
+            "order_id": order.id,
+            "username": order.user.username,
+            "total_amount": str(order.total_amount),
+        },
+    )
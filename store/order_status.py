@@ -0,0 +1,95 @@
+# store/order_status.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order, OrderStatusHistory
+from .notifications import queue_status_notifications
+
+
+# Which statuses an order may move to from its current one
+ALLOWED_TRANSITIONS = {
+    "PENDING": {"PROCESSING", "CANCELLED"},
+    "PROCESSING": {"SHIPPED", "CANCELLED"},
+    "SHIPPED": {"DELIVERED"},
+    "DELIVERED": set(),
+    "CANCELLED": set(),
+}
+
+BATCH_SIZE = 2000
+
+
+def allowed_sources(to_status):
+    """Statuses from which ``to_status`` can be reached."""
+    return [
+        status for status, targets in ALLOWED_TRANSITIONS.items()
+        if to_status in targets
+    ]
+
+
+def transition_orders(queryset, to_status, *, user=None, source="admin", notify=True):
+    """
+    Move every order in ``queryset`` to ``to_status`` where allowed.
+
+    Per batch, the current statuses are read under a row lock, then one
+    conditional UPDATE moves only orders whose status still permits the
+    transition, and one bulk insert records their history. Customer
+    notifications are queued in the same transaction, so they exist only
+    if the change commits. Returns (moved, skipped).
+    """
+    if to_status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f"Unknown order status: {to_status}")
+
+    sources = allowed_sources(to_status)
+    candidate_ids = list(queryset.order_by("id").values_list("id", flat=True))
+
+    fields = {"order_status": to_status}
+    if to_status == "DELIVERED":
+        fields["delivered_at"] = timezone.now()
+
+    moved_ids = []
+    for start in range(0, len(candidate_ids), BATCH_SIZE):
+        batch = candidate_ids[start:start + BATCH_SIZE]
+
+        with transaction.atomic():
+            current = dict(
+                Order.objects
+                .select_for_update()
+                .filter(id__in=batch, order_status__in=sources)
+                .values_list("id", "order_status")
+            )
+            if not current:
+                continue
+
+            Order.objects.filter(
+                id__in=list(current),
+                order_status__in=sources,
+            ).update(**fields)
+
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(
+                    order_id=order_id,
+                    from_status=from_status,
+                    to_status=to_status,
+                    source=source,
+                    changed_by=user,
+                )
+                for order_id, from_status in current.items()
+            ])
+
+            if notify:
+                queue_status_notifications(list(current), to_status)
+
+        moved_ids.extend(current)
+
+    return len(moved_ids), len(candidate_ids) - len(moved_ids)
+
+
+def transition_order(order, to_status, **kwargs):
+    """Single-order convenience wrapper; returns True if the order moved."""
+    moved, _ = transition_orders(
+        Order.objects.filter(id=order.id), to_status, **kwargs
+    )
+    if moved:
+        order.order_status = to_status
+    return bool(moved)
@@ -0,0 +1,83 @@
+# store/search.py
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Product
+
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Keep in sync with the expression indexed in 0008_product_search_index
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(p.description, '')), 'B')"
+)
+
+
+def _tokens(query):
+    return TOKEN_RE.findall(query.lower())[:8]
+
+
+def _sqlite_ids(tokens, limit):
+    # Quote every token so user input can never be read as FTS5 syntax;
+    # the trailing * makes the last words prefix-match while typing.
+    match = " ".join(f'"{token}"*' for token in tokens)
+    sql = """
+        SELECT p.id
+        FROM store_product_fts
+        JOIN store_product p ON p.id = store_product_fts.rowid
+        WHERE store_product_fts MATCH %s AND p.is_active
+        ORDER BY bm25(store_product_fts, 10.0, 1.0)
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _postgres_ids(tokens, limit):
+    query = " & ".join(f"{token}:*" for token in tokens)
+    sql = f"""
+        SELECT p.id
+        FROM store_product p, to_tsquery('english', %s) q
+        WHERE ({POSTGRES_VECTOR}) @@ q AND p.is_active
+        ORDER BY ts_rank({POSTGRES_VECTOR}, q) DESC, p.id DESC
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_products(query, limit=48):
+    """
+    Return active products matching ``query``, best match first.
+
+    Ranking happens inside the full-text index (FTS5 bm25 on SQLite,
+    ts_rank over a GIN index on PostgreSQL) and only the top ``limit``
+    ids are loaded as Product rows.
+    """
+    tokens = _tokens(query or "")
+    if not tokens:
+        return []
+
+    if connection.vendor == "sqlite":
+        ids = _sqlite_ids(tokens, limit)
+    elif connection.vendor == "postgresql":
+        ids = _postgres_ids(tokens, limit)
+    else:
+        # No full-text index on this backend: plain scan, newest first
+        condition = Q()
+        for token in tokens:
+            condition &= Q(name__icontains=token) | Q(description__icontains=token)
+        return list(
+            Product.objects
+            .filter(condition, is_active=True)
+            .order_by("-created_at", "-id")[:limit]
+        )
+
+    products = Product.objects.in_bulk(ids)
+    return [products[pk] for pk in ids if pk in products]
@@ -0,0 +1,66 @@
+# store/services.py
+
+from decimal import Decimal
+
+from django.db import transaction
+
+from .inventory import reserve_stock
+from .models import Order, OrderItem
+
+
+def cart_lines(cart):
+    """
+    Snapshot a cart as (product, event, quantity) lines.
+    Product and event are joined in the same query.
+    """
+    return [
+        (item.product, item.event, item.quantity)
+        for item in cart.items.select_related("product", "event")
+        if item.product or item.event
+    ]
+
+
+def build_order(user, lines, address=None):
+    """
+    Materialize (product, event, quantity) lines into a pending Order.
+
+    Prices are frozen into OrderItem.price_at_purchase and summed in the
+    same pass. The order row, one bulk insert of its items and one stock
+    reservation run in a single transaction, so the query count does not
+    grow with the number of lines. Raises OutOfStock if a product is short.
+    """
+    order = Order(
+        user=user,
+        address=address,
+        payment_status="PENDING",
+        order_status="PENDING",
+        stock_reserved=True,
+    )
+
+    items = []
+    total = Decimal("0.00")
+    for product, event, quantity in lines:
+        price = product.price if product else event.price
+        items.append(OrderItem(
+            order=order,
+            product=product,
+            event=event,
+            quantity=quantity,
+            price_at_purchase=price,
+        ))
+        total += price * quantity
+
+    order.total_amount = total
+
+    with transaction.atomic():
+        order.save()
+        OrderItem.objects.bulk_create(items)
+
+        # Hold stock until paid; the sweeper releases stale holds
+        reserve_stock(
+            (product.id, quantity)
+            for product, _, quantity in lines
+            if product
+        )
+
+    return order
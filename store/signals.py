@@ -0,0 +1,20 @@
+# store/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_namespace
+
+from .models import CartItem, Product
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_shop_pages(sender, **kwargs):
+    """Any product change can reorder or alter the catalog pages."""
+    bump_namespace("shop")
+
+
+@receiver([post_save, post_delete], sender=CartItem)
+def invalidate_cart(sender, instance, **kwargs):
+    """Cart contents are cached per cart (one cart per user)."""
+    bump_namespace(f"cart:{instance.cart_id}")
@@ -1,3 +1,544 @@
+import json
+import re
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import OutboundEmail
+from core.pagination import encode_cursor
+from core.testing import QueryBudgetTestCase, make_events, make_products, make_user
+
+from .invoices import (
+    export_invoices, generate_invoice, get_invoice_pdf, invoice_name,
+    invoice_storage,
+)
+from .inventory import (
+    OutOfStock, release_expired_reservations, release_order_stock,
+    reserve_stock,
+)
+from .models import (
+    Address, Cart, CartItem, Order, OrderItem, OrderStatusHistory, Product,
+)
+from .order_status import transition_order, transition_orders
+from .search import search_products
+from .services import build_order
+from .views import (
+    ORDER_PREVIEW_ITEMS, ORDERS_PAGE_SIZE, SHOP_PAGE_SIZE,
+    _complete_order_payment, shop_page,
+)
+
+
+def _gateway_response():
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"payment_session_id": "session_test"}
+    return response
+
+
+def _stock(*products):
+    return list(
+        Product.objects.filter(id__in=[p.id for p in products])
+        .order_by("id").values_list("stock", flat=True)
+    )
+
+
+class InventoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.bat, cls.ball = make_products(2)
+
+    def order(self, *lines):
+        return build_order(self.user, [(product, None, qty) for product, qty in lines])
+
+    def expire(self, order):
+        Order.objects.filter(id=order.id).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+
+    def test_checkout_reserves_stock(self):
+        order = self.order((self.bat, 3), (self.ball, 1), (self.bat, 2))
+        self.assertTrue(order.stock_reserved)
+        self.assertEqual(_stock(self.bat, self.ball), [95, 99])
+
+    def test_last_unit_cannot_be_reserved_twice(self):
+        Product.objects.filter(id=self.bat.id).update(stock=1)
+        reserve_stock([(self.bat.id, 1)])
+        with self.assertRaises(OutOfStock) as raised:
+            reserve_stock([(self.bat.id, 1)])
+        self.assertEqual(raised.exception.product_id, self.bat.id)
+        self.assertEqual(_stock(self.bat), [0])
+
+    def test_oversold_cart_is_rejected_and_stock_unchanged(self):
+        Product.objects.filter(id=self.ball.id).update(stock=2)
+        with self.assertRaises(OutOfStock) as raised:
+            self.order((self.bat, 5), (self.ball, 3))
+        self.assertEqual(raised.exception.product_id, self.ball.id)
+
+        self.assertEqual(_stock(self.bat, self.ball), [100, 2])
+        self.assertFalse(Order.objects.exists())
+
+    def test_release_returns_stock_once(self):
+        order = self.order((self.bat, 4))
+        self.assertTrue(release_order_stock(order))
+        self.assertFalse(release_order_stock(order))
+        self.assertEqual(_stock(self.bat), [100])
+
+    def test_sweeper_cancels_expired_orders(self):
+        fresh = self.order((self.bat, 1))
+        stale = self.order((self.bat, 2))
+        self.expire(stale)
+
+        self.assertEqual(release_expired_reservations(), 1)
+        self.assertEqual(_stock(self.bat), [99])
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.order_status, "CANCELLED")
+        self.assertFalse(stale.stock_reserved)
+        history = OrderStatusHistory.objects.get(order=stale)
+        self.assertEqual(
+            (history.from_status, history.to_status, history.source),
+            ("PENDING", "CANCELLED", "system"),
+        )
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.order_status, "PENDING")
+
+    def test_sweeper_skips_paid_orders(self):
+        order = self.order((self.bat, 1))
+        self.expire(order)
+        # Paid between the sweeper's scan and its lock
+        self.assertEqual(_complete_order_payment(order.id, {"cf_payment_id": 1}), "success")
+
+        self.assertEqual(release_expired_reservations(), 0)
+        order.refresh_from_db()
+        self.assertEqual(order.order_status, "PROCESSING")
+        self.assertEqual(_stock(self.bat), [99])
+
+    def test_payment_after_sweep_is_flagged_not_processed(self):
+        order = self.order((self.bat, 1))
+        self.expire(order)
+        release_expired_reservations()
+
+        status = _complete_order_payment(order.id, {"cf_payment_id": 9})
+        self.assertEqual(status, "cancelled, refund due")
+        order.refresh_from_db()
+        self.assertEqual(
+            (order.order_status, order.payment_status, order.payment_id),
+            ("CANCELLED", "COMPLETED", "9"),
+        )
+        self.assertEqual(_stock(self.bat), [100])
+        self.assertFalse(OrderStatusHistory.objects.filter(to_status="PROCESSING").exists())
+
+    def test_duplicate_payment_is_processed_once(self):
+        order = self.order((self.bat, 1))
+        payment = {"cf_payment_id": 5}
+        self.assertEqual(_complete_order_payment(order.id, payment), "success")
+        self.assertEqual(_complete_order_payment(order.id, payment), "already processed")
+        self.assertEqual(OrderStatusHistory.objects.filter(order=order).count(), 1)
+
+
+class ShopCatalogTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = make_products(SHOP_PAGE_SIZE + 6)
+
+    def names(self, page):
+        return re.findall(r"Cricket bat \d+", page["products_html"])
+
+    def test_pages_cover_catalog_once(self):
+        first = async_to_sync(shop_page)("")
+        second = async_to_sync(shop_page)(first["next_cursor"])
+
+        self.assertEqual(len(self.names(first)), SHOP_PAGE_SIZE)
+        self.assertIsNone(second["next_cursor"])
+        self.assertCountEqual(
+            self.names(first) + self.names(second),
+            [product.name for product in self.products],
+        )
+        # Newest first
+        self.assertEqual(self.names(first)[0], self.products[-1].name)
+
+    def test_made_up_cursors_share_the_first_page(self):
+        first = async_to_sync(shop_page)("")
+        with self.assertNumQueries(0):
+            for cursor in (
+                "junk", encode_cursor(["2024-01-01", 1, 2]), encode_cursor(["x", "y"]),
+                encode_cursor([None, 1]),
+            ):
+                self.assertEqual(async_to_sync(shop_page)(cursor), first)
+
+
+class ProductSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def product(name, description, **fields):
+            return Product.objects.create(
+                name=name, description=description, price=Decimal("100.00"),
+                stock=10, **fields,
+            )
+
+        cls.gloves = product("Keeping gloves", "Padded, for cricket keepers")
+        cls.bat = product("Cricket bat", "English willow")
+        cls.ball = product("Leather ball", "Match ball for cricket")
+        cls.retired = product("Cricket stumps", "Old stock", is_active=False)
+
+    def names(self, query):
+        return [product.name for product in search_products(query)]
+
+    def test_name_matches_rank_above_description(self):
+        names = self.names("cricket")
+        self.assertEqual(names[0], "Cricket bat")
+        self.assertCountEqual(names, ["Cricket bat", "Keeping gloves", "Leather ball"])
+
+    def test_last_word_prefix_matches_and_stems(self):
+        self.assertEqual(self.names("leather bal"), ["Leather ball"])
+        self.assertEqual(self.names("keeper"), ["Keeping gloves"])
+
+    def test_index_follows_updates_and_deletes(self):
+        Product.objects.filter(id=self.bat.id).update(name="Kashmir bat")
+        self.assertEqual(self.names("kashmir"), ["Kashmir bat"])
+        self.ball.delete()
+        self.assertEqual(self.names("leather"), [])
+
+    def test_search_syntax_is_treated_as_words(self):
+        self.assertEqual(self.names('"bat* -('), ["Cricket bat"])
+        self.assertEqual(self.names("willow NEAR"), [])
+        self.assertEqual(self.names("!!!"), [])
+
+
+class OrderHistoryTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        other = make_user("neighbour")
+        products = make_products(5)
+
+        cls.orders = Order.objects.bulk_create([
+            Order(user=cls.user, total_amount=Decimal("999.00"))
+            for _ in range(ORDERS_PAGE_SIZE + 3)
+        ])
+        Order.objects.create(user=other, total_amount=Decimal("1.00"))
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order, product=product, quantity=1,
+                price_at_purchase=product.price,
+            )
+            for order in cls.orders
+            for product in products[:1 + order.id % 5]
+        ])
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_pages_newest_first_with_item_previews(self):
+        url = reverse("store:my_orders")
+        first = self.client.get(url).context
+        second = self.client.get(f"{url}?cursor={first['next_cursor']}").context
+
+        seen = [order.id for order in first["orders"]] + [order.id for order in second["orders"]]
+        self.assertEqual(seen, [order.id for order in reversed(self.orders)])
+        self.assertIsNone(second["next_cursor"])
+
+        for order in first["orders"]:
+            self.assertEqual(order.item_count, 1 + order.id % 5)
+            self.assertEqual(
+                len(order.preview_items), min(order.item_count, ORDER_PREVIEW_ITEMS)
+            )
+
+    def test_null_cursor_serves_the_first_page(self):
+        url = reverse("store:my_orders")
+        first = self.client.get(url).context
+        response = self.client.get(url, {"cursor": encode_cursor([None, 1])})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [order.id for order in response.context["orders"]],
+            [order.id for order in first["orders"]],
+        )
+
+
+class InvoiceTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        product = make_products(1)[0]
+        cls.paid, cls.unpaid = Order.objects.bulk_create([
+            Order(user=cls.user, total_amount=Decimal("999.00"), payment_status=status)
+            for status in ("COMPLETED", "PENDING")
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price_at_purchase=product.price)
+            for order in (cls.paid, cls.unpaid)
+        ])
+
+    def stored(self, order):
+        return invoice_storage().exists(invoice_name(order.id))
+
+    def test_generate_stores_pdf_for_completed_orders_only(self):
+        generate_invoice(self.paid.id)
+        generate_invoice(self.unpaid.id)
+        self.assertTrue(self.stored(self.paid))
+        self.assertFalse(self.stored(self.unpaid))
+
+    def test_stored_pdf_is_served_without_rendering(self):
+        generate_invoice(self.paid.id)
+        with invoice_storage().open(invoice_name(self.paid.id), "rb") as fh:
+            stored = fh.read()
+        self.assertTrue(stored.startswith(b"%PDF"))
+
+        with mock.patch("store.invoices.render_invoice_pdf") as render, \
+                self.assertNumQueries(0):
+            self.assertEqual(get_invoice_pdf(self.paid), stored)
+        render.assert_not_called()
+
+    def test_missing_pdf_is_rendered_once_and_kept(self):
+        pdf = get_invoice_pdf(self.paid)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertTrue(self.stored(self.paid))
+
+    def test_export_skips_orders_that_are_not_completed(self):
+        self.assertEqual(export_invoices([self.paid.id, self.unpaid.id]), 1)
+        self.assertTrue(self.stored(self.paid))
+
+
+class OrderStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.staff = make_user("staff")
+        cls.pending, cls.processing, cls.shipped = Order.objects.bulk_create([
+            Order(user=cls.user, order_status=status)
+            for status in ("PENDING", "PROCESSING", "SHIPPED")
+        ])
+
+    def test_only_allowed_transitions_move(self):
+        moved, skipped = transition_orders(
+            Order.objects.all(), "SHIPPED", user=self.staff
+        )
+        self.assertEqual((moved, skipped), (1, 2))
+        self.assertEqual(
+            dict(Order.objects.values_list("id", "order_status")),
+            {
+                self.pending.id: "PENDING",
+                self.processing.id: "SHIPPED",
+                self.shipped.id: "SHIPPED",
+            },
+        )
+
+        history = OrderStatusHistory.objects.get()
+        self.assertEqual(
+            (history.order_id, history.from_status, history.to_status,
+             history.source, history.changed_by),
+            (self.processing.id, "PROCESSING", "SHIPPED", "admin", self.staff),
+        )
+
+    def test_unknown_status_is_rejected(self):
+        with self.assertRaises(ValueError):
+            transition_orders(Order.objects.all(), "LOST")
+
+    def test_delivery_sets_timestamp(self):
+        self.assertTrue(transition_order(self.shipped, "DELIVERED", source="customer"))
+        self.shipped.refresh_from_db()
+        self.assertIsNotNone(self.shipped.delivered_at)
+        self.assertFalse(transition_order(self.shipped, "CANCELLED"))
+
+    def test_notifications_are_queued_with_the_change(self):
+        transition_orders(Order.objects.all(), "CANCELLED")
+        self.assertEqual(
+            sorted(OutboundEmail.objects.values_list("subject", flat=True)),
+            [f"Order #{self.pending.id} is now Cancelled",
+             f"Order #{self.processing.id} is now Cancelled"],
+        )
+
+        transition_order(self.shipped, "DELIVERED", notify=False)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_rolled_back_change_queues_nothing(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            transition_orders(Order.objects.all(), "CANCELLED")
+            raise RuntimeError("admin action failed")
+
+        self.assertFalse(OutboundEmail.objects.exists())
+        self.assertFalse(OrderStatusHistory.objects.exists())
+        self.assertFalse(Order.objects.filter(order_status="CANCELLED").exists())
+
+
+class StoreQueryBudgetTests(QueryBudgetTestCase):
+    """Query budgets for every URL in store.urls, on a well-stocked account."""
+
+    urlconf_namespace = "store"
+
+    ORDERS = 30
+    ITEMS_PER_ORDER = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.other = make_user("neighbour")
+        cls.products = make_products(40)
+        cls.events = make_events(4, seats_per_event=20)
+
+        cls.address = Address.objects.create(
+            user=cls.user,
+            full_name="Ravi Kumar",
+            address_line_1="12 Temple Road",
+            city="Madurai",
+            state="Tamil Nadu",
+            postal_code="625001",
+            country="India",
+            phone_number="9876543210",
+        )
+
+        cart = Cart.objects.create(user=cls.user)
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product=product, quantity=2) for product in cls.products[:6]]
+            + [CartItem(cart=cart, event=event) for event in cls.events[:2]]
+        )
+
+        for owner in (cls.user, cls.other):
+            orders = Order.objects.bulk_create([
+                Order(
+                    user=owner,
+                    address=cls.address if owner == cls.user else None,
+                    total_amount=Decimal("4995.00"),
+                    payment_status="COMPLETED",
+                    order_status="PROCESSING",
+                )
+                for _ in range(cls.ORDERS)
+            ])
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=cls.products[(order.id + number) % len(cls.products)],
+                    quantity=1,
+                    price_at_purchase=Decimal("999.00"),
+                )
+                for order in orders
+                for number in range(cls.ITEMS_PER_ORDER)
+            ])
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(
+                    order=order,
+                    from_status="PENDING",
+                    to_status="PROCESSING",
+                    source="payment",
+                )
+                for order in orders
+            ])
+
+        cls.order = Order.objects.filter(user=cls.user).latest("id")
+        cls.shipped = Order.objects.filter(user=cls.user).earliest("id")
+        Order.objects.filter(id=cls.shipped.id).update(order_status="SHIPPED")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    # -------------------------------------------------
+    # Shop & cart
+    # -------------------------------------------------
+    def test_shop(self):
+        self.assertBudget("GET", reverse("store:shop"), queries=2)
+
+    def test_product_search(self):
+        self.assertBudget("GET", reverse("store:product_search") + "?q=bat", queries=3)
+
+    def test_cart(self):
+        self.assertBudget("GET", reverse("store:cart"), queries=3)
+
+    def test_checkout(self):
+        self.assertBudget("GET", reverse("store:checkout"), queries=4)
+
+    def test_checkout_buy_now(self):
+        url = reverse("store:checkout") + f"?buy_now={self.products[0].id}"
+        self.assertBudget("GET", url, queries=7)
+        # Same product again: the session is unchanged and not saved
+        self.assertBudget("GET", url, queries=4)
+
+    def test_add_to_cart(self):
+        url = reverse("store:add_to_cart", args=[self.products[10].id])
+        self.assertBudget("GET", url, queries=7, status=302)
+
+    def test_ajax_add_to_cart(self):
+        url = reverse("store:ajax_add_to_cart", args=[self.products[0].id])
+        self.assertBudget("GET", url, queries=6)
+
+    def test_remove_from_cart(self):
+        item = CartItem.objects.filter(cart__user=self.user).first()
+        url = reverse("store:remove_from_cart", args=[item.id])
+        self.assertBudget("GET", url, queries=3, status=302)
+
+    def test_buy_now(self):
+        url = reverse("store:buy_now", args=[self.products[0].id])
+        self.assertBudget("GET", url, queries=1, status=302)
+
+    def test_add_address(self):
+        self.assertBudget("GET", reverse("store:add_address"), queries=1)
+
+    # -------------------------------------------------
+    # Payment
+    # -------------------------------------------------
+    @mock.patch("store.views.requests.post", return_value=_gateway_response())
+    def test_create_cashfree_order(self, _post):
+        self.assertBudget(
+            "POST", reverse("store:create_cashfree_order"), queries=11,
+            data="{}", content_type="application/json",
+        )
+
+    def test_cashfree_webhook(self):
+        order = Order.objects.create(
+            user=self.user,
+            address=self.address,
+            total_amount=Decimal("999.00"),
+            payment_gateway_order_id="store_webhook",
+        )
+        payload = {
+            "type": "PAYMENT_SUCCESS_WEBHOOK",
+            "data": {
+                "order": {"order_id": "store_webhook"},
+                "payment": {"payment_status": "SUCCESS", "cf_payment_id": 42},
+            },
+        }
+        self.assertBudget(
+            "POST", reverse("store:cashfree_webhook"), queries=17,
+            data=json.dumps(payload), content_type="application/json",
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, "COMPLETED")
+
+    # -------------------------------------------------
+    # Orders
+    # -------------------------------------------------
+    def test_my_orders(self):
+        self.assertBudget("GET", reverse("store:my_orders"), queries=3)
+
+    def test_order_confirmation(self):
+        url = reverse("store:order_confirmation", args=[self.order.id])
+        self.assertBudget("GET", url, queries=4)
+
+    def test_confirm_delivery(self):
+        url = reverse("store:confirm_delivery", args=[self.shipped.id])
+        self.assertBudget("POST", url, queries=8, status=302)
+
+    def test_invoice(self):
+        url = reverse("store:invoice", args=[self.order.id])
+        self.assertBudget("GET", url, queries=3)
+
+    def test_invoice_pdf(self):
+        url = reverse("store:invoice_pdf", args=[self.order.id])
+        # Rendered and stored on first download, then served from storage
+        self.assertBudget("GET", url, queries=6, seconds=5.0)
+        self.assertBudget("GET", url, queries=3)
 
-# Create your tests here.
+    def test_every_url_has_a_budget(self):
+        self.assertAllUrlsCovered([
+            "shop", "product_search", "cart", "checkout", "add_to_cart",
+            "ajax_add_to_cart", "remove_from_cart", "buy_now", "add_address",
+            "create_cashfree_order", "cashfree_webhook", "my_orders",
+            "order_confirmation", "confirm_delivery", "invoice", "invoice_pdf",
+        ])
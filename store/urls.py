@@ -6,6 +6,7 @@ app_name = "store"
 urlpatterns = [
     # SHOP
     path("shop/", views.shop_view, name="shop"),
+    path("search/", views.product_search, name="product_search"),
     path("cart/", views.cart_view, name="cart"),
     path("checkout/", views.checkout, name="checkout"),
 
@@ -48,5 +49,10 @@ urlpatterns = [
     views.invoice_view,
     name="invoice"
 ),
+    path(
+        "invoice/<int:order_id>/pdf/",
+        views.invoice_pdf_view,
+        name="invoice_pdf"
+    ),
 
 ]
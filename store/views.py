@@ -1,37 +1,126 @@
 from decimal import Decimal
 import json
-import requests
+import logging
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.db import transaction
-from django.utils import timezone
+from django.db.models import Count, Prefetch
+from django.template.loader import render_to_string
+
+from core.cache import (
+    aversioned_key, namespace_version, tiered_cache, versioned_key,
+)
+from core.lazy import lazy_import
+from core.pagination import akeyset_page, canonical_cursor, keyset_page
+from core.routers import replica_view
+from core.shortcuts import arender
+from core.metrics import (
+    CART_OPERATIONS, GATEWAY_ERRORS, WEBHOOK_LATENCY, gateway_call,
+)
 
 from .models import (
     Cart, CartItem, Product, Address,
-    Order, OrderItem, OrderShipping
+    Order, OrderItem, OrderShipping, OrderStatusHistory
 )
 from .forms import AddressForm
+from .invoices import get_invoice_pdf
+from .inventory import (
+    OutOfStock, reserve_order_stock, release_order_stock
+)
+from .notifications import queue_order_confirmation
+from .order_status import transition_order
+from .search import search_products
+from .services import build_order, cart_lines
+from .tasks import generate_invoice_task
+
 
+logger = logging.getLogger(__name__)
+
+# Only create_cashfree_order calls the gateway
+requests = lazy_import("requests")
 
 # =====================================================
 # SHOP & CART
 # =====================================================
-def shop_view(request):
-    products = Product.objects.filter(is_active=True)
-    return render(request, "store/shop.html", {"products": products})
+SHOP_PAGE_SIZE = 24
+SHOP_ORDERING = ("-created_at", "-id")
+SHOP_CACHE_TIMEOUT = 60 * 10
+CART_CACHE_TIMEOUT = 60 * 30
+
+
+async def shop_page(cursor):
+    """One rendered page of the catalog, cached."""
+    cursor = canonical_cursor(Product, SHOP_ORDERING, cursor)
+    cache_key = await aversioned_key("shop", cursor)
+
+    page = await tiered_cache.aget(cache_key)
+    if page is None:
+        products, next_cursor = await akeyset_page(
+            Product.objects.filter(is_active=True),
+            SHOP_ORDERING,
+            cursor=cursor,
+            page_size=SHOP_PAGE_SIZE,
+        )
+        page = {
+            "products_html": render_to_string(
+                "store/product_list.html", {"products": products}
+            ),
+            "has_products": bool(products),
+            "next_cursor": next_cursor,
+        }
+        await tiered_cache.aset(cache_key, page, SHOP_CACHE_TIMEOUT)
+    return page
+
+
+@replica_view
+async def shop_view(request):
+    # Async: a cached page is served without leaving the event loop
+    cursor = request.GET.get("cursor", "")
+    page = await shop_page(cursor)
+
+    return await arender(request, "store/shop.html", {
+        **page,
+        "cursor": cursor,
+    })
+
+
+def product_search(request):
+    query = request.GET.get("q", "").strip()
+    products = search_products(query) if query else []
+
+    return render(request, "store/search.html", {
+        "query": query,
+        "products": products,
+    })
+
+
+def _cart_contents(cart):
+    """Cart lines (product/event prefetched) and total, cached per cart."""
+    # Prices come from products and events, so their versions are part of the key
+    cache_key = versioned_key(
+        f"cart:{cart.id}",
+        namespace_version("shop"),
+        namespace_version("events"),
+    )
+    contents = tiered_cache.get(cache_key)
+    if contents is None:
+        items = list(cart.items.select_related("product", "event"))
+        contents = (items, sum(item.sub_total() for item in items))
+        tiered_cache.set(cache_key, contents, CART_CACHE_TIMEOUT)
+    return contents
 
 
 @login_required
 def cart_view(request):
     cart, _ = Cart.objects.get_or_create(user=request.user)
-    cart_items = cart.items.all()
-    total_price = sum(item.sub_total() for item in cart_items)
+    cart_items, total_price = _cart_contents(cart)
 
     return render(request, "store/cart.html", {
         "cart_items": cart_items,
@@ -51,6 +140,7 @@ def add_to_cart(request, product_id):
     if not created:
         item.quantity += 1
         item.save()
+    CART_OPERATIONS.inc(operation="add", item="product")
 
     messages.success(request, "Item added to cart")
     return redirect("store:cart")
@@ -64,6 +154,9 @@ def remove_from_cart(request, item_id):
         cart__user=request.user
     )
     cart_item.delete()
+    CART_OPERATIONS.inc(
+        operation="remove", item="event" if cart_item.event_id else "product"
+    )
     messages.success(request, "Item removed from cart")
     return redirect("store:cart")
 
@@ -76,9 +169,11 @@ def checkout(request):
     cart, _ = Cart.objects.get_or_create(user=request.user)
     buy_now_product_id = request.GET.get("buy_now")
 
-    # Store buy-now in session
+    # Store buy-now in session; assigning marks the session modified, and
+    # every save is a database write, so only when it changed
     if buy_now_product_id:
-        request.session["buy_now"] = buy_now_product_id
+        if request.session.get("buy_now") != buy_now_product_id:
+            request.session["buy_now"] = buy_now_product_id
     else:
         request.session.pop("buy_now", None)
 
@@ -91,14 +186,11 @@ def checkout(request):
         }]
         total_amount = product.price
     else:
-        cart_items_qs = cart.items.all()
-        if not cart_items_qs.exists():
+        cart_items, total_amount = _cart_contents(cart)
+        if not cart_items:
             messages.warning(request, "Your cart is empty.")
             return redirect("store:shop")
 
-        cart_items = cart_items_qs
-        total_amount = sum(item.sub_total() for item in cart_items_qs)
-
     address = Address.objects.filter(user=request.user).first()
 
     return render(request, "store/checkout.html", {
@@ -139,36 +231,22 @@ def create_cashfree_order(request):
 
     buy_now_product_id = data.get("buy_now") or request.session.get("buy_now")
 
-    # Calculate total
     if buy_now_product_id:
         product = get_object_or_404(Product, id=buy_now_product_id)
-        order_total = product.price
-        order_items = [(product, 1)]
+        lines = [(product, None, 1)]
     else:
-        cart_items = cart.items.all()
-        if not cart_items.exists():
+        lines = cart_lines(cart)
+        if not lines:
             return JsonResponse({"error": "No items to pay for"}, status=400)
 
-        order_total = sum(item.sub_total() for item in cart_items)
-        order_items = [(item.product, item.quantity) for item in cart_items]
-
     # Create order
     address = Address.objects.filter(user=request.user).first()
 
-    order = Order.objects.create(
-        user=request.user,
-        address=address,
-        total_amount=order_total,
-        payment_status="PENDING",
-        order_status="PENDING",
-    )
-
-    for product, qty in order_items:
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=qty,
-            price_at_purchase=product.price,
+    try:
+        order = build_order(request.user, lines, address=address)
+    except OutOfStock:
+        return JsonResponse(
+            {"error": "Some items are out of stock"}, status=409
         )
 
     cashfree_order_id = f"store_{order.id}"
@@ -194,14 +272,23 @@ def create_cashfree_order(request):
         "Content-Type": "application/json",
     }
 
-    response = requests.post(
-        f"{settings.CASHFREE_BASE_URL}/orders",
-        json=payload,
-        headers=headers,
-        timeout=15,
-    )
+    try:
+        with gateway_call("store_create_order"):
+            response = requests.post(
+                f"{settings.CASHFREE_BASE_URL}/orders",
+                json=payload,
+                headers=headers,
+                timeout=15,
+            )
+    except requests.RequestException:
+        response = None
 
-    if response.status_code != 200:
+    if response is None or response.status_code != 200:
+        if response is not None:
+            GATEWAY_ERRORS.inc(
+                operation="store_create_order", reason=f"http_{response.status_code}"
+            )
+        release_order_stock(order)
         order.delete()
         return JsonResponse({"error": "Cashfree failed"}, status=400)
 
@@ -217,9 +304,88 @@ def create_cashfree_order(request):
 # =====================================================
 # CASHFREE WEBHOOK (SAFE + IDEMPOTENT)
 # =====================================================
+@transaction.atomic
+def _complete_order_payment(order_id, payment):
+    """
+    Mark a pending order paid. Returns the webhook response status.
+
+    The order is re-read under a row lock, so duplicate webhooks and the
+    reservation sweeper are serialized: only the first caller completes it.
+    """
+    order = (
+        Order.objects
+        .select_for_update(of=("self",))
+        .select_related("user", "address")
+        .get(id=order_id)
+    )
+
+    if order.payment_status == "COMPLETED":
+        return "already processed"
+
+    payment_id = str(payment.get("cf_payment_id"))
+
+    # Swept before payment landed: keep it cancelled and flag for refund
+    if order.order_status == "CANCELLED":
+        Order.objects.filter(id=order.id).update(
+            payment_status="COMPLETED",
+            payment_id=payment_id,
+        )
+        logger.error(
+            "Order %s was paid after it was cancelled; refund payment %s",
+            order.id, payment_id,
+        )
+        return "cancelled, refund due"
+
+    # Reservation was released before payment landed: take stock again
+    if not order.stock_reserved:
+        try:
+            reserve_order_stock(order)
+        except OutOfStock as exc:
+            logger.error("Order %s paid but oversold: %s", order.id, exc)
+
+    previous_status = order.order_status
+    order.payment_status = "COMPLETED"
+    order.order_status = "PROCESSING"
+    order.payment_id = payment_id
+    order.save(update_fields=[
+        "payment_status",
+        "order_status",
+        "payment_id"
+    ])
+    OrderStatusHistory.objects.create(
+        order=order,
+        from_status=previous_status,
+        to_status="PROCESSING",
+        source="payment",
+    )
+
+    # Create shipping snapshot once
+    if order.address and not hasattr(order, "shipping"):
+        addr = order.address
+        OrderShipping.objects.create(
+            order=order,
+            full_name=addr.full_name,
+            phone=addr.phone_number,
+            address_line_1=addr.address_line_1,
+            address_line_2=addr.address_line_2 or "",
+            city=addr.city,
+            state=addr.state,
+            pincode=addr.postal_code,
+        )
+
+    CartItem.objects.filter(cart__user=order.user).delete()
+
+    queue_order_confirmation(order)
+    generate_invoice_task.delay(order.id)
+    return "success"
+
+
 @csrf_exempt
 @require_POST
-def cashfree_webhook(request):
+@WEBHOOK_LATENCY.time(webhook="store")
+async def cashfree_webhook(request):
+    # Async, so gateway retries and duplicates cost no worker thread
+    # until there is work to do; the transaction itself runs in one
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
@@ -236,62 +402,77 @@ def cashfree_webhook(request):
         return JsonResponse({"status": "payment not successful"})
 
     try:
-        order = Order.objects.get(payment_gateway_order_id=order_id)
+        order = await Order.objects.only("id", "payment_status").aget(
+            payment_gateway_order_id=order_id
+        )
     except Order.DoesNotExist:
         return JsonResponse({"error": "Order not found"}, status=404)
 
-    # Prevent duplicate execution
+    # Cheap exit for retries; the locked re-check decides races
     if order.payment_status == "COMPLETED":
         return JsonResponse({"status": "already processed"})
 
-    with transaction.atomic():
-        order.payment_status = "COMPLETED"
-        order.order_status = "PROCESSING"
-        order.payment_id = str(payment.get("cf_payment_id"))
-        order.save(update_fields=[
-            "payment_status",
-            "order_status",
-            "payment_id"
-        ])
-
-        # Create shipping snapshot once
-        if order.address and not hasattr(order, "shipping"):
-            addr = order.address
-            OrderShipping.objects.create(
-                order=order,
-                full_name=addr.full_name,
-                phone=addr.phone_number,
-                address_line_1=addr.address_line_1,
-                address_line_2=addr.address_line_2 or "",
-                city=addr.city,
-                state=addr.state,
-                pincode=addr.postal_code,
-            )
-
-        CartItem.objects.filter(cart__user=order.user).delete()
+    status = await sync_to_async(_complete_order_payment)(order.id, payment)
 
-    request.session.pop("buy_now", None)
-    return JsonResponse({"status": "success"})
+    return JsonResponse({"status": status})
 
 
 # =====================================================
 # ORDERS
 # =====================================================
+ORDERS_PAGE_SIZE = 10
+ORDER_PREVIEW_ITEMS = 3
+
+
 @login_required
+@replica_view
 def my_orders(request):
-    orders = (
+    cursor = request.GET.get("cursor", "")
+
+    # Only the first few lines per order, fetched in one windowed query
+    preview = (
+        OrderItem.objects
+        .select_related("product", "event")
+        .only("order_id", "quantity", "product__name", "event__name")
+        .order_by("id")
+    )[:ORDER_PREVIEW_ITEMS]
+
+    orders, next_cursor = keyset_page(
         Order.objects
         .filter(user=request.user)
-        .prefetch_related("items")
-        .order_by("-created_at")
+        .annotate(item_count=Count("items"))
+        .prefetch_related(
+            Prefetch("items", queryset=preview, to_attr="preview_items")
+        ),
+        ("-created_at", "-id"),
+        cursor=cursor,
+        page_size=ORDERS_PAGE_SIZE,
+    )
+
+    return render(request, "store/my_orders.html", {
+        "orders": orders,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+    })
+
+
+def _orders_with_items():
+    """Orders with their shipping snapshot and items' products loaded up front."""
+    return Order.objects.select_related("shipping").prefetch_related(
+        Prefetch(
+            "items",
+            queryset=OrderItem.objects.select_related("product", "event"),
+        )
     )
-    return render(request, "store/my_orders.html", {"orders": orders})
 
 
 @login_required
 def order_confirmation(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
-    return render(request, "store/order_confirmation.html", {"order": order})
+    order = get_object_or_404(_orders_with_items(), id=order_id, user=request.user)
+    return render(request, "store/order_confirmation.html", {
+        "order": order,
+        "status_history": order.status_history.all(),
+    })
 
 
 @login_required
@@ -311,6 +492,7 @@ def ajax_add_to_cart(request, product_id):
     if not created:
         item.quantity += 1
         item.save()
+    CART_OPERATIONS.inc(operation="add", item="product")
 
     return JsonResponse({
         "status": "success",
@@ -328,8 +510,10 @@ def confirm_delivery(request, order_id):
         order_status="SHIPPED"
     )
 
-    order.order_status = "DELIVERED"
-    order.save(update_fields=["order_status"])
+    transition_order(
+        order, "DELIVERED",
+        user=request.user, source="customer", notify=False
+    )
 
     messages.success(request, "🎉 Delivery confirmed. Thank you!")
     return redirect("store:order_confirmation", order_id=order.id)
@@ -337,9 +521,26 @@ def confirm_delivery(request, order_id):
 @login_required
 def invoice_view(request, order_id):
     order = get_object_or_404(
-        Order,
+        _orders_with_items(),
         id=order_id,
         user=request.user,
         payment_status="COMPLETED"
     )
     return render(request, "store/invoice.html", {"order": order})
+
+
+@login_required
+def invoice_pdf_view(request, order_id):
+    order = get_object_or_404(
+        _orders_with_items(),
+        id=order_id,
+        user=request.user,
+        payment_status="COMPLETED"
+    )
+
+    response = HttpResponse(get_invoice_pdf(order), content_type="application/pdf")
+    response["Content-Disposition"] = (
+        f'attachment; filename="invoice-{order.id}.pdf"'
+    )
+    response["Cache-Control"] = "private, max-age=86400"
+    return response